@@ -0,0 +1,104 @@
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Payloads are invalidated explicitly whenever their files, translations or link
+# text change. The timeout is only a backstop for changes we can't see, like
+# cascading deletes.
+FILE_LINKS_TIMEOUT = 60 * 60 * 24
+
+# Bumped to invalidate every cached payload at once, e.g. when link text changes
+FILE_LINKS_VERSION_KEY = "document-files:version"
+
+
+def file_links_key(entity_type, document_id):
+    return f"document-files:{entity_type}:{document_id}"
+
+
+def file_links_version_key(entity_type, document_id):
+    return f"document-files:{entity_type}:{document_id}:version"
+
+
+def _start_version(key, timeout):
+    # Another request may start the version first, in which case we use theirs
+    cache.add(key, uuid.uuid4().hex, timeout)
+    return cache.get(key)
+
+
+def get_cached_file_links(documents):
+    """
+    Look up the current version of, and any cached file links for, a set of
+    (entity_type, document_id) pairs, in one cache read. A document's version
+    changes whenever its file links are invalidated, so it doubles as an ETag,
+    and cached file links built at an older version are treated as missing.
+    That way file links built from rows read before a change was committed
+    can't be served after it.
+
+    Return a dict of versions and a dict of the file links found, both keyed
+    by pair.
+    """
+    version_keys = {
+        file_links_version_key(*document): document for document in documents
+    }
+    keys = {file_links_key(*document): document for document in documents}
+    cached = cache.get_many([FILE_LINKS_VERSION_KEY, *version_keys, *keys])
+
+    all_version = cached.get(FILE_LINKS_VERSION_KEY) or _start_version(
+        FILE_LINKS_VERSION_KEY, None
+    )
+    versions = {}
+    for key, document in version_keys.items():
+        version = cached.get(key) or _start_version(key, FILE_LINKS_TIMEOUT)
+        versions[document] = f"{all_version}-{version}"
+
+    file_links = {}
+    for key, document in keys.items():
+        entry = cached.get(key)
+        if entry and entry["version"] == versions[document]:
+            file_links[document] = entry["file_links"]
+
+    return versions, file_links
+
+
+def set_cached_file_links(file_links, versions):
+    """
+    Cache file links, keyed by (entity_type, document_id), along with the
+    version they were built at. The versions must be read before the file links
+    are built, so that a change committed during the build discards them.
+    """
+    cache.set_many(
+        {
+            file_links_key(*document): {
+                "version": versions[document],
+                "file_links": links,
+            }
+            for document, links in file_links.items()
+        },
+        FILE_LINKS_TIMEOUT,
+    )
+
+
+def invalidate_file_links(documents):
+    """
+    Start a new version of the file links for an iterable of (entity_type,
+    document_id) pairs once the current transaction commits, so a request
+    can't rebuild them from rows that are about to change.
+    """
+    documents = set(documents)
+    if documents:
+        transaction.on_commit(
+            lambda: cache.set_many(
+                {
+                    file_links_version_key(*document): uuid.uuid4().hex
+                    for document in documents
+                },
+                FILE_LINKS_TIMEOUT,
+            )
+        )
+
+
+def invalidate_all_file_links():
+    transaction.on_commit(
+        lambda: cache.set(FILE_LINKS_VERSION_KEY, uuid.uuid4().hex, None)
+    )
@@ -0,0 +1,135 @@
+import itertools
+
+from django.db import connection, transaction
+
+from la_metro_translations.api.cache import invalidate_file_links
+from la_metro_translations.api.serializers import DocumentSerializer
+from la_metro_translations.models import Document
+
+# How many documents are validated and upserted at a time
+INGESTION_CHUNK_SIZE = 1000
+
+
+class DocumentIngestionError(Exception):
+    """
+    Raised when a chunk of incoming documents fails validation.
+    """
+
+    def __init__(self, chunk, errors):
+        self.chunk = chunk
+        self.errors = errors
+        super().__init__(f"Invalid documents in chunk {chunk}")
+
+
+# Fields that identify a document, and fields that are updated on conflict
+DOCUMENT_KEY_FIELDS = ["document_type", "document_id"]
+DOCUMENT_UPDATE_FIELDS = [
+    "title",
+    "source_url",
+    "created_at",
+    "updated_at",
+    "entity_type",
+    "entity_id",
+    "entity_slug",
+]
+
+
+def upsert_documents(documents):
+    """
+    Create or update Documents from validated document details, skipping
+    documents whose stored fields already match.
+
+    Return a dict of created, changed and unchanged counts, and a list of
+    (entity_type, document_id) pairs for the created and changed documents.
+    """
+    # A row can only be upserted once per statement, so the last copy of a
+    # document wins
+    documents_by_key = {
+        tuple(doc_details[field] for field in DOCUMENT_KEY_FIELDS): doc_details
+        for doc_details in documents
+    }
+    if not documents_by_key:
+        return {"created": 0, "changed": 0, "unchanged": 0}, []
+
+    fields = DOCUMENT_KEY_FIELDS + DOCUMENT_UPDATE_FIELDS
+    quote_name = connection.ops.quote_name
+    table = quote_name(Document._meta.db_table)
+
+    def column(field):
+        return quote_name(Document._meta.get_field(field).column)
+
+    columns = ", ".join(column(field) for field in fields)
+    stored = ", ".join(f"{table}.{column(field)}" for field in DOCUMENT_UPDATE_FIELDS)
+    excluded = ", ".join(
+        f"EXCLUDED.{column(field)}" for field in DOCUMENT_UPDATE_FIELDS
+    )
+    updates = ", ".join(
+        f"{column(field)} = EXCLUDED.{column(field)}"
+        for field in DOCUMENT_UPDATE_FIELDS
+    )
+    row_placeholder = f"({', '.join(['%s'] * len(fields))})"
+
+    # Only rows that differ from the incoming values are updated, and only
+    # written rows are returned. xmax is 0 for newly inserted rows.
+    sql = (
+        f"INSERT INTO {table} ({columns}) "
+        f"VALUES {', '.join([row_placeholder] * len(documents_by_key))} "
+        f"ON CONFLICT ({', '.join(column(f) for f in DOCUMENT_KEY_FIELDS)}) "
+        f"DO UPDATE SET {updates} "
+        f"WHERE ({stored}) IS DISTINCT FROM ({excluded}) "
+        f"RETURNING {column('entity_type')}, {column('document_id')}, (xmax = 0)"
+    )
+    params = [
+        doc_details[field]
+        for doc_details in documents_by_key.values()
+        for field in fields
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        written = cursor.fetchall()
+
+    created = sum(1 for _, _, is_created in written if is_created)
+    counts = {
+        "created": created,
+        "changed": len(written) - created,
+        "unchanged": len(documents_by_key) - len(written),
+    }
+    return counts, [(entity_type, doc_id) for entity_type, doc_id, _ in written]
+
+
+def ingest_documents(documents, chunk_size=INGESTION_CHUNK_SIZE):
+    """
+    Validate and upsert an iterable of document details from BoardAgendas in
+    chunks, so memory use is bounded by the chunk size rather than the size of
+    the payload. Every chunk is written in one transaction: if any chunk is
+    invalid, DocumentIngestionError is raised and nothing is saved.
+
+    Return a list of created, changed and unchanged counts for each chunk.
+    """
+    chunk_counts = []
+
+    with transaction.atomic():
+        for index, chunk in enumerate(itertools.batched(documents, chunk_size)):
+            serializer = DocumentSerializer(data=list(chunk), many=True)
+            if not serializer.is_valid():
+                raise DocumentIngestionError(index, serializer.errors)
+
+            counts, written_documents = upsert_documents(serializer.validated_data)
+            chunk_counts.append(counts)
+
+            # English PDF links point at the source url, so refresh cached
+            # file links once the new urls are committed
+            invalidate_file_links(written_documents)
+
+    return chunk_counts
+
+
+def total_counts(chunk_counts):
+    """
+    Sum per-chunk created, changed and unchanged counts.
+    """
+    return {
+        key: sum(counts[key] for counts in chunk_counts)
+        for key in ["created", "changed", "unchanged"]
+    }
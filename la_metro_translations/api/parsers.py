@@ -0,0 +1,72 @@
+import io
+import json
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+
+class RequestTooLargeError(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Request body is too large."
+    default_code = "request_too_large"
+
+
+class LimitedJSONParser(JSONParser):
+    """
+    Parse JSON, rejecting bodies over MAX_JSON_BODY_SIZE bytes. A JSON body has
+    to be read into memory in full to be parsed, so larger payloads have to be
+    sent as NDJSON, which is parsed a line at a time.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        max_size = settings.MAX_JSON_BODY_SIZE
+        error = RequestTooLargeError(
+            f"JSON request bodies are limited to {max_size} bytes. Send larger "
+            "payloads as newline-delimited JSON (application/x-ndjson)."
+        )
+
+        request = parser_context.get("request")
+        content_length = request.META.get("CONTENT_LENGTH") if request else None
+        if content_length and content_length.isdigit():
+            if int(content_length) > max_size:
+                raise error
+
+        if stream is not None:
+            # Bodies sent without a length are cut off once they're too large
+            body = stream.read(max_size + 1)
+            if len(body) > max_size:
+                raise error
+            stream = io.BytesIO(body)
+
+        return super().parse(stream, media_type, parser_context)
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parse newline-delimited JSON into a lazy iterator of objects, so a large
+    payload can be processed without reading all of it into memory.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", "utf-8")
+        if stream is None:
+            return iter(())
+
+        def parse_lines():
+            for line_number, line in enumerate(stream, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    yield json.loads(line.decode(encoding))
+                except ValueError as e:
+                    raise ParseError(f"NDJSON parse error on line {line_number}: {e}")
+
+        return parse_lines()
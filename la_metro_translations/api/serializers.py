@@ -40,13 +40,12 @@ class DocumentSerializer(serializers.ModelSerializer):
         return value
 
 
-class NotificationSerializer(serializers.Serializer):
+class ApiKeySerializer(serializers.Serializer):
     """
-    Check that the api_key is correct, and process multiple documents
+    Check that the api_key is correct
     """
 
     api_key = serializers.CharField(max_length=36)
-    documents = DocumentSerializer(many=True)
 
     def validate_api_key(self, value):
         """
@@ -58,3 +57,20 @@ class NotificationSerializer(serializers.Serializer):
                 "Unauthorized: Invalid api key. Double check the key submitted."
             )
         return value
+
+
+class DocumentLookupSerializer(serializers.Serializer):
+    """
+    Identify a single document by its entity type and BoardAgendas ID
+    """
+
+    entity_type = serializers.ChoiceField(choices=Document.ENTITY_TYPE_CHOICES)
+    document_id = serializers.CharField()
+
+
+class DocumentFilesLookupSerializer(ApiKeySerializer):
+    """
+    Check that the api_key is correct, and process multiple document lookups
+    """
+
+    documents = DocumentLookupSerializer(many=True, max_length=500)
@@ -1,83 +1,155 @@
 from django.conf import settings
+from django.db import transaction
 from django.db.models import Prefetch
 from django.db.models import Case, When
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
+from la_metro_translations.backends import get_backend
 from la_metro_translations.models import (
-    Document,
     DocumentContent,
+    DocumentIngestion,
     DocumentTranslation,
     LinkText,
     TranslationFile,
 )
-from la_metro_translations.api.serializers import NotificationSerializer
+from la_metro_translations.api.cache import (
+    get_cached_file_links,
+    set_cached_file_links,
+)
+from la_metro_translations.api.ingestion import (
+    DocumentIngestionError,
+    ingest_documents,
+    total_counts,
+)
+from la_metro_translations.api.parsers import LimitedJSONParser, NDJSONParser
+from la_metro_translations.api.serializers import (
+    ApiKeySerializer,
+    DocumentFilesLookupSerializer,
+)
 
 
 class DocumentUpdateView(APIView):
     """
     Update or create base Documents with information from the BoardAgendas app.
+
+    Accepts either a JSON object with an api_key and a list of documents, or
+    newline-delimited JSON with one document per line and the api_key passed
+    as a query parameter. Documents are validated and upserted in chunks.
+
+    JSON bodies are parsed in full, so they're limited to MAX_JSON_BODY_SIZE
+    bytes and larger ones are rejected with 413. Large pushes should be sent
+    as newline-delimited JSON, which is parsed as it's ingested.
+
+    Passing async=true saves the documents and returns 202 with a job ID right
+    away, leaving the ingest_documents job to upsert them. Passing extract=true
+    as well runs batch_extract once they're ingested.
     """
 
-    def post(self, request):
-        serializer = NotificationSerializer(data=request.data)
-        if not serializer.is_valid():
-            if serializer.errors.get("api_key"):
-                return Response(serializer.errors, status=status.HTTP_403_FORBIDDEN)
-            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    parser_classes = [LimitedJSONParser, NDJSONParser]
+
+    def _get_flag(self, request, name):
+        return request.query_params.get(name, "").lower() in ("1", "true")
 
-        cleaned_data = serializer.data
-
-        # Create/update documents
-        documents_to_upsert = []
-        for doc_details in cleaned_data["documents"]:
-            documents_to_upsert.append(Document(**doc_details))
-
-        created_docs = Document.objects.bulk_create(
-            documents_to_upsert,
-            update_conflicts=True,
-            unique_fields=["document_type", "document_id"],
-            update_fields=[
-                "title",
-                "source_url",
-                "created_at",
-                "updated_at",
-                "entity_type",
-                "entity_id",
-                "entity_slug",
-            ],
+    def start_ingestion(self, request, documents):
+        ingestion = DocumentIngestion.objects.create(
+            payload=list(documents), extract=self._get_flag(request, "extract")
+        )
+        transaction.on_commit(
+            lambda: get_backend().start_job("ingest_documents", ingestion=ingestion.id)
         )
 
+        accepted_msg = {
+            "message": "Accepted: Document(s) queued for ingestion",
+            "job_id": ingestion.id,
+            "status_url": reverse("document_ingestion", args=[ingestion.id]),
+        }
+        return Response(accepted_msg, status=status.HTTP_202_ACCEPTED)
+
+    def post(self, request):
+        if isinstance(request.data, dict):
+            api_key = request.data.get("api_key")
+            documents = request.data.get("documents")
+        else:
+            api_key = request.query_params.get("api_key")
+            documents = request.data
+
+        api_key_serializer = ApiKeySerializer(data={"api_key": api_key})
+        if not api_key_serializer.is_valid():
+            return Response(api_key_serializer.errors, status=status.HTTP_403_FORBIDDEN)
+
+        if documents is None or isinstance(documents, (dict, str)):
+            errors = {"documents": ["Expected a list of documents."]}
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        if self._get_flag(request, "async"):
+            return self.start_ingestion(request, documents)
+
+        try:
+            chunk_counts = ingest_documents(documents)
+        except DocumentIngestionError as e:
+            errors = {"chunk": e.chunk, "documents": e.errors}
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        totals = total_counts(chunk_counts)
         success_msg = {
-            "message": f"Success: Document(s) created/updated - {len(created_docs)}"
+            "message": (
+                f"Success: Document(s) created - {totals['created']}, "
+                f"updated - {totals['changed']}, unchanged - {totals['unchanged']}"
+            ),
+            **totals,
+            "chunks": chunk_counts,
         }
         return Response(success_msg, status=status.HTTP_201_CREATED)
 
 
-class DocumentFilesView(APIView):
+class DocumentIngestionView(APIView):
     """
-    Return urls for an entity's files and translations.
+    Report the status of an asynchronous document ingestion.
     """
 
-    def _get_link_text(self, entity_type, language):
-        link_text = LinkText.objects.get(language=language)
-        return (
-            link_text.agenda_download_text
-            if entity_type == "event"
-            else link_text.board_report_download_text
+    def get(self, request, pk):
+        api_key_serializer = ApiKeySerializer(
+            data={"api_key": request.query_params.get("api_key")}
         )
+        if not api_key_serializer.is_valid():
+            return Response(api_key_serializer.errors, status=status.HTTP_403_FORBIDDEN)
 
-    def get(self, request):
-        api_key = request.query_params.get("api_key")
-        if api_key != settings.BOARDAGENDAS_API_KEY:
-            error_msg = "Unauthorized: Invalid api key. Double check the key submitted."
-            return Response(error_msg, status=status.HTTP_403_FORBIDDEN)
+        try:
+            ingestion = DocumentIngestion.objects.get(pk=pk)
+        except DocumentIngestion.DoesNotExist:
+            error_msg = "Not Found: Matching ingestion does not exist."
+            return Response(error_msg, status=status.HTTP_404_NOT_FOUND)
 
-        entity_type = request.query_params.get("entity_type")
-        document_id = request.query_params.get("document_id")
+        return Response(
+            {
+                "job_id": ingestion.id,
+                "status": ingestion.status,
+                "chunks": ingestion.chunk_counts,
+                "errors": ingestion.errors,
+                "created_at": ingestion.created_at,
+                "finished_at": ingestion.finished_at,
+            },
+            status=status.HTTP_200_OK,
+        )
 
+
+class FileLinksMixin:
+    """
+    Look up the file links for documents, building and caching any that aren't
+    cached yet. Each document's file links are invalidated whenever its files,
+    translations or the link text change, and cached file links are only
+    served while the version they were built at is current, see
+    get_cached_file_links.
+    """
+
+    def _build_file_links(self, documents):
         lang_order = DocumentTranslation.get_language_priority()
         ordered = Case(
             *[
@@ -93,22 +165,130 @@ class DocumentFilesView(APIView):
         files_filter = TranslationFile.objects.exclude(
             document_translation__language="eng", format="pdf"
         )
-        try:
-            content = DocumentContent.objects.prefetch_related(
+        contents = (
+            DocumentContent.objects.select_related("document")
+            .prefetch_related(
                 Prefetch("translations", translation_filter),
                 Prefetch("translations__files", files_filter),
-            ).get(document__entity_type=entity_type, document__document_id=document_id)
-        except DocumentContent.DoesNotExist:
+            )
+            .filter(
+                document__entity_type__in={entity_type for entity_type, _ in documents},
+                document__document_id__in={doc_id for _, doc_id in documents},
+            )
+        )
+        # Link text is loaded once per build, rather than once per file
+        link_texts = LinkText.by_language()
+
+        file_links = {}
+        for content in contents:
+            entity_type = content.document.entity_type
+            document = (entity_type, content.document.document_id)
+            if document not in documents:
+                continue
+
+            links = {"pdf": [], "rtf": []}
+            for translation in content.translations.all():
+                for file in translation.files.all():
+                    link_text = link_texts[translation.language]
+                    link_details = {
+                        "link_text": link_text.download_text(entity_type),
+                        "url": file.get_file_url(),
+                    }
+                    links[file.format].append(link_details)
+            file_links[document] = links
+
+        return file_links
+
+    def get_file_links(self, documents, versions=None, file_links=None):
+        """
+        Return the file links for a set of (entity_type, document_id) pairs,
+        keyed by pair. Documents that don't exist in the suite are left out.
+        Pass versions and file_links if they've already been looked up with
+        get_cached_file_links.
+        """
+        if versions is None:
+            versions, file_links = get_cached_file_links(documents)
+
+        missing = {document for document in documents if document not in file_links}
+        if missing:
+            built_file_links = self._build_file_links(missing)
+            set_cached_file_links(built_file_links, versions)
+            file_links.update(built_file_links)
+
+        return file_links
+
+
+# The file links are cached per document and invalidated when they change, so
+# they're kept out of the page cache, which can't be invalidated per document
+@method_decorator(cache_control(no_cache=True), name="dispatch")
+class DocumentFilesView(FileLinksMixin, APIView):
+    """
+    Return urls for an entity's files and translations.
+
+    Responses carry an ETag, so clients can revalidate with a conditional
+    request and get a 304 without the file links being looked up.
+
+    There's no Last-Modified date: link text edits and approvals withdrawn in
+    bulk don't move any updated_at forward, so no date covers every change the
+    ETag does, and clients revalidating by date alone would be told a changed
+    payload is unmodified.
+    """
+
+    def get(self, request):
+        api_key = request.query_params.get("api_key")
+        if api_key != settings.BOARDAGENDAS_API_KEY:
+            error_msg = "Unauthorized: Invalid api key. Double check the key submitted."
+            return Response(error_msg, status=status.HTTP_403_FORBIDDEN)
+
+        document = (
+            request.query_params.get("entity_type"),
+            request.query_params.get("document_id"),
+        )
+
+        # The ETag is the version of the document's file links, so it's read
+        # before they're built and can't be attached to an older build
+        versions, file_links = get_cached_file_links({document})
+        etag = f'"{versions[document]}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified:
+            # A 304 has to repeat the validator it was matched against
+            not_modified["ETag"] = etag
+            return not_modified
+
+        file_links = self.get_file_links({document}, versions, file_links).get(document)
+        if file_links is None:
             error_msg = "Not Found: Matching document does not exist in the suite."
             return Response(error_msg, status=status.HTTP_404_NOT_FOUND)
 
-        file_links = {"pdf": [], "rtf": []}
-        for translation in content.translations.all():
-            for file in translation.files.all():
-                link_details = {
-                    "link_text": self._get_link_text(entity_type, translation.language),
-                    "url": file.get_file_url(),
-                }
-                file_links[file.format].append(link_details)
+        response = Response(file_links, status=status.HTTP_200_OK)
+        response["ETag"] = etag
+        return response
+
+
+@method_decorator(cache_control(no_cache=True), name="dispatch")
+class DocumentFilesLookupView(FileLinksMixin, APIView):
+    """
+    Return urls for many entities' files and translations at once, mapped by
+    entity type and document ID. Documents that don't exist in the suite map
+    to null.
+    """
+
+    def post(self, request):
+        serializer = DocumentFilesLookupSerializer(data=request.data)
+        if not serializer.is_valid():
+            if serializer.errors.get("api_key"):
+                return Response(serializer.errors, status=status.HTTP_403_FORBIDDEN)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        documents = {
+            (lookup["entity_type"], lookup["document_id"])
+            for lookup in serializer.validated_data["documents"]
+        }
+        file_links = self.get_file_links(documents)
+
+        response = {}
+        for document in documents:
+            entity_type, document_id = document
+            response.setdefault(entity_type, {})[document_id] = file_links.get(document)
 
-        return Response(file_links, status=status.HTTP_200_OK)
+        return Response(response, status=status.HTTP_200_OK)
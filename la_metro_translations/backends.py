@@ -1,54 +1,594 @@
+import logging
 import shlex
 import threading
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.core.management import call_command
+from django.db import connections
 
+logger = logging.getLogger(__name__)
+
+
+def format_command(command, *args, **kwargs):
+    """
+    Format a management command and its arguments as a manage.py command line.
+    """
+    cmd_parts = ["python", "manage.py", command]
+    for arg in args:
+        cmd_parts.append(shlex.quote(str(arg)))
+    for key, value in kwargs.items():
+        if isinstance(value, (list, tuple)):
+            cmd_parts.append(f"--{key}")
+            cmd_parts.extend(shlex.quote(str(item)) for item in value)
+        elif isinstance(value, bool):
+            # Flags take no value, and are left out when off
+            if value:
+                cmd_parts.append(f"--{key}")
+        elif value is not None:
+            cmd_parts.append(f"--{key}={value}")
+    return " ".join(cmd_parts)
+
+
+# Commands whose job requests can be merged into a single job, mapped to the
+# option whose values are merged
+MERGED_JOB_OPTIONS = {"convert_docs": "document_translation"}
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+def merge_job_options(
+    command, options, other_options, merge_options=MERGED_JOB_OPTIONS
+):
+    """
+    Return the options for one job of command that covers jobs with options and
+    other_options, or None if they can't be merged. Identical jobs can always
+    be merged. Jobs of commands in merge_options can also be merged if they
+    only differ in its option, whose values are combined into a sorted list.
+    """
+    option = merge_options.get(command)
+    if option is None:
+        return dict(options) if options == other_options else None
+
+    merged = {key: value for key, value in options.items() if key != option}
+    if merged != {key: value for key, value in other_options.items() if key != option}:
+        return None
+
+    values = [options.get(option), other_options.get(option)]
+    if None in values:
+        # A run without the option already covers every value
+        return merged
+
+    merged_values = set()
+    for value in values:
+        merged_values.update(
+            value if isinstance(value, (list, tuple, set)) else [value]
+        )
+    merged[option] = sorted(merged_values)
+    return merged
+
+
+def _decrement(counter, key):
+    counter[key] -= 1
+    if not counter[key]:
+        del counter[key]
+
+
+class BaseBackend:
+    # Whether get_backend() collects job requests for JOB_DEBOUNCE_SECONDS
+    # before starting them
+    debounce = True
 
-class LocalBackend:
     def start_job(self, command, *args, **kwargs):
-        thread = threading.Thread(
-            target=call_command,
-            args=(command, *args),
-            kwargs=kwargs,
-            daemon=True,
+        raise NotImplementedError
+
+    def has_pending_job(self, command, *args, **kwargs):
+        """
+        Whether an identical job is queued and hasn't started yet. Jobs that
+        are already running don't count, since they may have read the data
+        before the change that this job was requested for.
+        """
+        raise NotImplementedError
+
+    def start_unique_job(self, command, *args, **kwargs):
+        """
+        Start a job unless an identical one is queued and hasn't started yet.
+        """
+        if self.has_pending_job(command, *args, **kwargs):
+            return None
+        return self.start_job(command, *args, **kwargs)
+
+    def metrics(self):
+        """
+        Return counts of this backend's jobs, for backends that track them.
+        """
+        return {}
+
+    def shutdown(self):
+        """
+        Start or finish any jobs held in this process before it exits. Called
+        while threads can still be started.
+        """
+
+
+class LocalBackend(BaseBackend):
+    """
+    Run jobs on a bounded pool of threads in this process. Jobs wait in a queue
+    for a free thread, and no more than LOCAL_JOB_CONCURRENCY_LIMITS allows of
+    each command run at once; the rest wait their turn.
+
+    No more than LOCAL_JOB_QUEUE_SIZE jobs are queued or running at once. A job
+    requested while the queue is full is merged into a waiting job that covers
+    it if there is one, see merge_job_options. Otherwise the caller waits up to
+    LOCAL_JOB_QUEUE_TIMEOUT seconds for a running job to finish, and gets a
+    JobQueueFullError if none does.
+    """
+
+    def __init__(
+        self,
+        max_workers=None,
+        max_queued_jobs=None,
+        concurrency_limits=None,
+        queue_timeout=None,
+    ):
+        self.max_workers = max_workers or getattr(settings, "LOCAL_JOB_WORKERS", 2)
+        self.max_queued_jobs = max_queued_jobs or getattr(
+            settings, "LOCAL_JOB_QUEUE_SIZE", 50
+        )
+        self.queue_timeout = (
+            queue_timeout
+            if queue_timeout is not None
+            else getattr(settings, "LOCAL_JOB_QUEUE_TIMEOUT", 30)
+        )
+        self.concurrency_limits = (
+            concurrency_limits
+            if concurrency_limits is not None
+            else getattr(settings, "LOCAL_JOB_CONCURRENCY_LIMITS", {})
+        )
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="local-job"
         )
-        thread.start()
+        self.lock = threading.Lock()
+        self.queue_has_room = threading.Condition(self.lock)
+        self.job_thread = threading.local()
 
+        # Command lines of jobs that are queued or running, and of jobs that
+        # haven't started yet
+        self.pending_jobs = Counter()
+        self.queued_jobs = Counter()
+        # Jobs submitted to the pool, and jobs waiting for a command's turn
+        self.active_commands = Counter()
+        self.waiting_jobs = defaultdict(deque)
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
 
-class HerokuBackend:
     def start_job(self, command, *args, **kwargs):
-        cmd_parts = ["python", "manage.py", command]
-        for arg in args:
-            cmd_parts.append(shlex.quote(str(arg)))
-        for key, value in kwargs.items():
-            if value is not None:
-                cmd_parts.append(f"--{key}={value}")
-
-        # For Heroku Platform dyno creation API reference, see:
-        # https://devcenter.heroku.com/articles/platform-api-reference#dyno-create
-        url = f"https://api.heroku.com/apps/{settings.HEROKU_APP_NAME}/dynos"
-        response = requests.post(
-            url,
+        job = format_command(command, *args, **kwargs)
+
+        with self.lock:
+            if self._is_full():
+                if self._merge_waiting_job(command, args, kwargs):
+                    return
+
+                # Running jobs don't wait, since they hold a thread that waiting
+                # jobs might be waiting on
+                in_job = getattr(self.job_thread, "running", False)
+                timeout = 0 if in_job else self.queue_timeout
+                if not self.queue_has_room.wait_for(
+                    lambda: not self._is_full(), timeout
+                ):
+                    self.rejected += 1
+                    raise JobQueueFullError(
+                        f"Local job queue is full. Couldn't start job: {job}"
+                    )
+
+            self.pending_jobs[job] += 1
+            self.queued_jobs[job] += 1
+            limit = self.concurrency_limits.get(command)
+            if limit is not None and self.active_commands[command] >= limit:
+                self.waiting_jobs[command].append((job, command, args, kwargs))
+            else:
+                self._submit(job, command, args, kwargs)
+
+    def _is_full(self):
+        # Called with the lock held
+        return sum(self.pending_jobs.values()) >= self.max_queued_jobs
+
+    def _merge_waiting_job(self, command, args, kwargs):
+        """
+        Merge a job into one of the same command that's waiting for its turn,
+        if they can be merged. Return whether it was merged.
+        """
+        # Called with the lock held
+        waiting_jobs = self.waiting_jobs[command]
+        for index, (job, _, waiting_args, waiting_kwargs) in enumerate(waiting_jobs):
+            if tuple(waiting_args) != tuple(args):
+                continue
+            merged_kwargs = merge_job_options(command, waiting_kwargs, kwargs)
+            if merged_kwargs is None:
+                continue
+
+            merged_job = format_command(command, *args, **merged_kwargs)
+            waiting_jobs[index] = (merged_job, command, waiting_args, merged_kwargs)
+            for jobs in [self.pending_jobs, self.queued_jobs]:
+                _decrement(jobs, job)
+                jobs[merged_job] += 1
+            return True
+
+        return False
+
+    def _submit(self, job, command, args, kwargs):
+        # Called with the lock held
+        self.active_commands[command] += 1
+        try:
+            self.executor.submit(self._run, job, command, args, kwargs)
+        except RuntimeError:
+            # The interpreter is shutting down, and the job couldn't finish anyway
+            logger.error(f"Process is exiting. Dropping job: {job}")
+            self.active_commands[command] -= 1
+            _decrement(self.pending_jobs, job)
+            _decrement(self.queued_jobs, job)
+            self.queue_has_room.notify_all()
+
+    def _run(self, job, command, args, kwargs):
+        with self.lock:
+            self.running += 1
+            _decrement(self.queued_jobs, job)
+
+        self.job_thread.running = True
+        try:
+            call_command(command, *args, **kwargs)
+        except Exception:
+            logger.exception(f"Local job failed: {job}")
+            succeeded = False
+        else:
+            succeeded = True
+        finally:
+            self.job_thread.running = False
+            # Each pool thread opens its own connections
+            connections.close_all()
+
+        with self.lock:
+            self.running -= 1
+            self.succeeded += succeeded
+            self.failed += not succeeded
+            _decrement(self.pending_jobs, job)
+            self.queue_has_room.notify_all()
+
+            self.active_commands[command] -= 1
+            if self.waiting_jobs[command]:
+                self._submit(*self.waiting_jobs[command].popleft())
+
+    def has_pending_job(self, command, *args, **kwargs):
+        with self.lock:
+            return format_command(command, *args, **kwargs) in self.queued_jobs
+
+    def shutdown(self):
+        """
+        Wait for every queued job to finish, including jobs waiting for their
+        command's turn, which are only submitted to the pool as others finish.
+        """
+        with self.lock:
+            self.queue_has_room.wait_for(lambda: not self.pending_jobs)
+
+    def metrics(self):
+        """
+        Return the current size of the job queue and counts of finished jobs.
+        """
+        with self.lock:
+            pending = sum(self.pending_jobs.values())
+            return {
+                "max_workers": self.max_workers,
+                "max_queued_jobs": self.max_queued_jobs,
+                "queued": pending - self.running,
+                "running": self.running,
+                "waiting_by_command": {
+                    command: len(jobs)
+                    for command, jobs in self.waiting_jobs.items()
+                    if jobs
+                },
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+
+class HerokuRetry(Retry):
+    """
+    Retry Heroku API requests that are safe to repeat. GETs are retried on
+    connection errors, timeouts, rate limits and server errors. POSTs start
+    dynos, and one that timed out or errored may already have started its
+    dyno, so they're only retried when Heroku can't have received them, on
+    connection errors, or when it turned them away with a 429.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method.upper() == "POST":
+            return status_code == 429
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class HerokuBackend(BaseBackend):
+    """
+    Run jobs on one-off dynos. Requests to the Heroku API share a pooled
+    session, time out, and are retried with backoff when it's safe to, see
+    HerokuRetry. Jobs are dispatched on a background thread, so starting one
+    doesn't hold up the request that asked for it.
+    """
+
+    # Seconds to wait to connect to, and then hear back from, the Heroku API
+    timeout = (5, 30)
+    # Read errors are only retried for allowed_methods, so not for POSTs
+    retry = HerokuRetry(
+        total=3,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(max_retries=self.retry))
+        self.dispatcher = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="heroku-dispatch"
+        )
+
+    # For Heroku Platform dyno API reference, see:
+    # https://devcenter.heroku.com/articles/platform-api-reference#dyno
+    @property
+    def dynos_url(self):
+        return f"https://api.heroku.com/apps/{settings.HEROKU_APP_NAME}/dynos"
+
+    @property
+    def headers(self):
+        return {
+            "Accept": "application/vnd.heroku+json; version=3",
+            "Authorization": f"Bearer {settings.HEROKU_API_TOKEN}",
+        }
+
+    def _dispatch(self, fn, *args, **kwargs):
+        """
+        Call fn on the dispatcher thread, and return a future for its result.
+        """
+
+        def dispatch():
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                logger.exception(f"Couldn't start job on Heroku: {args}")
+                raise
+
+        try:
+            return self.dispatcher.submit(dispatch)
+        except RuntimeError:
+            # The interpreter is shutting down, so dispatch before exiting
+            return dispatch()
+
+    def start_job(self, command, *args, **kwargs):
+        return self._dispatch(self._start_job, command, *args, **kwargs)
+
+    def start_unique_job(self, command, *args, **kwargs):
+        return self._dispatch(super().start_unique_job, command, *args, **kwargs)
+
+    def _start_job(self, command, *args, **kwargs):
+        response = self.session.post(
+            self.dynos_url,
             json={
-                "command": " ".join(cmd_parts),
+                "command": format_command(command, *args, **kwargs),
                 "attach": False,
                 "type": "run",
             },
-            headers={
-                "Accept": "application/vnd.heroku+json; version=3",
-                "Authorization": f"Bearer {settings.HEROKU_API_TOKEN}",
-            },
+            headers=self.headers,
+            timeout=self.timeout,
         )
         response.raise_for_status()
         return response.json().get("id")
 
+    def has_pending_job(self, command, *args, **kwargs):
+        response = self.session.get(
+            self.dynos_url, headers=self.headers, timeout=self.timeout
+        )
+        response.raise_for_status()
+
+        job = format_command(command, *args, **kwargs)
+        return any(
+            dyno.get("command") == job and dyno.get("state") == "starting"
+            for dyno in response.json()
+        )
+
+
+class DatabaseBackend(BaseBackend):
+    """
+    Queue jobs in the database, to be run by run_worker processes. Jobs
+    outlive the web process that requested them, and are retried if they fail.
+
+    Jobs are queued as soon as they're requested rather than debounced, so
+    they aren't lost if the web process stops. Queued jobs for commands in
+    MERGED_JOB_OPTIONS are merged when a worker claims one of them instead.
+    """
+
+    debounce = False
+
+    def start_job(self, command, *args, **kwargs):
+        from la_metro_translations.models import Job
+
+        job = Job.objects.create(command=command, args=list(args), options=kwargs)
+        return job.pk
+
+    def has_pending_job(self, command, *args, **kwargs):
+        from la_metro_translations.models import Job
+
+        return (
+            Job.pending()
+            .filter(command=command, args=list(args), options=kwargs)
+            .exists()
+        )
+
+
+class DebouncedBackend(BaseBackend):
+    """
+    Collect job requests for a short window, then start them on another
+    backend in one batch. Identical requests are only started once, and
+    requests for commands in merge_options are merged into a single job over
+    all of the requested values, e.g. one convert_docs run for every
+    translation approved during the window.
+
+    A window of None never flushes on its own, so tests can call flush().
+    """
+
+    merge_options = MERGED_JOB_OPTIONS
+
+    def __init__(self, backend, window=None):
+        self.backend = backend
+        self.window = window
+        self.lock = threading.Lock()
+        self.pending_jobs = {}
+        self.timer = None
+
+    def start_job(self, command, *args, **kwargs):
+        self._collect(command, args, kwargs, unique=False)
+
+    def start_unique_job(self, command, *args, **kwargs):
+        """
+        Collect a job unless an identical one has already been collected. The
+        wrapped backend checks for its own pending jobs when the job is
+        started, so the check doesn't hold up the caller.
+        """
+        if not self._has_collected_job(command, *args, **kwargs):
+            self._collect(command, args, kwargs, unique=True)
+
+    def _collect(self, command, args, kwargs, unique):
+        job_key = self._job_key(command, args, kwargs)
+
+        with self.lock:
+            job = self.pending_jobs.setdefault(
+                job_key,
+                {"command": command, "args": args, "kwargs": kwargs, "unique": unique},
+            )
+            # Only check for pending jobs if every request asked to
+            job["unique"] = job["unique"] and unique
+            job["kwargs"] = merge_job_options(
+                command, job["kwargs"], kwargs, self.merge_options
+            )
+
+            if self.timer is None and self.window is not None:
+                self.timer = threading.Timer(self.window, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def _job_key(self, command, args, kwargs):
+        # Requests that only differ in their merged option share a job
+        merge_option = self.merge_options.get(command)
+        return format_command(
+            command, *args, **{k: v for k, v in kwargs.items() if k != merge_option}
+        )
+
+    def _has_collected_job(self, command, *args, **kwargs):
+        with self.lock:
+            job = self.pending_jobs.get(self._job_key(command, args, kwargs))
+            # The collected job covers the request if merging it in changes nothing
+            return bool(job) and job["kwargs"] == merge_job_options(
+                command, job["kwargs"], kwargs, self.merge_options
+            )
+
+    def has_pending_job(self, command, *args, **kwargs):
+        return self._has_collected_job(
+            command, *args, **kwargs
+        ) or self.backend.has_pending_job(command, *args, **kwargs)
+
+    def shutdown(self):
+        self.flush()
+        self.backend.shutdown()
+
+    def metrics(self):
+        """
+        Return the wrapped backend's metrics, along with how many jobs have been
+        collected and are waiting for the window to end.
+        """
+        with self.lock:
+            collected = len(self.pending_jobs)
+        return {**self.backend.metrics(), "debounced": collected}
+
+    def flush(self):
+        """
+        Start every collected job now.
+        """
+        with self.lock:
+            pending_jobs, self.pending_jobs = self.pending_jobs, {}
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+        for job in pending_jobs.values():
+            start = (
+                self.backend.start_unique_job
+                if job["unique"]
+                else self.backend.start_job
+            )
+            try:
+                start(job["command"], *job["args"], **job["kwargs"])
+            except JobQueueFullError:
+                # There's no caller to tell, so don't hold up the other jobs
+                logger.exception(f"Couldn't start debounced job: {job['command']}")
+
+
+BACKENDS = {
+    "database": DatabaseBackend,
+    "heroku": HerokuBackend,
+    "local": LocalBackend,
+}
+
+
+def get_backend_class():
+    """
+    Return the backend named by JOB_BACKEND. Without one, jobs run on Heroku
+    when it's configured, otherwise on local threads.
+    """
+    name = getattr(settings, "JOB_BACKEND", None)
+    if name:
+        try:
+            return BACKENDS[name]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f"JOB_BACKEND must be one of {', '.join(BACKENDS)}, not {name!r}"
+            )
+
+    if getattr(settings, "HEROKU_APP_NAME", None) and getattr(
+        settings, "HEROKU_API_TOKEN", None
+    ):
+        return HerokuBackend
+    return LocalBackend
+
+
+_backend = None
+
 
 def get_backend():
-    return (
-        HerokuBackend()
-        if getattr(settings, "HEROKU_APP_NAME", None)
-        and getattr(settings, "HEROKU_API_TOKEN", None)
-        else LocalBackend()
-    )
+    """
+    Return the job backend for this process. It's shared so that job requests
+    from anywhere in the process can be debounced together.
+    """
+    global _backend
+
+    if _backend is None:
+        backend = get_backend_class()()
+        window = getattr(settings, "JOB_DEBOUNCE_SECONDS", 0)
+        if window and backend.debounce:
+            backend = DebouncedBackend(backend, window)
+        # Thread pools stop taking jobs once the interpreter starts exiting,
+        # before atexit handlers run. Hooks registered this way run before
+        # that, most recently registered first, so jobs held by the backend
+        # can still be started and finished.
+        threading._register_atexit(backend.shutdown)
+        _backend = backend
+
+    return _backend
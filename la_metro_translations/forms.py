@@ -0,0 +1,40 @@
+from wagtail.admin.forms import WagtailAdminModelForm
+
+from la_metro_translations.markdown_images import (
+    replace_images_with_placeholders,
+    restore_images,
+)
+
+
+class MarkdownImagesForm(WagtailAdminModelForm):
+    """
+    Edit markdown with its inline images swapped out for placeholders. Images
+    can be tens of megabytes of base64, so the editor loads them from the
+    markdown_image view as needed, and they're put back in when the form is
+    saved.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk and "markdown" in self.fields:
+            self.initial["markdown"] = replace_images_with_placeholders(
+                self.instance.markdown, self.instance
+            )
+
+    def clean_markdown(self):
+        # The instance holds the stored markdown until the form is saved
+        original_markdown = self.instance.markdown
+        markdown = restore_images(self.cleaned_data["markdown"], original_markdown)
+
+        # Keep the stored markdown if the only differences are the line endings
+        # and surrounding whitespace that browsers and the form field change,
+        # so saving without edits isn't taken as a change to the content
+        if original_markdown and normalize_whitespace(markdown) == normalize_whitespace(
+            original_markdown
+        ):
+            return original_markdown
+        return markdown
+
+
+def normalize_whitespace(text):
+    return text.replace("\r\n", "\n").strip()
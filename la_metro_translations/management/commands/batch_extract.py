@@ -5,11 +5,13 @@ from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.db.models import Q, F, Case, When
 
+from la_metro_translations.api.cache import invalidate_file_links
 from la_metro_translations.models import (
     Document,
     DocumentContent,
     DocumentTranslation,
     ExtractionConfig,
+    PendingConversion,
     TranslationConfig,
     TranslationFile,
 )
@@ -108,6 +110,11 @@ class Command(BaseCommand, ConnManagerMixin):
             unique_fields=["document_content", "language"],
             update_fields=["markdown", "approval_status", "updated_at"],
         )
+        PendingConversion.enqueue([t.pk for t in new_english_translations])
+        invalidate_file_links(
+            (content.document.entity_type, content.document.document_id)
+            for content in new_contents
+        )
 
         # Update TranslationFiles
         files_to_upsert = []
@@ -3,11 +3,15 @@ from datetime import datetime
 
 from django.core.management import call_command
 from django.core.management.base import BaseCommand
-from django.db.models import F, Case, When
+from django.db.models import Case, Exists, OuterRef, When
 
+from la_metro_translations.api.cache import invalidate_file_links
 from la_metro_translations.models import (
     DocumentContent,
     DocumentTranslation,
+    ExtractionConfig,
+    PendingConversion,
+    TranslationConfig,
 )
 from la_metro_translations.services import get_translation_service
 from la_metro_translations.management.commands.utils import ConnManagerMixin
@@ -17,24 +21,25 @@ logger = logging.getLogger(__name__)
 
 class Command(BaseCommand, ConnManagerMixin):
     """
-    Translate text from document contents into one of the
+    Translate text from document contents into one or more of the
     supported languages specified by the user.
     """
 
     help = (
         "Translate all DocumentContents that either do not have a "
-        "related DocumentTranslation object in the specificed language, or "
+        "related DocumentTranslation object in the specificed languages, or "
         "have been updated more recently than their DocumentTranslation for "
-        "that language, then upsert its DocumentTranslation."
+        "those languages, then upsert their DocumentTranslations."
     )
 
     def add_arguments(self, parser):
         parser.add_argument(
-            "language",
+            "languages",
+            nargs="+",
             type=str,
             help=(
-                "The non-English language you'd like to translate documents into. "
-                "Must be one we currently support."
+                "The non-English languages you'd like to translate documents into. "
+                "Must be ones we currently support."
             ),
         )
         parser.add_argument(
@@ -47,36 +52,85 @@ class Command(BaseCommand, ConnManagerMixin):
             "--approval_status",
             type=str,
             default="waiting",
-            choices=["waiting", "approved"],
+            choices=["waiting", "approved", "config"],
             help=(
                 "Approval status to set on created or updated translations. "
                 "Defaults to 'waiting'. Pass 'approved' to auto-approve and "
-                "trigger file conversion."
+                "trigger file conversion, or 'config' to use each language's "
+                "auto-approval setting."
+            ),
+        )
+        parser.add_argument(
+            "--convert_docs",
+            action="store_true",
+            help=(
+                "Run convert_docs once translation is done, even if no approved "
+                "translations were written, e.g. to convert translations that "
+                "were approved in bulk."
             ),
         )
 
     def handle(self, **options):
-        approval_status = options["approval_status"]
-
         supported_languages = [
             choice
             for choice in DocumentTranslation.LANGUAGE_CHOICES
             if choice[0] != "eng"
         ]
 
-        user_language = options["language"].title()
-        user_language_value = next(  # ie. "spa"
-            (lang[0] for lang in supported_languages if lang[1] == user_language),
-            None,
-        )
-        if not user_language_value:
-            display_choices = [choice[1] for choice in supported_languages]
-            raise ValueError(
-                f"This suite does not support translations to {user_language}. "
-                f"Currently supported languages are: {', '.join(display_choices)}"
+        languages = []
+        for language in options["languages"]:
+            user_language = language.title()
+            user_language_value = next(  # ie. "spa"
+                (lang[0] for lang in supported_languages if lang[1] == user_language),
+                None,
+            )
+            if not user_language_value:
+                display_choices = [choice[1] for choice in supported_languages]
+                raise ValueError(
+                    f"This suite does not support translations to {user_language}. "
+                    f"Currently supported languages are: {', '.join(display_choices)}"
+                )
+            languages.append((user_language_value, user_language))
+
+        if options["approval_status"] == "config":
+            auto_approved_languages = set(
+                TranslationConfig.objects.filter(
+                    config=ExtractionConfig.load(), auto_approve_translations=True
+                ).values_list("language", flat=True)
+            )
+            approval_statuses = {
+                language: (
+                    "approved" if language in auto_approved_languages else "waiting"
+                )
+                for language, _ in languages
+            }
+        else:
+            approval_statuses = {
+                language: options["approval_status"] for language, _ in languages
+            }
+
+        approved_translation_count = 0
+        for user_language_value, user_language in languages:
+            approval_status = approval_statuses[user_language_value]
+            translation_count = self.translate(
+                user_language_value,
+                user_language,
+                approval_status,
+                options["document_content"],
             )
+            if approval_status == "approved":
+                approved_translation_count += translation_count
 
-        if document_content_id := options["document_content"]:
+        if approved_translation_count or options["convert_docs"]:
+            logger.info("Triggering file conversion for approved translations...")
+            call_command("convert_docs")
+
+        logger.info("--- Finished! ---")
+
+    def translate(
+        self, user_language_value, user_language, approval_status, document_content_id
+    ):
+        if document_content_id:
             contents = DocumentContent.objects.select_related("document").filter(
                 id=document_content_id
             )
@@ -90,6 +144,13 @@ class Command(BaseCommand, ConnManagerMixin):
         else:
             # Get any document contents without translations in this language, or
             # contents that have been updated more recently than their translation.
+            # Both conditions must hold for the same translation, so they're
+            # checked in one subquery, which translation_staleness_idx answers.
+            up_to_date_translations = DocumentTranslation.objects.filter(
+                document_content=OuterRef("pk"),
+                language=user_language_value,
+                updated_at__gte=OuterRef("updated_at"),
+            )
 
             events_first = Case(
                 When(document__entity_type="event", then=0),
@@ -97,17 +158,13 @@ class Command(BaseCommand, ConnManagerMixin):
             )
             contents = (
                 DocumentContent.objects.select_related("document")
-                .exclude(
-                    translations__updated_at__gte=F("updated_at"),
-                    translations__language=user_language_value,
-                )
+                .filter(~Exists(up_to_date_translations))
                 .order_by(events_first)
-                .distinct()
             )
 
         if len(contents) == 0:
             logger.info(f"All Documents have up to date {user_language} translations!")
-            return
+            return 0
         else:
             logger.info(
                 f"Translating {len(contents)} DocumentContent(s) to {user_language}..."
@@ -153,14 +210,14 @@ class Command(BaseCommand, ConnManagerMixin):
             unique_fields=["document_content", "language"],
             update_fields=["markdown", "approval_status", "updated_at"],
         )
+        PendingConversion.enqueue([t.pk for t in new_translations])
+        invalidate_file_links(
+            (content.document.entity_type, content.document.document_id)
+            for content in contents
+        )
 
         logger.info(
             f"DocumentContents with updated {user_language} translations: "
             f"{len(new_translations)} out of {len(contents)}"
         )
-
-        if approval_status == "approved":
-            logger.info("Triggering file conversion for approved translations...")
-            call_command("convert_docs")
-
-        logger.info("--- Finished! ---")
+        return len(new_translations)
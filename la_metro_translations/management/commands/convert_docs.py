@@ -1,15 +1,24 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from django.core.management.base import BaseCommand
-from django.db.models import OuterRef, Subquery
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
 from tqdm import tqdm
 
-from la_metro_translations.models import DocumentTranslation, TranslationFile
+from la_metro_translations.api.cache import invalidate_file_links
+from la_metro_translations.models import (
+    DocumentTranslation,
+    PendingConversion,
+    TranslationFile,
+)
 from la_metro_translations.services import (
     DocumentTranslationConverter,
     DocumentTranslationConverterError,
 )
-from la_metro_translations.management.commands.utils import ConnManagerMixin
+from la_metro_translations.management.commands.utils import (
+    ConnManagerMixin,
+    worker_name,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,108 +29,210 @@ class Command(BaseCommand, ConnManagerMixin):
     def add_arguments(self, parser):
         parser.add_argument(
             "--document_translation",
+            nargs="+",
             type=int,
             default=None,
-            help="The ID of the document translation to convert.",
+            help="The IDs of the document translations to convert.",
+        )
+        parser.add_argument(
+            "--rescan",
+            action="store_true",
+            help=(
+                "Scan every translation for outdated files and queue them for "
+                "conversion before draining the queue."
+            ),
+        )
+        parser.add_argument(
+            "--chunk_size",
+            type=int,
+            default=50,
+            help=(
+                "How many queued translations to claim at a time. Smaller chunks "
+                "spread the queue more evenly across concurrent workers."
+            ),
+        )
+        parser.add_argument(
+            "--lease_minutes",
+            type=int,
+            default=30,
+            help=(
+                "How long a claim lasts before another worker may take over the "
+                "translation. Claims are renewed while a chunk is converting."
+            ),
         )
 
     def handle(self, *args, **options):
         """
         Creates up to date RTF and PDF translation files for those that need them.
         """
-        document_translation_id = options["document_translation"]
-
-        if document_translation_id:
-            self.convert_doc(document_translation_id)
+        document_translation_ids = options["document_translation"]
+        # call_command passes a single ID through as-is
+        if isinstance(document_translation_ids, int):
+            document_translation_ids = [document_translation_ids]
+        self.worker = worker_name()
+        self.lease = timedelta(minutes=options["lease_minutes"])
+
+        if document_translation_ids:
+            for document_translation_id in document_translation_ids:
+                try:
+                    self.convert_doc(document_translation_id)
+                except (
+                    DocumentTranslation.DoesNotExist,
+                    DocumentTranslationConverterError,
+                ) as e:
+                    logger.error(
+                        f"Error converting translation {document_translation_id}: {e}"
+                    )
 
         else:
-            self.convert_docs()
+            if options["rescan"]:
+                self.enqueue_outdated()
+            self.convert_docs(options["chunk_size"])
 
     def convert_doc(self, document_translation_id):
-        doc = DocumentTranslation.objects.get(id=document_translation_id)
+        claimed_at = timezone.now()
+        is_queued = PendingConversion.objects.filter(
+            document_translation_id=document_translation_id
+        ).exists()
+        if is_queued and not PendingConversion.claim(
+            self.worker, self.lease, document_translation_id=document_translation_id
+        ):
+            logger.info(
+                f"Translation {document_translation_id} is already being converted "
+                "by another worker"
+            )
+            return
+
+        doc = DocumentTranslation.objects.prefetch_related("files").get(
+            id=document_translation_id
+        )
         converter = DocumentTranslationConverter(doc)
         files_to_create = [converter.convert_to_rtf()]
         if doc.language != "eng":
             files_to_create.append(converter.convert_to_pdf())
         self.bulk_create_translation_files(files_to_create)
 
-    def convert_docs(self):
-        files_to_create = []
-        chunk_size = 500
+        PendingConversion.complete(self.worker, claimed_at, [document_translation_id])
 
-        # Create RTFs
-        up_to_date_rtfs = TranslationFile.objects.filter(
-            format="rtf",
-            updated_at__gte=OuterRef("updated_at"),
-            document_translation=OuterRef("pk"),
-        )
+    def enqueue_outdated(self):
+        """
+        Queue every translation missing an up to date RTF, or missing an up to
+        date PDF if it isn't English.
+        """
 
-        logger.info("Checking for translations that need up to date RTFs...")
-        rtf_qs = DocumentTranslation.objects.exclude(
-            pk__in=Subquery(up_to_date_rtfs.values("document_translation")),
-        ).select_related("document_content__document")
-        self.batch_convert(rtf_qs, "rtf", files_to_create, chunk_size)
-
-        # Create PDFs
-        up_to_date_pdfs = TranslationFile.objects.filter(
-            format="pdf",
-            updated_at__gte=OuterRef("updated_at"),
-            document_translation=OuterRef("pk"),
+        def up_to_date_files(file_format):
+            return TranslationFile.objects.filter(
+                format=file_format,
+                updated_at__gte=OuterRef("updated_at"),
+                document_translation=OuterRef("pk"),
+            )
+
+        # Each format is checked in its own query, rather than ORing the checks,
+        # so Postgres can anti-join against file_staleness_idx instead of
+        # probing it once per translation
+        missing_rtf = DocumentTranslation.objects.filter(
+            ~Exists(up_to_date_files("rtf"))
+        )
+        missing_pdf = DocumentTranslation.objects.exclude(language="eng").filter(
+            ~Exists(up_to_date_files("pdf"))
         )
 
-        logger.info("Checking for translations that need up to date PDFs...")
-        pdf_qs = (
-            DocumentTranslation.objects.exclude(
-                pk__in=Subquery(up_to_date_pdfs.values("document_translation"))
-            )
-            .exclude(language="eng")
-            .select_related("document_content__document")
+        logger.info("Checking for translations that need up to date files...")
+        outdated_ids = (
+            missing_rtf.order_by()
+            .values_list("pk", flat=True)
+            .union(missing_pdf.order_by().values_list("pk", flat=True))
         )
-        self.batch_convert(pdf_qs, "pdf", files_to_create, chunk_size)
 
-        logger.info("--- Conversion finished! ---")
+        queued = PendingConversion.enqueue(outdated_ids.iterator())
+        logger.info(f"Queued {len(queued)} translation(s) for conversion")
 
-    def batch_convert(self, translation_qs, file_format, files_to_create, chunk_size):
-        """
-        Converts files in batches and resets the db connection in between each batch.
-        Also clears in-memory files to maintain acceptable level of Heroku memory usage.
-        """
-        total = translation_qs.count()
+    def convert_docs(self, chunk_size):
+        failed_ids = set()
+
+        total = PendingConversion.unclaimed().count()
         if total == 0:
-            logger.info(f"All translations have up to date {file_format}s!")
+            logger.info("No translations are waiting for conversion!")
             return
 
-        last_pk = 0  # the last item processed in the previous loop
-
-        # Perform batch queries until we get to the end of the main qs
+        # Claim batches until no unclaimed translations are left. Failed
+        # translations keep their claim, so they're retried once it expires.
         with tqdm(total=total) as progress:
             while True:
                 self.reset_db_connections()
-                batch = list(
-                    translation_qs.filter(pk__gt=last_pk).order_by("pk")[:chunk_size]
-                )
+                claimed_at = timezone.now()
+                batch = self.claim_batch(chunk_size)
                 if not batch:
                     break
+
+                files_to_create = []
+                converted_ids = []
+                renewed_at = claimed_at
                 for doc in batch:
-                    try:
-                        if file_format == "rtf":
-                            converted_file = DocumentTranslationConverter(
-                                doc
-                            ).convert_to_rtf()
+                    if timezone.now() - renewed_at > self.lease / 2:
+                        renewed_at = timezone.now()
+                        PendingConversion.renew(
+                            self.worker, self.lease, [d.pk for d in batch]
+                        )
+
+                    for file_format in self.get_outdated_formats(doc):
+                        try:
+                            converted_file = self.convert(doc, file_format)
+                        except DocumentTranslationConverterError as e:
+                            logger.error(
+                                f"Error converting {doc} to {file_format}: {e}"
+                            )
+                            failed_ids.add(doc.pk)
                         else:
-                            converted_file = DocumentTranslationConverter(
-                                doc
-                            ).convert_to_pdf()
-                    except DocumentTranslationConverterError as e:
-                        logger.error(f"Error converting {doc} to {file_format}: {e}")
-                    else:
-                        files_to_create.append(converted_file)
+                            files_to_create.append(converted_file)
+                    if doc.pk not in failed_ids:
+                        converted_ids.append(doc.pk)
                     progress.update(1)
 
-                # Create files, and prepare for next batch
-                last_pk = batch[-1].pk
-                self.bulk_create_translation_files(files_to_create)
-                del files_to_create[:]
+                if files_to_create:
+                    self.bulk_create_translation_files(files_to_create)
+                PendingConversion.complete(self.worker, claimed_at, converted_ids)
+
+        if failed_ids:
+            logger.info(
+                f"{len(failed_ids)} translation(s) failed and will be retried "
+                f"after {self.lease}"
+            )
+
+        logger.info("--- Conversion finished! ---")
+
+    def claim_batch(self, chunk_size):
+        """
+        Claim a batch of queued translations for this worker and return them.
+        Translations claimed by another convert_docs worker are skipped.
+        """
+        claimed_ids = PendingConversion.claim(self.worker, self.lease, chunk_size)
+        if not claimed_ids:
+            return []
+
+        return list(
+            DocumentTranslation.objects.filter(pk__in=claimed_ids)
+            .select_related("document_content__document")
+            .prefetch_related("files")
+            .order_by("pk")
+        )
+
+    def get_outdated_formats(self, doc):
+        """
+        Return the file formats this translation needs, minus any with a file
+        that's at least as new as the translation.
+        """
+        file_formats = ["rtf"] if doc.language == "eng" else ["rtf", "pdf"]
+        up_to_date = {
+            f.format for f in doc.files.all() if f.updated_at >= doc.updated_at
+        }
+        return [f for f in file_formats if f not in up_to_date]
+
+    def convert(self, doc, file_format):
+        converter = DocumentTranslationConverter(doc)
+        if file_format == "rtf":
+            return converter.convert_to_rtf()
+        return converter.convert_to_pdf()
 
     def bulk_create_translation_files(self, files_to_create):
         for file in files_to_create:
@@ -132,7 +243,13 @@ class Command(BaseCommand, ConnManagerMixin):
             files_to_create,
             update_conflicts=True,
             unique_fields=["document_translation", "format"],
-            update_fields=["file", "updated_at"],
+            update_fields=["file", "checksum", "updated_at"],
         )
 
+        documents = [
+            file.document_translation.document_content.document
+            for file in files_to_create
+        ]
+        invalidate_file_links((doc.entity_type, doc.document_id) for doc in documents)
+
         logger.info(f"Created a total of {len(files_to_create)} up-to-date files")
@@ -0,0 +1,97 @@
+import logging
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from la_metro_translations.api.ingestion import (
+    DocumentIngestionError,
+    ingest_documents,
+    total_counts,
+)
+from la_metro_translations.models import DocumentIngestion
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Validate and upsert a batch of documents received from BoardAgendas.
+    If the ingestion asks for it, chains into batch_extract upon success.
+    """
+
+    help = (
+        "Validate and upsert the documents saved on a DocumentIngestion, then "
+        "optionally run batch_extract on them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ingestion",
+            type=int,
+            required=True,
+            help="The ID of the document ingestion to run.",
+        )
+        parser.add_argument(
+            "--lease_minutes",
+            type=int,
+            default=30,
+            help=(
+                "How long a claim lasts before a retried job may take over the "
+                "ingestion. Claims aren't renewed, so this should be longer than "
+                "an ingestion takes."
+            ),
+        )
+
+    def handle(self, **options):
+        ingestion_id = options["ingestion"]
+
+        # Mark the ingestion as running, unless another job is already running it
+        lease = timedelta(minutes=options["lease_minutes"])
+        if not DocumentIngestion.claim(ingestion_id, lease):
+            logger.info(
+                f"Document ingestion {ingestion_id} isn't pending or is already "
+                "running. Skipping."
+            )
+            return
+
+        ingestion = DocumentIngestion.objects.get(id=ingestion_id)
+        try:
+            ingestion.chunk_counts = ingest_documents(iter(ingestion.payload))
+            ingestion.status = "succeeded"
+            ingestion.errors = None
+        except DocumentIngestionError as e:
+            logger.error(f"{ingestion} has invalid documents in chunk {e.chunk}")
+            ingestion.status = "failed"
+            ingestion.errors = {"chunk": e.chunk, "documents": e.errors}
+        except Exception as e:
+            # Errors other than invalid documents may be transient, so leave the
+            # ingestion for the job to be retried. Upserts are idempotent, so
+            # chunks written before the error are safe to write again.
+            ingestion.status = "pending"
+            ingestion.errors = {"detail": str(e)}
+            ingestion.claimed_until = None
+            ingestion.save()
+            raise
+
+        ingestion.claimed_until = None
+        ingestion.finished_at = timezone.now()
+        ingestion.save()
+
+        totals = total_counts(ingestion.chunk_counts)
+        logger.info(
+            f"Ingested {len(ingestion.chunk_counts)} chunk(s) of documents: "
+            f"{totals['created']} created, {totals['changed']} changed, "
+            f"{totals['unchanged']} unchanged"
+        )
+
+        if ingestion.status == "succeeded" and ingestion.extract:
+            # Unchanged documents already have up to date content
+            if totals["created"] or totals["changed"]:
+                logger.info("Extracting content from ingested documents...")
+                call_command("batch_extract")
+            else:
+                logger.info("No documents changed. Not performing extraction.")
+
+        logger.info("--- Finished! ---")
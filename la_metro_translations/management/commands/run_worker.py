@@ -0,0 +1,113 @@
+import logging
+import signal
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from la_metro_translations.backends import MERGED_JOB_OPTIONS
+from la_metro_translations.management.commands.utils import (
+    ConnManagerMixin,
+    worker_name,
+)
+from la_metro_translations.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand, ConnManagerMixin):
+    """
+    Run jobs queued by the database job backend, one at a time, until stopped.
+    Run several workers to run several jobs at once; JOB_CONCURRENCY_LIMITS
+    caps how many jobs of each command run at once across all workers.
+    """
+
+    help = "Run jobs from the database job queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once there are no jobs due, instead of waiting for more.",
+        )
+        parser.add_argument(
+            "--poll_seconds",
+            type=float,
+            default=5,
+            help="How long to wait before checking for jobs again when none are due.",
+        )
+        parser.add_argument(
+            "--lease_minutes",
+            type=int,
+            default=10,
+            help=(
+                "How long a claim lasts before another worker may take over the "
+                "job. Claims are renewed while the job is running."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.worker = worker_name()
+        self.lease = timedelta(minutes=options["lease_minutes"])
+        self.stopping = threading.Event()
+
+        # Finish the current job on shutdown, e.g. when a dyno restarts
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stopping.set())
+
+        logger.info(f"Worker {self.worker} started")
+        while not self.stopping.is_set():
+            job = Job.claim(
+                self.worker,
+                self.lease,
+                settings.JOB_CONCURRENCY_LIMITS,
+                MERGED_JOB_OPTIONS,
+            )
+            if job:
+                self.run_job(job)
+            elif options["burst"]:
+                break
+            else:
+                self.stopping.wait(options["poll_seconds"])
+
+        logger.info(f"Worker {self.worker} stopped")
+
+    def run_job(self, job):
+        logger.info(f"Running {job} (attempt {job.attempts} of {job.max_attempts})")
+        heartbeat_stopped = threading.Event()
+        heartbeat = threading.Thread(
+            target=self.renew_claim, args=(job, heartbeat_stopped), daemon=True
+        )
+        heartbeat.start()
+
+        start = time.monotonic()
+        try:
+            call_command(job.command, *job.args, **job.options)
+        except Exception:
+            logger.exception(f"{job} failed")
+            heartbeat_stopped.set()
+            heartbeat.join()
+            job.fail(self.worker, traceback.format_exc())
+        else:
+            heartbeat_stopped.set()
+            heartbeat.join()
+            job.succeed(self.worker)
+            logger.info(f"{job} finished in {time.monotonic() - start:.1f} seconds")
+        finally:
+            # Don't carry a connection left broken by the job into the next one
+            self.reset_db_connections()
+
+    def renew_claim(self, job, stopped):
+        """
+        Renew this worker's claim on job until stopped is set.
+        """
+        try:
+            while not stopped.wait(self.lease.total_seconds() / 3):
+                job.renew(self.worker, self.lease)
+        finally:
+            connection.close()
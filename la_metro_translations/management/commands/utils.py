@@ -1,6 +1,18 @@
+import os
+import socket
+import uuid
+
 from django.db import connections
 
 
+def worker_name():
+    """
+    Return a name for this worker that's unique across hosts, processes and
+    runs, for claiming rows in the database.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
 class ConnManagerMixin:
     @staticmethod
     def reset_db_connections():
@@ -0,0 +1,90 @@
+import base64
+import hashlib
+import re
+from itertools import islice
+
+from django.urls import reverse
+
+# Inline images, as extracted by OCR, e.g. ![img-0.jpeg](data:image/jpeg;base64,...)
+DATA_URI_IMAGE_PATTERN = re.compile(
+    r"!\[(?P<alt>[^\]]*)\]\((?P<uri>data:(?P<mime_type>image/[\w.+-]+);base64,"
+    r"(?P<data>[^)\s]+))\)"
+)
+
+# Placeholders that stand in for inline images in the admin editor
+PLACEHOLDER_IMAGE_PATTERN = re.compile(
+    r"!\[(?P<alt>[^\]]*)\]\((?P<url>[^)\s]*/markdown-images/\w+/\d+/\d+/"
+    r"(?P<digest>[0-9a-f]+)/)\)"
+)
+
+
+def image_digest(uri):
+    return hashlib.sha256(uri.encode()).hexdigest()[:16]
+
+
+def get_images(markdown):
+    """
+    Return the inline images in markdown, in order, as regex matches.
+    """
+    return list(DATA_URI_IMAGE_PATTERN.finditer(markdown or ""))
+
+
+def replace_images_with_placeholders(markdown, instance):
+    """
+    Swap each inline image in markdown for a link to the image on the
+    markdown_image view, so the admin editor loads images on demand instead of
+    receiving them in the page.
+    """
+    index = -1
+
+    def placeholder(match):
+        nonlocal index
+        index += 1
+        url = reverse(
+            "markdown_image",
+            args=[
+                instance._meta.model_name,
+                instance.pk,
+                index,
+                image_digest(match["uri"]),
+            ],
+        )
+        return f"![{match['alt']}]({url})"
+
+    return DATA_URI_IMAGE_PATTERN.sub(placeholder, markdown or "")
+
+
+def restore_images(markdown, original_markdown):
+    """
+    Swap placeholders in edited markdown back for the inline images they stand
+    in for in original_markdown. Placeholders are matched on a digest of the
+    image, so images that were moved or removed while editing stay that way.
+    Placeholders for images that aren't in original_markdown are left as is.
+    """
+    images = {
+        image_digest(image["uri"]): image["uri"]
+        for image in get_images(original_markdown)
+    }
+
+    def restore(match):
+        uri = images.get(match["digest"])
+        if uri is None:
+            return match[0]
+        return f"![{match['alt']}]({uri})"
+
+    return PLACEHOLDER_IMAGE_PATTERN.sub(restore, markdown or "")
+
+
+def get_image(markdown, index, digest):
+    """
+    Return the content type and bytes of the inline image at index in
+    markdown, or None if it's not there or doesn't match digest.
+    """
+    # Stop scanning once the image is found
+    image = next(
+        islice(DATA_URI_IMAGE_PATTERN.finditer(markdown or ""), index, None), None
+    )
+    if image is None or image_digest(image["uri"]) != digest:
+        return None
+
+    return image["mime_type"], base64.b64decode(image["data"])
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.7 on 2026-10-19 06:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('la_metro_translations', '0024_alter_linktext_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='translationfile',
+            name='checksum',
+            field=models.CharField(blank=True, help_text="SHA-256 digest of the stored file's contents."),
+        ),
+    ]
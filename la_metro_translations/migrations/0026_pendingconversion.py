@@ -0,0 +1,53 @@
+# Generated by Django 6.0.7 on 2026-10-19 06:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef, Q
+
+
+def queue_outdated_translations(apps, schema_editor):
+    """Queue every translation that convert_docs would have found outdated"""
+    DocumentTranslation = apps.get_model("la_metro_translations.DocumentTranslation")
+    PendingConversion = apps.get_model("la_metro_translations.PendingConversion")
+    TranslationFile = apps.get_model("la_metro_translations.TranslationFile")
+
+    def up_to_date_files(file_format):
+        return TranslationFile.objects.filter(
+            format=file_format,
+            updated_at__gte=OuterRef("updated_at"),
+            document_translation=OuterRef("pk"),
+        )
+
+    outdated_ids = DocumentTranslation.objects.filter(
+        ~Exists(up_to_date_files("rtf"))
+        | (~Q(language="eng") & ~Exists(up_to_date_files("pdf")))
+    ).values_list("pk", flat=True)
+
+    PendingConversion.objects.bulk_create(
+        [PendingConversion(document_translation_id=pk) for pk in outdated_ids],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('la_metro_translations', '0025_translationfile_checksum'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingConversion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('queued_at', models.DateTimeField(auto_now=True, help_text='Date this translation was last queued for conversion.')),
+                ('document_translation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='pending_conversion', to='la_metro_translations.documenttranslation')),
+            ],
+            options={
+                'ordering': ['queued_at'],
+            },
+        ),
+        migrations.RunPython(
+            queue_outdated_translations, migrations.RunPython.noop
+        ),
+    ]
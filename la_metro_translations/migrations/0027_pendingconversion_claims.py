@@ -0,0 +1,23 @@
+# Generated by Django 6.0.7 on 2026-10-19 06:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('la_metro_translations', '0026_pendingconversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingconversion',
+            name='claimed_by',
+            field=models.CharField(blank=True, help_text='The convert_docs worker converting this translation.'),
+        ),
+        migrations.AddField(
+            model_name='pendingconversion',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, help_text="Date the worker's claim on this translation expires.", null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.7 on 2026-10-19 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('la_metro_translations', '0027_pendingconversion_claims'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentIngestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.JSONField(help_text='Document details as sent by BoardAgendas.')),
+                ('extract', models.BooleanField(default=False, help_text='Run batch_extract once the documents have been ingested.')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending')),
+                ('chunk_counts', models.JSONField(blank=True, default=list, help_text='Number of documents upserted per chunk.')),
+                ('errors', models.JSONField(blank=True, help_text='Validation errors, if ingestion failed.', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date this ingestion was received.')),
+                ('finished_at', models.DateTimeField(blank=True, help_text='Date this ingestion finished running.', null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.7 on 2026-10-19 07:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('la_metro_translations', '0028_documentingestion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='documentingestion',
+            name='chunk_counts',
+            field=models.JSONField(blank=True, default=list, help_text='Created, changed and unchanged document counts per chunk.'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.7 on 2026-10-19 07:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('la_metro_translations', '0029_alter_documentingestion_chunk_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('command', models.CharField(help_text='The management command to run.')),
+                ('args', models.JSONField(blank=True, default=list, help_text='Positional arguments for the command.')),
+                ('options', models.JSONField(blank=True, default=dict, help_text='Options for the command.')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued')),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='How many times this job has been started.')),
+                ('max_attempts', models.PositiveIntegerField(default=3, help_text='How many times to start this job before giving up.')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='Date this job may next be started.')),
+                ('claimed_by', models.CharField(blank=True, help_text='The worker running this job.')),
+                ('claimed_until', models.DateTimeField(blank=True, help_text="Date the worker's claim on this job expires.", null=True)),
+                ('last_error', models.TextField(blank=True, help_text="The error from this job's last failed attempt.")),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Date this job was queued.')),
+                ('finished_at', models.DateTimeField(blank=True, help_text='Date this job succeeded or gave up.', null=True)),
+            ],
+            options={
+                'ordering': ['run_after', 'pk'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='la_metro_tr_status_eaad65_idx')],
+            },
+        ),
+    ]
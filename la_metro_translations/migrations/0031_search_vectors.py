@@ -0,0 +1,43 @@
+# Generated by Django 6.0.7 on 2026-10-19 07:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('la_metro_translations', '0030_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('title', config='english'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddField(
+            model_name='documentcontent',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector(django.db.models.functions.text.Left(models.Func(models.F('markdown'), models.Value('!\\[[^\\]]*\\]\\(data:[^)]*\\)'), models.Value(''), models.Value('g'), function='regexp_replace'), 500000), config='english'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddField(
+            model_name='documenttranslation',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(language='eng', then=django.contrib.postgres.search.SearchVector(django.db.models.functions.text.Left(models.Func(models.F('markdown'), models.Value('!\\[[^\\]]*\\]\\(data:[^)]*\\)'), models.Value(''), models.Value('g'), function='regexp_replace'), 500000), config='english')), models.When(language='rus', then=django.contrib.postgres.search.SearchVector(django.db.models.functions.text.Left(models.Func(models.F('markdown'), models.Value('!\\[[^\\]]*\\]\\(data:[^)]*\\)'), models.Value(''), models.Value('g'), function='regexp_replace'), 500000), config='russian')), models.When(language='spa', then=django.contrib.postgres.search.SearchVector(django.db.models.functions.text.Left(models.Func(models.F('markdown'), models.Value('!\\[[^\\]]*\\]\\(data:[^)]*\\)'), models.Value(''), models.Value('g'), function='regexp_replace'), 500000), config='spanish')), default=django.contrib.postgres.search.SearchVector(django.db.models.functions.text.Left(models.Func(models.F('markdown'), models.Value('!\\[[^\\]]*\\]\\(data:[^)]*\\)'), models.Value(''), models.Value('g'), function='regexp_replace'), 500000), config='simple'), output_field=django.contrib.postgres.search.SearchVectorField()), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='document_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentcontent',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='document_content_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documenttranslation',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='translation_search_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.7 on 2026-10-19 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('la_metro_translations', '0031_search_vectors'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['entity_type', 'document_id'], name='document_entity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentcontent',
+            index=models.Index(condition=models.Q(('approval_status', 'waiting')), fields=['-updated_at'], name='waiting_content_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documenttranslation',
+            index=models.Index(fields=['language', 'document_content', 'updated_at'], name='translation_staleness_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documenttranslation',
+            index=models.Index(condition=models.Q(('approval_status', 'waiting')), fields=['-updated_at'], name='waiting_translation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='translationfile',
+            index=models.Index(fields=['format', 'document_translation', 'updated_at'], name='file_staleness_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.7 on 2026-10-19 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('la_metro_translations', '0032_staleness_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentingestion',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, help_text="Date the running job's claim on this ingestion expires.", null=True),
+        ),
+        migrations.AlterField(
+            model_name='documentingestion',
+            name='errors',
+            field=models.JSONField(blank=True, help_text="Validation errors, if ingestion failed, or the error from the last attempt, if it's waiting to be retried.", null=True),
+        ),
+    ]
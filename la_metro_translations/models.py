@@ -1,11 +1,26 @@
 import re
+from datetime import timedelta
 
 from django.conf import settings
-from la_metro_translations.backends import get_backend
-from django.db import models
+from la_metro_translations.api.cache import (
+    invalidate_all_file_links,
+    invalidate_file_links,
+)
+from la_metro_translations.backends import get_backend, merge_job_options
+from la_metro_translations.forms import MarkdownImagesForm
+from la_metro_translations.search import (
+    SEARCH_CONFIGS,
+    language_markdown_search_vector,
+    markdown_search_vector,
+)
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import connection, models, transaction
+from django.db.models import Count, Q
 from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
+from django.utils import timezone
 from django.utils.formats import date_format
 
 from modelcluster.fields import ParentalKey
@@ -72,6 +87,55 @@ class AdminDisplayMixin:
     edit_link_display.short_description = "Edit Link"
 
 
+class FieldTrackerMixin:
+    """
+    Remember the values of tracked_fields as of the last load from or save to
+    the database, so save() hooks can tell what changed without querying for
+    the stored object.
+    """
+
+    tracked_fields = []
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_tracked_fields()
+        return instance
+
+    def refresh_from_db(self, *args, fields=None, **kwargs):
+        super().refresh_from_db(*args, fields=fields, **kwargs)
+        self.snapshot_tracked_fields(fields)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.snapshot_tracked_fields()
+
+    def snapshot_tracked_fields(self, fields=None):
+        deferred = self.get_deferred_fields()
+        tracked_values = getattr(self, "_tracked_values", {})
+        for field in self.tracked_fields:
+            if field not in deferred and (fields is None or field in fields):
+                tracked_values[field] = getattr(self, field)
+        self._tracked_values = tracked_values
+
+    def get_original_value(self, field):
+        """
+        Return the value of a tracked field as last loaded or saved, or None if
+        it's unknown.
+        """
+        return getattr(self, "_tracked_values", {}).get(field)
+
+    def has_changed(self, field):
+        """
+        Whether a tracked field differs from its last loaded or saved value.
+        Fields with unknown original values count as changed.
+        """
+        tracked_values = getattr(self, "_tracked_values", {})
+        return field not in tracked_values or tracked_values[field] != getattr(
+            self, field
+        )
+
+
 class Document(AdminDisplayMixin, models.Model):
     """
     Details on an original source document.
@@ -84,6 +148,13 @@ class Document(AdminDisplayMixin, models.Model):
                 name="unique_document",
             )
         ]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="document_search_idx"),
+            # File link lookups by BoardAgendas entity
+            models.Index(
+                fields=["entity_type", "document_id"], name="document_entity_idx"
+            ),
+        ]
         ordering = ["entity_type", "title"]
 
     DOCUMENT_TYPE_CHOICES = [
@@ -119,6 +190,11 @@ class Document(AdminDisplayMixin, models.Model):
     entity_slug = models.CharField(
         help_text="Slug to view this entity on the BoardAgendas app",
     )
+    search_vector = models.GeneratedField(
+        expression=SearchVector("title", config=SEARCH_CONFIGS["eng"]),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     def __str__(self):
         return f"{self.get_entity_type_display()} - {self.title}"
@@ -160,12 +236,21 @@ class Document(AdminDisplayMixin, models.Model):
     source_url_display.short_description = "Source URL"
 
 
-class DocumentContent(AdminDisplayMixin, models.Model):
+class DocumentContent(AdminDisplayMixin, FieldTrackerMixin, models.Model):
     """
     The extracted, untranslated content from a document, saved as markdown.
     """
 
     class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="document_content_search_idx"),
+            # Content waiting for review, newest first, and config catch-ups
+            models.Index(
+                fields=["-updated_at"],
+                condition=Q(approval_status="waiting"),
+                name="waiting_content_idx",
+            ),
+        ]
         ordering = ["-updated_at"]
 
     APPROVAL_STATUS_CHOICES = [
@@ -174,6 +259,10 @@ class DocumentContent(AdminDisplayMixin, models.Model):
         ("revision", "Needs Revision"),
     ]
 
+    tracked_fields = ["markdown", "approval_status"]
+
+    base_form_class = MarkdownImagesForm
+
     markdown = MarkdownField()
     approval_status = models.CharField(
         choices=APPROVAL_STATUS_CHOICES, default="waiting"
@@ -187,6 +276,11 @@ class DocumentContent(AdminDisplayMixin, models.Model):
     document = models.OneToOneField(
         Document, on_delete=models.CASCADE, related_name="content"
     )
+    search_vector = models.GeneratedField(
+        expression=markdown_search_vector(SEARCH_CONFIGS["eng"]),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     def __str__(self):
         return (
@@ -195,17 +289,18 @@ class DocumentContent(AdminDisplayMixin, models.Model):
 
     def save(self, *args, **kwargs):
         if self.pk:
-            original_obj = type(self).objects.get(pk=self.pk)
+            content_changed = self.has_changed("markdown")
+            content_approved = self.get_original_value("approval_status") != "approved"
 
             super().save(*args, **kwargs)
 
             # Sync English translation content and status with document content & status
-            english_translation = self.translations.filter(language="eng")
-
-            if english_translation.exists():
-                english_translation.update(
-                    markdown=self.markdown, approval_status=self.approval_status
-                )
+            self.translations.filter(language="eng").update(
+                markdown=self.markdown, approval_status=self.approval_status
+            )
+            invalidate_file_links(
+                [(self.document.entity_type, self.document.document_id)]
+            )
 
             # If document content needs revision, so do translations
             if self.approval_status == "revision":
@@ -216,35 +311,22 @@ class DocumentContent(AdminDisplayMixin, models.Model):
             # If document content has changed, or if document content is newly approved,
             # trigger translation with approval status determined by language config
             elif self.approval_status == "approved":
-
-                content_changed = original_obj.markdown != self.markdown
-                content_approved = original_obj.approval_status != "approved"
-
                 if content_changed or content_approved:
-                    config = ExtractionConfig.load()
-
-                    for (
-                        language_code,
-                        language_display,
-                    ) in DocumentTranslation.LANGUAGE_CHOICES:
-                        if language_code == "eng":
-                            continue
-
-                        lang_config = config.language_configs.filter(
-                            language=language_code
-                        ).first()
-                        translation_approval_status = (
-                            "approved"
-                            if lang_config and lang_config.auto_approve_translations
-                            else "waiting"
-                        )
-
-                        get_backend().start_job(
+                    # Translate into every language with one job, once this save
+                    # is committed
+                    language_displays = [
+                        display
+                        for code, display in DocumentTranslation.LANGUAGE_CHOICES
+                        if code != "eng"
+                    ]
+                    transaction.on_commit(
+                        lambda: get_backend().start_unique_job(
                             "batch_translate",
-                            language_display,
+                            *language_displays,
                             document_content=self.id,
-                            approval_status=translation_approval_status,
+                            approval_status="config",
                         )
+                    )
 
         else:
             return super().save(*args, **kwargs)
@@ -262,11 +344,21 @@ class DocumentContent(AdminDisplayMixin, models.Model):
         )
         files_btns = files_btn_fragment.format(self.document.source_url, "Original PDF")
 
-        try:
-            rtf = self.translations.get(language="eng").files.get(format="rtf")
-        except (DocumentTranslation.DoesNotExist, TranslationFile.DoesNotExist):
-            pass
+        # Read from prefetched translations and files when the view supplies
+        # them, otherwise only load the English translation's
+        if "translations" in getattr(self, "_prefetched_objects_cache", {}):
+            english = next(
+                (t for t in self.translations.all() if t.language == "eng"), None
+            )
         else:
+            english = self.translations.filter(language="eng").first()
+
+        rtf = (
+            next((f for f in english.files.all() if f.format == "rtf"), None)
+            if english
+            else None
+        )
+        if rtf:
             files_btns += files_btn_fragment.format(
                 rtf.get_file_url(), rtf.format.upper()
             )
@@ -279,7 +371,7 @@ class DocumentContent(AdminDisplayMixin, models.Model):
     file_formats_display.short_description = "File Formats"
 
 
-class DocumentTranslation(AdminDisplayMixin, models.Model):
+class DocumentTranslation(AdminDisplayMixin, FieldTrackerMixin, models.Model):
     """
     The translated version of a document's extracted content.
     """
@@ -291,6 +383,21 @@ class DocumentTranslation(AdminDisplayMixin, models.Model):
                 name="unique_translation",
             )
         ]
+        indexes = [
+            GinIndex(fields=["search_vector"], name="translation_search_idx"),
+            # batch_translate's check for up to date translations in a language,
+            # answered from the index alone
+            models.Index(
+                fields=["language", "document_content", "updated_at"],
+                name="translation_staleness_idx",
+            ),
+            # Translations waiting for review, newest first, and config catch-ups
+            models.Index(
+                fields=["-updated_at"],
+                condition=Q(approval_status="waiting"),
+                name="waiting_translation_idx",
+            ),
+        ]
         ordering = ["-updated_at"]
 
     # Language codes based on ISO 639-3 standards
@@ -312,6 +419,10 @@ class DocumentTranslation(AdminDisplayMixin, models.Model):
         ("revision", "Needs Revision"),
     ]
 
+    tracked_fields = ["markdown", "approval_status"]
+
+    base_form_class = MarkdownImagesForm
+
     markdown = MarkdownField()
     language = models.CharField(choices=LANGUAGE_CHOICES)
     approval_status = models.CharField(
@@ -326,6 +437,11 @@ class DocumentTranslation(AdminDisplayMixin, models.Model):
     document_content = models.ForeignKey(
         DocumentContent, on_delete=models.CASCADE, related_name="translations"
     )
+    search_vector = models.GeneratedField(
+        expression=language_markdown_search_vector(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     def __str__(self):
         language = self.get_language_display()
@@ -336,22 +452,69 @@ class DocumentTranslation(AdminDisplayMixin, models.Model):
 
     def save(self, *args, **kwargs):
         if self.pk:
-            original_obj = type(self).objects.get(pk=self.pk)
+            content_changed = self.has_changed("markdown")
+            content_approved = self.get_original_value("approval_status") != "approved"
             super().save(*args, **kwargs)
 
+            # Queue this translation so convert_docs can check whether its files
+            # are out of date
+            PendingConversion.enqueue([self.pk])
+            self.invalidate_file_links()
+
             # Create files for translations if content changes or status
-            # changes to approved
+            # changes to approved, once this save is committed
             if self.approval_status == "approved":
-                content_changed = original_obj.markdown != self.markdown
-                content_approved = original_obj.approval_status != "approved"
-
                 if content_changed or content_approved:
-                    get_backend().start_job(
-                        "convert_docs", document_translation=self.id
+                    transaction.on_commit(
+                        lambda: get_backend().start_job(
+                            "convert_docs", document_translation=self.id
+                        )
                     )
 
         else:
-            return super().save(*args, **kwargs)
+            super().save(*args, **kwargs)
+            PendingConversion.enqueue([self.pk])
+            self.invalidate_file_links()
+
+    @classmethod
+    def approve_waiting(cls, **filters):
+        """
+        Approve every waiting translation matching filters, and queue them for
+        conversion since the update skips save(), in one statement so their IDs
+        never leave the database. Returns the number of translations approved.
+        """
+        waiting = cls.objects.filter(approval_status="waiting", **filters)
+        waiting_sql, params = waiting.order_by().values("pk").query.sql_with_params()
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                WITH approved AS (
+                    UPDATE {qn(cls._meta.db_table)}
+                    SET approval_status = 'approved'
+                    WHERE id IN ({waiting_sql})
+                    RETURNING id
+                )
+                INSERT INTO {qn(PendingConversion._meta.db_table)}
+                    (document_translation_id, queued_at, claimed_by)
+                SELECT id, %s, '' FROM approved
+                ON CONFLICT (document_translation_id)
+                    DO UPDATE SET queued_at = EXCLUDED.queued_at
+                """,
+                [*params, timezone.now()],
+            )
+            approved_count = cursor.rowcount
+
+        if approved_count:
+            invalidate_all_file_links()
+        return approved_count
+
+    def invalidate_file_links(self):
+        invalidate_file_links(
+            Document.objects.filter(content=self.document_content_id).values_list(
+                "entity_type", "document_id"
+            )
+        )
 
     def approval_status_display(self):
         if self.document_content.approval_status == "approved":
@@ -390,7 +553,9 @@ class DocumentTranslation(AdminDisplayMixin, models.Model):
     language_display.short_description = "Language"
 
     def file_formats_display(self):
-        latest_file = self.files.order_by("-updated_at").first()
+        # Uses prefetched files, if any
+        files = list(self.files.all())
+        latest_file = max(files, key=lambda f: f.updated_at, default=None)
         conversion_date = latest_file.updated_at if latest_file else None
         conversion_date_str = (
             date_format(conversion_date, "N j, Y, P") if conversion_date else None
@@ -401,9 +566,9 @@ class DocumentTranslation(AdminDisplayMixin, models.Model):
             else "No PDF or RTF files have been generated for this translation."
         )
 
-        if getattr(self, "files", False):
+        if files:
             files_btns = ""
-            for f in self.files.all():
+            for f in files:
                 files_btns += (
                     "<a class='button'"
                     "style='flex: 1; font-weight: bold; text-align: center;'"
@@ -466,6 +631,14 @@ class TranslationFile(models.Model):
                 name="unique_file",
             )
         ]
+        indexes = [
+            # convert_docs' check for up to date files in a format, answered
+            # from the index alone
+            models.Index(
+                fields=["format", "document_translation", "updated_at"],
+                name="file_staleness_idx",
+            )
+        ]
 
     FORMAT_CHOICES = [
         ("md", "Markdown"),
@@ -480,6 +653,9 @@ class TranslationFile(models.Model):
     document_translation = models.ForeignKey(
         DocumentTranslation, on_delete=models.CASCADE, related_name="files"
     )
+    checksum = models.CharField(
+        blank=True, help_text="SHA-256 digest of the stored file's contents."
+    )
     created_at = models.DateTimeField(
         auto_now_add=True, help_text="Date this object was created in this app."
     )
@@ -503,6 +679,375 @@ class TranslationFile(models.Model):
         return self.file.url
 
 
+class PendingConversion(models.Model):
+    """
+    A translation that has been created or updated since convert_docs last
+    checked its files. convert_docs drains this queue instead of scanning every
+    translation for outdated files.
+
+    Several convert_docs workers can drain the queue at once. Each claims a
+    batch of rows by leasing them until claimed_until; a lease that runs out,
+    e.g. because its worker crashed, makes the row claimable again.
+    """
+
+    class Meta:
+        ordering = ["queued_at"]
+
+    document_translation = models.OneToOneField(
+        DocumentTranslation, on_delete=models.CASCADE, related_name="pending_conversion"
+    )
+    queued_at = models.DateTimeField(
+        auto_now=True, help_text="Date this translation was last queued for conversion."
+    )
+    claimed_by = models.CharField(
+        blank=True, help_text="The convert_docs worker converting this translation."
+    )
+    claimed_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Date the worker's claim on this translation expires.",
+    )
+
+    def __str__(self):
+        return f"Pending conversion for translation {self.document_translation_id}"
+
+    @classmethod
+    def enqueue(cls, document_translation_ids):
+        """
+        Queue translations for conversion, bumping queued_at for any that are
+        already waiting.
+        """
+        return cls.objects.bulk_create(
+            [cls(document_translation_id=pk) for pk in document_translation_ids],
+            update_conflicts=True,
+            unique_fields=["document_translation"],
+            update_fields=["queued_at"],
+            batch_size=1000,
+        )
+
+    @classmethod
+    def unclaimed(cls, now=None):
+        """
+        Rows that aren't claimed, or whose claim has expired.
+        """
+        now = now or timezone.now()
+        return cls.objects.filter(
+            Q(claimed_until__isnull=True) | Q(claimed_until__lt=now)
+        )
+
+    @classmethod
+    def claim(cls, worker, lease, limit=None, document_translation_id=None):
+        """
+        Lease up to limit unclaimed rows to worker, oldest first, and return the
+        claimed document translation IDs. Rows locked by another worker's claim
+        are skipped rather than waited on.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            claimable = cls.unclaimed(now).select_for_update(skip_locked=True)
+            if document_translation_id is not None:
+                claimable = claimable.filter(
+                    document_translation_id=document_translation_id
+                )
+            claimed = dict(
+                claimable.order_by("queued_at").values_list(
+                    "pk", "document_translation_id"
+                )[:limit]
+            )
+            cls.objects.filter(pk__in=claimed).update(
+                claimed_by=worker, claimed_until=now + lease
+            )
+
+        return list(claimed.values())
+
+    @classmethod
+    def renew(cls, worker, lease, document_translation_ids):
+        """
+        Extend worker's claims on the given translations.
+        """
+        return cls.objects.filter(
+            claimed_by=worker, document_translation_id__in=document_translation_ids
+        ).update(claimed_until=timezone.now() + lease)
+
+    @classmethod
+    def complete(cls, worker, claimed_at, document_translation_ids):
+        """
+        Remove worker's finished claims from the queue. Translations that were
+        queued again after claimed_at changed while converting, so they're
+        released for another pass instead.
+        """
+        claims = cls.objects.filter(
+            claimed_by=worker, document_translation_id__in=document_translation_ids
+        )
+        claims.filter(queued_at__lte=claimed_at).delete()
+        claims.update(claimed_by="", claimed_until=None)
+
+
+class DocumentIngestion(models.Model):
+    """
+    A batch of documents pushed by BoardAgendas, saved so the ingest_documents
+    job can validate and upsert them outside of the request.
+
+    The job leases the ingestion until claimed_until while it runs. If the job
+    stops before finishing, e.g. because its worker died, the lease runs out
+    and a retried job can claim the ingestion again.
+    """
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+
+    payload = models.JSONField(help_text="Document details as sent by BoardAgendas.")
+    extract = models.BooleanField(
+        default=False,
+        help_text="Run batch_extract once the documents have been ingested.",
+    )
+    status = models.CharField(choices=STATUS_CHOICES, default="pending")
+    chunk_counts = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Created, changed and unchanged document counts per chunk.",
+    )
+    errors = models.JSONField(
+        null=True,
+        blank=True,
+        help_text=(
+            "Validation errors, if ingestion failed, or the error from the last "
+            "attempt, if it's waiting to be retried."
+        ),
+    )
+    claimed_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Date the running job's claim on this ingestion expires.",
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, help_text="Date this ingestion was received."
+    )
+    finished_at = models.DateTimeField(
+        null=True, blank=True, help_text="Date this ingestion finished running."
+    )
+
+    def __str__(self):
+        return f"Document ingestion {self.pk} ({self.get_status_display()})"
+
+    @classmethod
+    def claim(cls, pk, lease):
+        """
+        Lease the ingestion if it's pending, or running on a claim that has
+        expired. Return whether it was claimed.
+        """
+        now = timezone.now()
+        return bool(
+            cls.objects.filter(
+                Q(status="pending") | Q(status="running", claimed_until__lt=now),
+                pk=pk,
+            ).update(status="running", claimed_until=now + lease)
+        )
+
+
+class Job(models.Model):
+    """
+    A management command queued by the database job backend, to be run by a
+    run_worker process.
+
+    Workers claim jobs by leasing them until claimed_until, and renew the
+    lease while a job runs. A job whose lease runs out, e.g. because its worker
+    was stopped, is claimed again. Failed jobs are retried with exponential
+    backoff until they run out of attempts.
+    """
+
+    class Meta:
+        ordering = ["run_after", "pk"]
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("succeeded", "Succeeded"),
+        ("failed", "Failed"),
+    ]
+
+    # Serializes claims across workers, so that concurrency limits hold
+    CLAIM_LOCK_ID = 7310241
+
+    # Delay before the first retry, doubled for each further attempt
+    RETRY_DELAY = timedelta(minutes=1)
+
+    command = models.CharField(help_text="The management command to run.")
+    args = models.JSONField(
+        default=list, blank=True, help_text="Positional arguments for the command."
+    )
+    options = models.JSONField(
+        default=dict, blank=True, help_text="Options for the command."
+    )
+    status = models.CharField(choices=STATUS_CHOICES, default="queued")
+    attempts = models.PositiveIntegerField(
+        default=0, help_text="How many times this job has been started."
+    )
+    max_attempts = models.PositiveIntegerField(
+        default=3, help_text="How many times to start this job before giving up."
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now, help_text="Date this job may next be started."
+    )
+    claimed_by = models.CharField(blank=True, help_text="The worker running this job.")
+    claimed_until = models.DateTimeField(
+        null=True, blank=True, help_text="Date the worker's claim on this job expires."
+    )
+    last_error = models.TextField(
+        blank=True, help_text="The error from this job's last failed attempt."
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, help_text="Date this job was queued."
+    )
+    finished_at = models.DateTimeField(
+        null=True, blank=True, help_text="Date this job succeeded or gave up."
+    )
+
+    def __str__(self):
+        return f"Job {self.pk}: {self.command} ({self.get_status_display()})"
+
+    @classmethod
+    def pending(cls):
+        """
+        Jobs that are waiting to run, including failed jobs waiting to be
+        retried.
+        """
+        return cls.objects.filter(status="queued")
+
+    @classmethod
+    def claim(cls, worker, lease, concurrency_limits=None, merge_options=None):
+        """
+        Lease the next job that's due to worker and return it, or None if there
+        isn't one. Commands with as many running jobs as their limit in
+        concurrency_limits are skipped, and jobs locked by another worker are
+        skipped rather than waited on.
+
+        merge_options maps commands to an option whose values can be merged.
+        Other queued jobs for those commands that differ from the claimed job
+        only in that option are merged into it, so that one run covers them
+        all, e.g. one convert_docs run for every translation approved since
+        the last one started.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [cls.CLAIM_LOCK_ID])
+
+            expired = Q(status="running", claimed_until__lt=now)
+            # Jobs whose worker went away on their last attempt have failed
+            cls.objects.filter(expired, attempts__gte=models.F("max_attempts")).update(
+                status="failed",
+                claimed_by="",
+                claimed_until=None,
+                last_error="The worker's claim expired.",
+                finished_at=now,
+            )
+
+            running = dict(
+                cls.objects.filter(status="running", claimed_until__gte=now)
+                .values_list("command")
+                .annotate(count=Count("pk"))
+                .order_by()
+            )
+            full_commands = [
+                command
+                for command, limit in (concurrency_limits or {}).items()
+                if running.get(command, 0) >= limit
+            ]
+
+            job = (
+                cls.objects.filter(Q(status="queued", run_after__lte=now) | expired)
+                .exclude(command__in=full_commands)
+                .select_for_update(skip_locked=True)
+                .first()
+            )
+            if job:
+                if job.command in (merge_options or {}):
+                    job._merge_queued(merge_options, now)
+                job.status = "running"
+                job.attempts += 1
+                job.claimed_by = worker
+                job.claimed_until = now + lease
+                job.save(
+                    update_fields=[
+                        "options",
+                        "status",
+                        "attempts",
+                        "claimed_by",
+                        "claimed_until",
+                    ]
+                )
+
+        return job
+
+    def _merge_queued(self, merge_options, now):
+        # Called while claiming this job, inside the claim's transaction
+        merged = []
+        for job in (
+            type(self)
+            .objects.filter(
+                command=self.command,
+                args=self.args,
+                status="queued",
+                run_after__lte=now,
+            )
+            .exclude(pk=self.pk)
+            .select_for_update(skip_locked=True)
+        ):
+            options = merge_job_options(
+                self.command, self.options, job.options, merge_options
+            )
+            if options is not None:
+                self.options = options
+                merged.append(job.pk)
+
+        if merged:
+            type(self).objects.filter(pk__in=merged).delete()
+
+    def _claimed(self, worker):
+        return type(self).objects.filter(pk=self.pk, claimed_by=worker)
+
+    def renew(self, worker, lease):
+        """
+        Extend worker's claim on this job.
+        """
+        return self._claimed(worker).update(claimed_until=timezone.now() + lease)
+
+    def succeed(self, worker):
+        return self._claimed(worker).update(
+            status="succeeded",
+            claimed_by="",
+            claimed_until=None,
+            finished_at=timezone.now(),
+        )
+
+    def fail(self, worker, error):
+        """
+        Record worker's failed attempt at this job, and queue it to be retried
+        after a backoff unless it's out of attempts.
+        """
+        now = timezone.now()
+        if self.attempts < self.max_attempts:
+            changes = {
+                "status": "queued",
+                "run_after": now + self.RETRY_DELAY * 2 ** (self.attempts - 1),
+            }
+        else:
+            changes = {"status": "failed", "finished_at": now}
+
+        return self._claimed(worker).update(
+            claimed_by="", claimed_until=None, last_error=error, **changes
+        )
+
+
 class ExtractionConfig(BaseGenericSetting, ClusterableModel):
     """
     Global configuration for the document processing pipeline.
@@ -545,37 +1090,44 @@ class ExtractionConfig(BaseGenericSetting, ClusterableModel):
                 DocumentContent.objects.filter(approval_status="waiting").update(
                     approval_status="approved"
                 )
-                DocumentTranslation.objects.filter(
-                    language="eng", approval_status="waiting"
-                ).update(approval_status="approved")
 
-                # For each configured language, translate any content that hasn't
-                # been translated yet, then approve existing waiting translations.
+                # Translate content into every configured language with one job
+                # rather than one per language. Waiting translations are
+                # approved up front in a single update, across English and every
+                # auto-approved language, and queued for conversion. The update
+                # skips save(), so the job runs convert_docs once it's done
+                # translating to convert them.
                 # Note: TranslationConfig children may not have been committed
                 # yet if this save was triggered by a Wagtail admin form submission
                 # that also changed language configs. In that case,
                 # TranslationConfig.save() will handle the language catch-up
                 # independently once each child is committed.
-                for lang_config in TranslationConfig.objects.filter(config=self):
-                    language_display = dict(DocumentTranslation.LANGUAGE_CHOICES)[
-                        lang_config.language
-                    ]
-                    translation_approval_status = (
-                        "approved"
-                        if lang_config.auto_approve_translations
-                        else "waiting"
+                lang_configs = dict(
+                    TranslationConfig.objects.filter(config=self).values_list(
+                        "language", "auto_approve_translations"
                     )
-                    get_backend().start_job(
-                        "batch_translate",
-                        language_display,
-                        approval_status=translation_approval_status,
+                )
+                auto_approved_languages = [
+                    language for language, auto in lang_configs.items() if auto
+                ]
+                approved_count = DocumentTranslation.approve_waiting(
+                    language__in=["eng", *auto_approved_languages]
+                )
+
+                if lang_configs:
+                    language_displays = dict(DocumentTranslation.LANGUAGE_CHOICES)
+                    transaction.on_commit(
+                        lambda: get_backend().start_unique_job(
+                            "batch_translate",
+                            *[language_displays[language] for language in lang_configs],
+                            approval_status="config",
+                            convert_docs=bool(approved_count),
+                        )
+                    )
+                elif approved_count:
+                    transaction.on_commit(
+                        lambda: get_backend().start_unique_job("convert_docs")
                     )
-                    if lang_config.auto_approve_translations:
-                        DocumentTranslation.objects.filter(
-                            language=lang_config.language,
-                            approval_status="waiting",
-                        ).update(approval_status="approved")
-                        get_backend().start_job("convert_docs")
         else:
             super().save(*args, **kwargs)
 
@@ -619,9 +1171,10 @@ class TranslationConfig(Orderable):
             super().save(*args, **kwargs)
 
             # When auto_approve_translations is turned on for this language, catch up:
-            # translate any content that hasn't been translated yet (approved from
-            # the start), then approve any translations that already exist but are
-            # waiting for review.
+            # approve any translations that already exist but are waiting for
+            # review and queue them for conversion, then translate any content
+            # that hasn't been translated yet (approved from the start) and
+            # convert everything that was approved in one job.
             if (
                 not original.auto_approve_translations
                 and self.auto_approve_translations
@@ -629,14 +1182,17 @@ class TranslationConfig(Orderable):
                 language_display = dict(DocumentTranslation.LANGUAGE_CHOICES)[
                     self.language
                 ]
-                get_backend().start_job(
-                    "batch_translate", language_display, approval_status="approved"
+                approved_count = DocumentTranslation.approve_waiting(
+                    language=self.language
+                )
+                transaction.on_commit(
+                    lambda: get_backend().start_unique_job(
+                        "batch_translate",
+                        language_display,
+                        approval_status="approved",
+                        convert_docs=bool(approved_count),
+                    )
                 )
-                DocumentTranslation.objects.filter(
-                    language=self.language,
-                    approval_status="waiting",
-                ).update(approval_status="approved")
-                get_backend().start_job("convert_docs")
         else:
             super().save(*args, **kwargs)
 
@@ -660,6 +1216,27 @@ class LinkText(models.Model):
     def __str__(self):
         return f"{self.get_language_display()} [{self.language}] Link Text"
 
+    @classmethod
+    def by_language(cls):
+        """
+        Load every link text in one query, keyed by language.
+        """
+        return {link_text.language: link_text for link_text in cls.objects.all()}
+
+    def download_text(self, entity_type):
+        if entity_type == "event":
+            return self.agenda_download_text
+        return self.board_report_download_text
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_all_file_links()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_all_file_links()
+        return result
+
     class Meta:
         ordering = ["language"]
         verbose_name_plural = "Download Link Translations"
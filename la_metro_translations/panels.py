@@ -1,4 +1,10 @@
+import operator
+from functools import reduce
+from urllib.parse import urlencode
+
 from django.apps import apps
+from django.db.models import Q, Subquery
+from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
@@ -31,10 +37,38 @@ class PropertyPanel(Panel):
 
 
 class RelatedObjectsPanel(Panel):
-    def __init__(self, related_cls, query_path, panels, *args, **kwargs):
+    """
+    Render panels for each object related to the instance, e.g. a document's
+    translations. Pass select_related and prefetch_related to load whatever
+    the child panels display along with the objects. Objects are shown
+    per_page at a time, in the related model's default order, with a button
+    that loads the next page into the form without leaving it.
+    """
+
+    per_page = 50
+
+    # Panels bound to models, by panel_id, so the related_objects view can
+    # render their later pages
+    bound_panels = {}
+
+    def __init__(
+        self,
+        related_cls,
+        query_path,
+        panels,
+        *args,
+        select_related=None,
+        prefetch_related=None,
+        per_page=None,
+        **kwargs,
+    ):
         self.related_cls = related_cls
         self.query_path = query_path
         self.child_panels = panels
+        self.select_related = select_related or []
+        self.prefetch_related = prefetch_related or []
+        if per_page:
+            self.per_page = per_page
         super().__init__(*args, **kwargs)
 
     def clone_kwargs(self):
@@ -42,28 +76,109 @@ class RelatedObjectsPanel(Panel):
         kwargs["related_cls"] = self.related_cls
         kwargs["query_path"] = self.query_path
         kwargs["panels"] = self.child_panels
+        kwargs["select_related"] = self.select_related
+        kwargs["prefetch_related"] = self.prefetch_related
+        kwargs["per_page"] = self.per_page
         return kwargs
 
+    def on_model_bound(self):
+        # Bind the child panels to the related model once, rather than for
+        # every object rendered
+        self.related_model = apps.get_model(self.related_cls)
+        self.bound_child_panels = [
+            child_panel.bind_to_model(self.related_model)
+            for child_panel in self.child_panels
+        ]
+        RelatedObjectsPanel.bound_panels[self.panel_id] = self
+
+    @property
+    def panel_id(self):
+        return (
+            f"{self.model._meta.model_name}-{self.related_model._meta.model_name}-"
+            f"{self.query_path}"
+        )
+
+    def get_ordering(self):
+        # Break ties in the default order by primary key, so pages don't
+        # overlap or skip objects
+        return [*self.related_model._meta.ordering, "pk"]
+
+    def get_queryset(self, instance):
+        queryset = self.related_model.objects.filter(**{self.query_path: instance})
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset.order_by(*self.get_ordering())
+
+    def filter_after(self, queryset, after):
+        """
+        Filter queryset to the objects that come after the object with primary
+        key after, comparing their position in order rather than counting
+        through the objects before it, so later pages cost the same as the
+        first.
+        """
+        previous = self.related_model.objects.filter(pk=after)
+        conditions = []
+        same_position = Q()
+        for field in self.get_ordering():
+            name = field.lstrip("-")
+            value = Subquery(previous.values(name)[:1])
+            lookup = "lt" if field.startswith("-") else "gt"
+            conditions.append(same_position & Q(**{f"{name}__{lookup}": value}))
+            same_position &= Q(**{name: value})
+        return queryset.filter(reduce(operator.or_, conditions))
+
     class BoundPanel(Panel.BoundPanel):
         def render_html(self, *args):
             # Don't try to filter related objects for unsaved instances
             if not self.instance.pk:
                 return mark_safe("")
 
-            relations = apps.get_model(self.panel.related_cls).objects.filter(
-                **{self.panel.query_path: self.instance}
-            )
+            return self.render_page()
 
-            rows = []
-            for obj in relations:
-                fields = []
-                for child_panel in self.panel.child_panels:
-                    # Bind the panel to the related model, then bind to the instance
-                    bound = child_panel.bind_to_model(
-                        self.panel.related_cls
-                    ).get_bound_panel(instance=obj)
-                    fields.append(bound.render_html())
+        def render_page(self, after=None):
+            """
+            Render the page of related objects after the object with primary key
+            after, or the first page.
+            """
+            relations = self.panel.get_queryset(self.instance)
+            if after is not None:
+                relations = self.panel.filter_after(relations, after)
+
+            page = list(relations[: self.panel.per_page + 1])
+            has_next_page = len(page) > self.panel.per_page
+            page = page[: self.panel.per_page]
 
+            rows = []
+            for obj in page:
+                fields = [
+                    child_panel.get_bound_panel(
+                        instance=obj, request=self.request
+                    ).render_html()
+                    for child_panel in self.panel.bound_child_panels
+                ]
                 rows.append(mark_safe("".join(fields)))
 
+            if has_next_page:
+                rows.append(self.render_next_page_button(page[-1].pk))
+
             return mark_safe("".join(rows))
+
+        def render_next_page_button(self, last_pk):
+            # Swap the button for the next page, leaving the form as it is
+            container_id = f"{self.panel.panel_id}-after-{last_pk}"
+            url = reverse(
+                "related_objects", args=[self.panel.panel_id, self.instance.pk]
+            )
+            return format_html(
+                "<div id='{}'><button type='button' "
+                "class='button button-small button-secondary' "
+                "data-controller='w-swap' data-action='w-swap#replace' "
+                "data-w-swap-src-value='{}?{}' data-w-swap-target-value='#{}'>"
+                "Show more</button></div>",
+                container_id,
+                url,
+                urlencode({"after": last_pk}),
+                container_id,
+            )
@@ -0,0 +1,68 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchVector,
+    SearchVectorField,
+)
+from django.db.models import Case, F, Func, Value, When
+from django.db.models.functions import Left
+
+# Postgres text search configs for languages it can stem. Text in any other
+# language is indexed word by word with the "simple" config.
+SEARCH_CONFIGS = {
+    "eng": "english",
+    "rus": "russian",
+    "spa": "spanish",
+}
+DEFAULT_SEARCH_CONFIG = "simple"
+
+# Postgres can't index more text than fits in a 1MB tsvector, so only the
+# start of very long documents is searchable
+MAX_SEARCH_TEXT_LENGTH = 500_000
+
+INLINE_IMAGE_PATTERN = r"!\[[^\]]*\]\(data:[^)]*\)"
+
+
+def markdown_search_vector(config):
+    """
+    A search vector over a markdown field, leaving out inline images.
+    """
+    text = Func(
+        F("markdown"),
+        Value(INLINE_IMAGE_PATTERN),
+        Value(""),
+        Value("g"),
+        function="regexp_replace",
+    )
+    return SearchVector(Left(text, MAX_SEARCH_TEXT_LENGTH), config=config)
+
+
+def language_markdown_search_vector():
+    """
+    A search vector over a markdown field, using the search config for each
+    row's language. The config is chosen per branch, rather than passed as one
+    expression, because Postgres only allows constant configs in the generated
+    columns that store these vectors.
+    """
+    return Case(
+        *[
+            When(language=language, then=markdown_search_vector(config))
+            for language, config in SEARCH_CONFIGS.items()
+        ],
+        default=markdown_search_vector(DEFAULT_SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+    )
+
+
+def search_query(value, configs=None):
+    """
+    Build a websearch-style query that matches text indexed with any of
+    configs, which default to every config in use.
+    """
+    if configs is None:
+        configs = [DEFAULT_SEARCH_CONFIG, *SEARCH_CONFIGS.values()]
+
+    query = None
+    for config in configs:
+        config_query = SearchQuery(value, config=config, search_type="websearch")
+        query = config_query if query is None else query | config_query
+    return query
@@ -1,13 +1,17 @@
 import base64
+import hashlib
 import io
+import logging
 import os
 import re
 import tempfile
+import uuid
 import pypandoc
 
+from PIL import Image
 from weasyprint import HTML
 
-from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.files import File
 
 from la_metro_translations.models import (
     Disclaimer,
@@ -15,6 +19,14 @@ from la_metro_translations.models import (
     DocumentTranslation,
 )
 
+logger = logging.getLogger(__name__)
+
+# Image formats RTF can embed directly, mapped to their \pict blip type
+RTF_BLIP_TYPES = {"PNG": r"\pngblip", "JPEG": r"\jpegblip"}
+
+# Converted files are buffered in memory up to this size, then spill to disk
+MAX_IN_MEMORY_FILE_SIZE = 10 * 1024 * 1024
+
 
 class DocumentTranslationConverterError(Exception):
     pass
@@ -48,96 +60,148 @@ class DocumentTranslationConverter:
         formatted_disclaimer = f"{disclaimer.disclaimer_text}\n\n---\n\n"
         return formatted_disclaimer + text
 
-    def convert_to_pdf(self) -> TranslationFile:
-        md_text = self.doc_translation.markdown or ""
+    def _get_existing_file(self, file_format) -> TranslationFile | None:
+        # Iterate over all() so that prefetched files are used when available
+        return next(
+            (f for f in self.doc_translation.files.all() if f.format == file_format),
+            None,
+        )
 
-        # Strip alt text.
-        md_text = re.sub(r"!\[[^]]+\]", "![]", md_text)
+    def _store_file(self, file_format, buffer) -> TranslationFile:
+        """
+        Stream a converted file to the default storage backend, returning an
+        unsaved TranslationFile that only references the stored file's name.
 
+        If the existing file for this format has identical contents and would be
+        stored under the same name, the upload is skipped and the existing file
+        is reused.
+        """
+        title = self.doc_translation.document_content.document.title
         language = self.doc_translation.language
-        md_text = self._prepend_disclaimer(language, md_text)
+        filename = f"{title}_{language}.{file_format}"
+        translation_file = TranslationFile(
+            document_translation=self.doc_translation, format=file_format
+        )
 
-        try:
-            # Pypandoc requires PDFs to be written to the filesystem so
-            # we can first convert the markdown to HTML and then use
-            # weasyprint to convert the HTML to PDF in memory
-            html = pypandoc.convert_text(
-                md_text, to="html", format="markdown-yaml_metadata_block"
-            )
-            pdf_bytes = HTML(string=html, base_url=".").write_pdf(
-                stylesheets=[self.doc_css_path]
+        buffer.seek(0)
+        digest = hashlib.file_digest(buffer, "sha256").hexdigest()
+        translation_file.checksum = digest
+
+        existing_file = self._get_existing_file(file_format)
+        if existing_file and existing_file.file and existing_file.checksum == digest:
+            # The upload path depends on the content's approval status and the
+            # document's title, so an identical file may still need to move to
+            # a different directory or be renamed
+            upload_path = translation_file.file.field.generate_filename(
+                translation_file, filename
             )
+            if upload_path == existing_file.file.name:
+                translation_file.file = existing_file.file.name
+                return translation_file
+
+        buffer.seek(0)
+        try:
+            translation_file.file.save(filename, File(buffer), save=False)
         except Exception as e:
-            raise DocumentTranslationConverterError(f"Conversion failed: {e}")
+            raise DocumentTranslationConverterError(f"Upload failed: {e}")
 
-        filename = self.doc_translation.document_content.document.title
+        return translation_file
 
-        buffer = io.BytesIO()
-        buffer.write(pdf_bytes)
-        buffer.seek(0)
+    def convert_to_pdf(self) -> TranslationFile:
+        md_text = self.doc_translation.markdown or ""
 
-        django_file = InMemoryUploadedFile(
-            file=buffer,
-            field_name="file",
-            name=f"{filename}_{language}.pdf",
-            content_type="application/pdf",
-            size=buffer.getbuffer().nbytes,
-            charset=None,
-        )
+        # Strip alt text.
+        md_text = re.sub(r"!\[[^]]+\]", "![]", md_text)
 
-        return TranslationFile(
-            document_translation=self.doc_translation, format="pdf", file=django_file
-        )
+        language = self.doc_translation.language
+        md_text = self._prepend_disclaimer(language, md_text)
 
-    def _image_uri_to_tempfile(self, media_type: str, b64data: str) -> str:
-        """Decode a base64 image URI to a temporary file, returning its path."""
+        with tempfile.SpooledTemporaryFile(MAX_IN_MEMORY_FILE_SIZE) as buffer:
+            try:
+                # Pypandoc requires PDFs to be written to the filesystem so
+                # we can first convert the markdown to HTML and then use
+                # weasyprint to write the PDF straight into our buffer
+                html = pypandoc.convert_text(
+                    md_text, to="html", format="markdown-yaml_metadata_block"
+                )
+                HTML(string=html, base_url=".").write_pdf(
+                    target=buffer, stylesheets=[self.doc_css_path]
+                )
+            except Exception as e:
+                raise DocumentTranslationConverterError(f"Conversion failed: {e}")
+
+            return self._store_file("pdf", buffer)
+
+    def _image_uri_to_rtf_pict(self, b64data: str) -> str:
+        """
+        Decode a base64 image URI into an RTF \\pict group, embedding the image
+        data as hex the same way pandoc does for image files.
+        """
         img_bytes = base64.b64decode(b64data)
-        tmp = tempfile.NamedTemporaryFile(suffix=f".{media_type}", delete=False)
-        tmp.write(img_bytes)
-        tmp.close()
-        return tmp.name
+
+        with Image.open(io.BytesIO(img_bytes)) as image:
+            width, height = image.size
+            dpi_x, dpi_y = image.info.get("dpi", (72, 72))
+
+            if image.format not in RTF_BLIP_TYPES:
+                buffer = io.BytesIO()
+                image.save(buffer, format="PNG")
+                img_bytes = buffer.getvalue()
+                blip_type = RTF_BLIP_TYPES["PNG"]
+            else:
+                blip_type = RTF_BLIP_TYPES[image.format]
+
+        # Goal dimensions are in twips (1/20 of a point), scaled by the image's dpi
+        width_goal = round(width * 72 / (dpi_x or 72) * 20)
+        height_goal = round(height * 72 / (dpi_y or 72) * 20)
+
+        return (
+            f"{{\\pict{blip_type}\\picw{width}\\pich{height}"
+            f"\\picwgoal{width_goal}\\pichgoal{height_goal} {img_bytes.hex()}}}"
+        )
 
     def convert_to_rtf(self) -> TranslationFile:
         md_text = self.doc_translation.markdown or ""
-        temp_files = []
 
         language = self.doc_translation.language
         md_text = self._prepend_disclaimer(language, md_text)
 
         try:
             # RTF embeds images as hex, but pandoc only handles file paths — not
-            # base64 data URIs. Decode each URI to a temp file so pandoc can read it.
+            # base64 data URIs. Swap each URI for a plain text token, then replace
+            # the tokens in pandoc's output with \pict groups we build ourselves.
             pattern = r"!\[.*?\]\(data:image/(\w+);base64,([^)]+)\)"
+            token_prefix = f"rtfimage{uuid.uuid4().hex}"
+            picts = []
 
-            def replace_with_tempfile(match):
-                media_type = match.group(1)
-                b64data = match.group(2)
-                path = self._image_uri_to_tempfile(media_type, b64data)
-                temp_files.append(path)
-                # Use empty alt text so pandoc doesn't emit the filename as a
-                # visible text paragraph below the embedded \pict block.
-                return f"![]({path})"
-
-            md_text = re.sub(pattern, replace_with_tempfile, md_text)
+            def replace_with_token(match):
+                try:
+                    pict = self._image_uri_to_rtf_pict(match.group(2))
+                except (ValueError, OSError, Image.DecompressionBombError) as e:
+                    # Drop images that can't be decoded rather than the whole file.
+                    # Bad base64 raises binascii.Error, a ValueError, and data that
+                    # isn't an image raises UnidentifiedImageError, an OSError.
+                    logger.warning(
+                        f"Dropping unreadable image from translation "
+                        f"{self.doc_translation.pk}: {e}"
+                    )
+                    return ""
+                picts.append(pict)
+                return f"{token_prefix}x{len(picts) - 1}x"
+
+            md_text = re.sub(pattern, replace_with_token, md_text)
 
             output = pypandoc.convert_text(
                 md_text, to="rtf", format="markdown-yaml_metadata_block"
             )
-            out_bytes = (
-                output
-                if isinstance(output, (bytes, bytearray))
-                else str(output).encode("utf-8")
+            output = re.sub(
+                rf"{token_prefix}x(\d+)x",
+                lambda match: picts[int(match.group(1))],
+                str(output),
             )
+            out_bytes = output.encode("utf-8")
         except Exception as e:
             raise DocumentTranslationConverterError(f"Conversion failed: {e}")
-        finally:
-            for path in temp_files:
-                try:
-                    os.unlink(path)
-                except OSError:
-                    pass
-
-        filename = self.doc_translation.document_content.document.title
 
         # Add encoding strings to make sure file renders correctly
         pre_bytes = (
@@ -145,19 +209,10 @@ class DocumentTranslationConverter:
             r"\cocoaplatform0{\fonttbl\f0\fnil\fcharset0 Helvetica;}"
         ).encode("utf-8")
         post_bytes = r"}".encode("utf-8")
-        final_bytes = pre_bytes + out_bytes + post_bytes
-
-        out_io = io.BytesIO(final_bytes)
 
-        django_file = InMemoryUploadedFile(
-            file=out_io,
-            field_name="file",
-            name=f"{filename}_{language}.rtf",
-            content_type="application/rtf",
-            size=out_io.getbuffer().nbytes,
-            charset="utf-8",
-        )
+        with tempfile.SpooledTemporaryFile(MAX_IN_MEMORY_FILE_SIZE) as buffer:
+            buffer.write(pre_bytes)
+            buffer.write(out_bytes)
+            buffer.write(post_bytes)
 
-        return TranslationFile(
-            document_translation=self.doc_translation, format="rtf", file=django_file
-        )
+            return self._store_file("rtf", buffer)
@@ -295,3 +295,40 @@ except KeyError as e:
         "Please enter all missing BoardAgendas config values in order to "
         "accept notifications of new documents from, and link back to that app."
     )
+
+# The largest JSON body, in bytes, that the document update API accepts. JSON
+# bodies are parsed in memory, so larger pushes must be sent as NDJSON.
+MAX_JSON_BODY_SIZE = int(os.getenv("MAX_JSON_BODY_SIZE", 10 * 1024 * 1024))
+
+# Background jobs. Set JOB_BACKEND to "database" to queue jobs for run_worker
+# processes. Otherwise, set HEROKU_APP_NAME and HEROKU_API_TOKEN to run jobs on
+# one-off dynos, or leave them unset to run jobs on local threads.
+JOB_BACKEND = os.getenv("JOB_BACKEND")
+HEROKU_APP_NAME = os.getenv("HEROKU_APP_NAME")
+HEROKU_API_TOKEN = os.getenv("HEROKU_API_TOKEN")
+
+# The most jobs of each command that run_worker processes will run at once
+JOB_CONCURRENCY_LIMITS = {
+    "batch_extract": 1,
+    "batch_translate": 2,
+    "convert_docs": 2,
+    "ingest_documents": 1,
+}
+
+# The most jobs of each command that the local backend's threads will run at
+# once. They share the web process, so conversions run one at a time.
+LOCAL_JOB_CONCURRENCY_LIMITS = {
+    **JOB_CONCURRENCY_LIMITS,
+    "convert_docs": 1,
+}
+
+# How many threads the local backend runs jobs on, how many jobs it will hold,
+# queued or running, and how many seconds a new job waits for room in a full
+# queue before the request for it fails
+LOCAL_JOB_WORKERS = int(os.getenv("LOCAL_JOB_WORKERS", 2))
+LOCAL_JOB_QUEUE_SIZE = int(os.getenv("LOCAL_JOB_QUEUE_SIZE", 50))
+LOCAL_JOB_QUEUE_TIMEOUT = float(os.getenv("LOCAL_JOB_QUEUE_TIMEOUT", 30))
+
+# Job requests are collected for this many seconds, then started in batches.
+# Jobs on the database backend are queued right away, and merged when claimed.
+JOB_DEBOUNCE_SECONDS = float(os.getenv("JOB_DEBOUNCE_SECONDS", 5))
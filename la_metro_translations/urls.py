@@ -17,11 +17,21 @@ urlpatterns = [
         api_views.DocumentUpdateView.as_view(),
         name="update_documents",
     ),
+    path(
+        "api/update-documents/<int:pk>/",
+        api_views.DocumentIngestionView.as_view(),
+        name="document_ingestion",
+    ),
     path(
         "api/document-files/",
         api_views.DocumentFilesView.as_view(),
         name="document_files",
     ),
+    path(
+        "api/document-files/lookup/",
+        api_views.DocumentFilesLookupView.as_view(),
+        name="document_files_lookup",
+    ),
     path("robots.txt/", views.robots_txt),
     path("pages/", include(wagtail_urls)),
     path("", include(wagtailadmin_urls)),
@@ -1,8 +1,28 @@
 import os
+from datetime import timedelta
+
+from django.apps import apps
 from django.conf import settings
-from django.shortcuts import render
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils.cache import patch_cache_control
 from django.views.generic import TemplateView
 
+from la_metro_translations.markdown_images import get_image
+from la_metro_translations.panels import RelatedObjectsPanel
+
+# Models whose markdown images can be served to the admin editor
+MARKDOWN_IMAGE_MODELS = ["documentcontent", "documenttranslation"]
+
+# Image types that are safe to serve inline. Others, like SVG, can carry
+# scripts, so they aren't served at all.
+MARKDOWN_IMAGE_TYPES = ["image/gif", "image/jpeg", "image/png", "image/webp"]
+
+# Images are cached by digest, so a cached image never goes stale; the timeout
+# just keeps images out of the cache once editors have moved on
+MARKDOWN_IMAGE_TIMEOUT = 60 * 60
+
 
 class PromptView(TemplateView):
     template_name = "la_metro_translations/prompt.html"
@@ -17,6 +37,59 @@ class PromptView(TemplateView):
         return context
 
 
+def markdown_image(request, model_name, pk, index, digest):
+    """
+    Serve an inline image from a document content or translation's markdown,
+    for the placeholders shown in the admin editor.
+    """
+    if model_name not in MARKDOWN_IMAGE_MODELS:
+        raise Http404
+
+    # Editors load every image in a document at once, so extract each from the
+    # markdown once rather than once per image
+    cache_key = f"markdown-image:{model_name}:{pk}:{index}:{digest}"
+    image = cache.get(cache_key)
+    if image is None:
+        model = apps.get_model("la_metro_translations", model_name)
+        instance = get_object_or_404(model.objects.only("markdown"), pk=pk)
+        image = get_image(instance.markdown, index, digest)
+        if image is None:
+            raise Http404
+        cache.set(cache_key, image, MARKDOWN_IMAGE_TIMEOUT)
+
+    content_type, image_bytes = image
+    if content_type not in MARKDOWN_IMAGE_TYPES:
+        raise Http404
+
+    response = HttpResponse(image_bytes, content_type=content_type)
+    # Don't let browsers treat the image as anything else, or run anything in it
+    response["X-Content-Type-Options"] = "nosniff"
+    response["Content-Security-Policy"] = "sandbox"
+    # The URL includes a digest of the image, so its content never changes
+    patch_cache_control(
+        response,
+        private=True,
+        max_age=int(timedelta(days=365).total_seconds()),
+        immutable=True,
+    )
+    return response
+
+
+def related_objects(request, panel_id, pk):
+    """
+    Render the next page of a RelatedObjectsPanel's objects, for the button
+    that loads it into the edit form.
+    """
+    panel = RelatedObjectsPanel.bound_panels.get(panel_id)
+    after = request.GET.get("after", "")
+    if panel is None or not after.isdigit():
+        raise Http404
+
+    instance = get_object_or_404(panel.model, pk=pk)
+    bound_panel = panel.get_bound_panel(instance=instance, request=request)
+    return HttpResponse(bound_panel.render_page(after=int(after)))
+
+
 def robots_txt(request):
     return render(
         request,
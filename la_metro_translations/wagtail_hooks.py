@@ -3,6 +3,7 @@ from wagtail.admin.menu import MenuItem
 from wagtail.admin.panels import FieldPanel, MultiFieldPanel, FieldRowPanel
 from wagtail.admin.viewsets.model import ModelViewSet
 from wagtail.admin.filters import WagtailFilterSet
+from wagtail.admin.views.generic import EditView
 from wagtail.contrib.settings.registry import register_setting
 from wagtail.permissions import ModelPermissionPolicy
 from wagtail.snippets.views.snippets import IndexView, SnippetViewSet
@@ -10,7 +11,7 @@ from wagtail.snippets.models import register_snippet
 
 from django_filters import CharFilter, ChoiceFilter
 from django.urls import path, reverse
-from .views import PromptView
+from .views import PromptView, markdown_image, related_objects
 
 from .models import (
     Document,
@@ -21,6 +22,7 @@ from .models import (
     LinkText,
 )
 from .panels import PropertyPanel, RelatedObjectsPanel
+from .search import SEARCH_CONFIGS, search_query
 
 
 class ReadEditOnlyPermissionPolicy(ModelPermissionPolicy):
@@ -39,7 +41,12 @@ class ReadEditOnlyPermissionPolicy(ModelPermissionPolicy):
         return super().user_has_permission_for_instance(user, action, instance)
 
 
+# English content and document titles are only indexed with the English config
+ENGLISH_SEARCH_CONFIGS = [SEARCH_CONFIGS["eng"]]
+
+
 class DocumentFilterSet(WagtailFilterSet):
+    search = CharFilter(method="filter_search", label="Search title and content")
     title = CharFilter(lookup_expr="icontains", label="Title")
     entity_type = ChoiceFilter(
         choices=Document.ENTITY_TYPE_CHOICES, label="Entity Type"
@@ -49,6 +56,21 @@ class DocumentFilterSet(WagtailFilterSet):
         model = Document
         fields = ["title", "entity_type", "entity_id"]
 
+    def filter_search(self, queryset, name, value):
+        # A union of two index scans, rather than one scan filtered by either
+        query = search_query(value, ENGLISH_SEARCH_CONFIGS)
+        matches = (
+            Document.objects.filter(search_vector=query)
+            .values("pk")
+            .order_by()
+            .union(
+                DocumentContent.objects.filter(search_vector=query)
+                .values("document_id")
+                .order_by()
+            )
+        )
+        return queryset.filter(pk__in=matches)
+
 
 class DocumentViewSet(ModelViewSet):
     model = Document
@@ -120,6 +142,8 @@ class DocumentViewSet(ModelViewSet):
                 RelatedObjectsPanel(
                     "la_metro_translations.DocumentTranslation",
                     "document_content__document",
+                    # Translation status and links depend on their content's
+                    select_related=["document_content"],
                     panels=[
                         PropertyPanel("language_display"),
                         FieldRowPanel(
@@ -144,6 +168,7 @@ class DocumentViewSet(ModelViewSet):
 
 
 class DocumentContentFilterSet(WagtailFilterSet):
+    search = CharFilter(method="filter_search", label="Search title and content")
     document__title = CharFilter(lookup_expr="icontains", label="Title")
     document__entity_type = ChoiceFilter(
         choices=Document.ENTITY_TYPE_CHOICES, label="Entity Type"
@@ -162,6 +187,37 @@ class DocumentContentFilterSet(WagtailFilterSet):
             "approval_status",
         ]
 
+    def filter_search(self, queryset, name, value):
+        query = search_query(value, ENGLISH_SEARCH_CONFIGS)
+        matches = (
+            DocumentContent.objects.filter(search_vector=query)
+            .values("pk")
+            .order_by()
+            .union(
+                DocumentContent.objects.filter(document__search_vector=query)
+                .values("pk")
+                .order_by()
+            )
+        )
+        return queryset.filter(pk__in=matches)
+
+
+class DocumentContentIndexView(IndexView):
+    def get_base_queryset(self):
+        return super().get_base_queryset().select_related("document")
+
+
+class DocumentContentEditView(EditView):
+    def get_queryset(self):
+        # Load what file_formats_display and the translation count in the
+        # header show along with the content
+        return (
+            super()
+            .get_queryset()
+            .select_related("document")
+            .prefetch_related("translations__files")
+        )
+
 
 class DocumentContentViewSet(ModelViewSet):
     model = DocumentContent
@@ -169,6 +225,8 @@ class DocumentContentViewSet(ModelViewSet):
     menu_icon = "edit"
     menu_order = 201
     add_to_admin_menu = True
+    index_view_class = DocumentContentIndexView
+    edit_view_class = DocumentContentEditView
     filterset_class = DocumentContentFilterSet
     edit_template_name = "wagtailadmin/generic/document_content_edit.html"
 
@@ -233,6 +291,7 @@ class DocumentContentViewSet(ModelViewSet):
                 RelatedObjectsPanel(
                     "la_metro_translations.DocumentTranslation",
                     "document_content",
+                    select_related=["document_content"],
                     panels=[
                         PropertyPanel("language_display"),
                         FieldRowPanel(
@@ -257,6 +316,7 @@ class DocumentContentViewSet(ModelViewSet):
 
 
 class DocumentTranslationFilterSet(WagtailFilterSet):
+    search = CharFilter(method="filter_search", label="Search title and translation")
     document_content__document__title = CharFilter(
         lookup_expr="icontains", label="Document Title"
     )
@@ -281,6 +341,23 @@ class DocumentTranslationFilterSet(WagtailFilterSet):
             "approval_status",
         ]
 
+    def filter_search(self, queryset, name, value):
+        matches = (
+            DocumentTranslation.objects.filter(search_vector=search_query(value))
+            .values("pk")
+            .order_by()
+            .union(
+                DocumentTranslation.objects.filter(
+                    document_content__document__search_vector=search_query(
+                        value, ENGLISH_SEARCH_CONFIGS
+                    )
+                )
+                .values("pk")
+                .order_by()
+            )
+        )
+        return queryset.filter(pk__in=matches)
+
 
 class DocumentTranslationIndexView(IndexView):
     template_name = "wagtailadmin/generic/document_translation_index.html"
@@ -291,9 +368,15 @@ class DocumentTranslationIndexView(IndexView):
             .get_base_queryset()
             .filter(document_content__approval_status="approved")
             .exclude(language="eng")
+            .select_related("document_content__document")
         )
 
 
+class DocumentTranslationEditView(EditView):
+    def get_queryset(self):
+        return super().get_queryset().prefetch_related("files")
+
+
 class DocumentTranslationViewSet(ModelViewSet):
     model = DocumentTranslation
 
@@ -303,6 +386,7 @@ class DocumentTranslationViewSet(ModelViewSet):
     menu_order = 202
 
     index_view_class = DocumentTranslationIndexView
+    edit_view_class = DocumentTranslationEditView
     filterset_class = DocumentTranslationFilterSet
 
     list_display = [
@@ -439,6 +523,28 @@ def register_prompt_url():
     ]
 
 
+@hooks.register("register_admin_urls")
+def register_markdown_image_url():
+    return [
+        path(
+            "markdown-images/<str:model_name>/<int:pk>/<int:index>/<str:digest>/",
+            markdown_image,
+            name="markdown_image",
+        ),
+    ]
+
+
+@hooks.register("register_admin_urls")
+def register_related_objects_url():
+    return [
+        path(
+            "related-objects/<str:panel_id>/<int:pk>/",
+            related_objects,
+            name="related_objects",
+        ),
+    ]
+
+
 # Custom settings items, put at top of list (order before 100)
 register_setting(ExtractionConfig, icon="cog", order=50)
 
@@ -0,0 +1,483 @@
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from conftest import (
+    DocumentContentFactory,
+    DocumentFactory,
+    DocumentTranslationFactory,
+)
+from la_metro_translations.api.cache import (
+    get_cached_file_links,
+    invalidate_file_links,
+    set_cached_file_links,
+)
+from la_metro_translations.api.ingestion import (
+    DocumentIngestionError,
+    ingest_documents,
+)
+from la_metro_translations.api.parsers import LimitedJSONParser, RequestTooLargeError
+from la_metro_translations.models import (
+    Document,
+    DocumentIngestion,
+    DocumentTranslation,
+    LinkText,
+    TranslationFile,
+)
+
+
+@pytest.fixture
+def api_settings(settings):
+    settings.BOARDAGENDAS_API_KEY = "test-api-key"
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    cache.clear()
+    return settings
+
+
+@pytest.fixture
+def link_text():
+    return LinkText.objects.create(
+        language="spa",
+        agenda_download_text="Descargar agenda",
+        board_report_download_text="Descargar informe",
+    )
+
+
+@pytest.fixture
+def approved_translation(document_content):
+    translation = DocumentTranslationFactory(
+        document_content=document_content, approval_status="approved"
+    )
+    TranslationFile.objects.create(
+        document_translation=translation,
+        format="rtf",
+        file="Published/2026/Test Document_spa.rtf",
+    )
+    return translation
+
+
+@pytest.mark.django_db
+class TestDocumentFilesView:
+    def get_files(self, client, document, **headers):
+        return client.get(
+            reverse("document_files"),
+            {
+                "api_key": "test-api-key",
+                "entity_type": document.entity_type,
+                "document_id": document.document_id,
+            },
+            **headers,
+        )
+
+    def test_file_links_are_served_from_cache(
+        self,
+        client,
+        api_settings,
+        document,
+        approved_translation,
+        link_text,
+        django_assert_num_queries,
+    ):
+        response = self.get_files(client, document)
+
+        assert response.status_code == 200
+        assert response.json()["rtf"] == [
+            {
+                "link_text": "Descargar informe",
+                "url": "/media/Published/2026/Test%20Document_spa.rtf",
+            }
+        ]
+
+        with django_assert_num_queries(0):
+            cached_response = self.get_files(client, document)
+
+        assert cached_response.json() == response.json()
+
+    def test_file_links_kept_out_of_page_cache(
+        self, client, api_settings, document, approved_translation, link_text
+    ):
+        response = self.get_files(client, document)
+
+        assert "no-cache" in response["Cache-Control"]
+        assert "max-age" not in response["Cache-Control"]
+        assert not any("views.decorators.cache" in key for key in cache._cache)
+
+    def test_link_text_changes_invalidate_cache(
+        self,
+        client,
+        api_settings,
+        document,
+        approved_translation,
+        link_text,
+        django_capture_on_commit_callbacks,
+    ):
+        self.get_files(client, document)
+
+        link_text.board_report_download_text = "Descargar el informe"
+        with django_capture_on_commit_callbacks(execute=True):
+            link_text.save()
+
+        response = self.get_files(client, document)
+        assert response.json()["rtf"][0]["link_text"] == "Descargar el informe"
+
+    def test_translation_changes_invalidate_cache(
+        self,
+        client,
+        api_settings,
+        document,
+        approved_translation,
+        link_text,
+        django_capture_on_commit_callbacks,
+    ):
+        self.get_files(client, document)
+
+        approved_translation.approval_status = "revision"
+        with django_capture_on_commit_callbacks(execute=True):
+            approved_translation.save()
+
+        response = self.get_files(client, document)
+        assert response.json() == {"pdf": [], "rtf": []}
+
+    def test_invalidation_waits_for_commit(
+        self,
+        client,
+        api_settings,
+        document,
+        approved_translation,
+        link_text,
+        django_capture_on_commit_callbacks,
+    ):
+        """
+        Cached file links should be dropped once a change is committed, not
+        before, when a concurrent request could rebuild them from the old rows.
+        """
+        self.get_files(client, document)
+
+        approved_translation.approval_status = "revision"
+        with django_capture_on_commit_callbacks(execute=True):
+            approved_translation.save()
+            assert self.get_files(client, document).json()["rtf"]
+
+        assert self.get_files(client, document).json() == {"pdf": [], "rtf": []}
+
+    def test_file_links_cached_before_a_change_are_rebuilt(
+        self,
+        client,
+        api_settings,
+        document,
+        approved_translation,
+        link_text,
+        django_capture_on_commit_callbacks,
+    ):
+        """
+        File links cached from rows read before a change was committed, e.g.
+        by a request racing the change's invalidation, shouldn't be served.
+        """
+        pair = (document.entity_type, document.document_id)
+        versions, _ = get_cached_file_links({pair})
+
+        with django_capture_on_commit_callbacks(execute=True):
+            invalidate_file_links([pair])
+        set_cached_file_links({pair: {"pdf": [], "rtf": []}}, versions)
+
+        response = self.get_files(client, document)
+        assert response.json()["rtf"][0]["url"] == (
+            "/media/Published/2026/Test%20Document_spa.rtf"
+        )
+
+    def test_unchanged_file_links_not_modified(
+        self,
+        client,
+        api_settings,
+        document,
+        approved_translation,
+        link_text,
+        django_capture_on_commit_callbacks,
+    ):
+        response = self.get_files(client, document)
+        etag = response["ETag"]
+
+        # The page cache doesn't answer first with the full response
+        not_modified = self.get_files(client, document, HTTP_IF_NONE_MATCH=etag)
+        assert not_modified.status_code == 304
+        assert not_modified["ETag"] == etag
+        assert not not_modified.content
+
+        with django_capture_on_commit_callbacks(execute=True):
+            approved_translation.save()
+
+        modified = self.get_files(client, document, HTTP_IF_NONE_MATCH=etag)
+        assert modified.status_code == 200
+        assert modified["ETag"] != etag
+
+    def test_bulk_withdrawn_approval_is_modified(
+        self, client, api_settings, document, approved_translation, link_text
+    ):
+        """
+        Withdrawing approval in bulk doesn't touch updated_at, so responses
+        carry no Last-Modified date that a client could revalidate against.
+        """
+        response = self.get_files(client, document)
+        assert "Last-Modified" not in response
+
+        DocumentTranslation.objects.filter(pk=approved_translation.pk).update(
+            approval_status="revision"
+        )
+
+        modified = self.get_files(
+            client, document, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT"
+        )
+        assert modified.status_code == 200
+
+    def test_approval_changes_etag(
+        self,
+        client,
+        api_settings,
+        document,
+        approved_translation,
+        link_text,
+        django_capture_on_commit_callbacks,
+    ):
+        etag = self.get_files(client, document)["ETag"]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            DocumentTranslationFactory(
+                document_content=approved_translation.document_content,
+                language="kor",
+                approval_status="approved",
+            )
+
+        response = self.get_files(client, document, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_missing_document_not_found(self, client, api_settings, document):
+        response = self.get_files(client, document)
+
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestDocumentFilesLookupView:
+    @pytest.fixture
+    def make_document(self, link_text):
+        def _make(document_id):
+            document = DocumentFactory(document_id=document_id)
+            translation = DocumentTranslationFactory(
+                document_content=DocumentContentFactory(document=document),
+                approval_status="approved",
+            )
+            TranslationFile.objects.create(
+                document_translation=translation,
+                format="rtf",
+                file=f"Published/2026/{document_id}_spa.rtf",
+            )
+            return document
+
+        return _make
+
+    def lookup(self, client, documents):
+        return client.post(
+            reverse("document_files_lookup"),
+            {
+                "api_key": "test-api-key",
+                "documents": [
+                    {"entity_type": entity_type, "document_id": document_id}
+                    for entity_type, document_id in documents
+                ],
+            },
+            content_type="application/json",
+        )
+
+    def test_lookup_maps_file_links_by_entity_and_document(
+        self, client, api_settings, make_document
+    ):
+        make_document("1")
+        make_document("2")
+
+        response = self.lookup(client, [("bill", "1"), ("bill", "2"), ("bill", "3")])
+
+        assert response.status_code == 200
+        bills = response.json()["bill"]
+        assert bills["1"]["rtf"][0]["url"] == "/media/Published/2026/1_spa.rtf"
+        assert bills["2"]["rtf"][0]["url"] == "/media/Published/2026/2_spa.rtf"
+        assert bills["3"] is None
+
+    def test_lookup_query_count_is_constant(self, client, api_settings, make_document):
+        for document_id in range(5):
+            make_document(str(document_id))
+
+        with CaptureQueriesContext(connection) as single_lookup:
+            self.lookup(client, [("bill", "0")])
+        with CaptureQueriesContext(connection) as many_lookups:
+            self.lookup(client, [("bill", str(i)) for i in range(1, 5)])
+
+        assert len(many_lookups) == len(single_lookup)
+
+    def test_lookup_rejects_invalid_api_key(self, client, api_settings):
+        response = client.post(
+            reverse("document_files_lookup"),
+            {"api_key": "wrong", "documents": []},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 403
+
+
+@pytest.mark.django_db
+class TestDocumentUpdateView:
+    def document_details(self, document_id, **kwargs):
+        return {
+            "title": f"Document {document_id}",
+            "source_url": f"https://example.com/{document_id}.pdf",
+            "created_at": "2026-01-20T10:05:00Z",
+            "updated_at": "2026-01-21T11:45:00Z",
+            "document_type": "bill_document",
+            "document_id": str(document_id),
+            "entity_type": "bill",
+            "entity_id": str(document_id),
+            "entity_slug": f"bill-{document_id}",
+            **kwargs,
+        }
+
+    def test_json_documents_are_upserted(self, client, api_settings):
+        response = client.post(
+            reverse("update_documents"),
+            {
+                "api_key": "test-api-key",
+                "documents": [self.document_details(i) for i in range(3)],
+            },
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201
+        assert response.json()["chunks"] == [
+            {"created": 3, "changed": 0, "unchanged": 0}
+        ]
+        assert Document.objects.count() == 3
+
+    def test_oversized_json_rejected(self, client, api_settings, settings):
+        documents = [self.document_details(i) for i in range(3)]
+        body = json.dumps({"api_key": "test-api-key", "documents": documents})
+        settings.MAX_JSON_BODY_SIZE = len(body) - 1
+
+        response = client.post(
+            reverse("update_documents"), body, content_type="application/json"
+        )
+
+        assert response.status_code == 413
+        assert "application/x-ndjson" in response.json()["detail"]
+        assert not Document.objects.exists()
+
+        # The same documents can be sent as NDJSON
+        response = client.post(
+            f"{reverse('update_documents')}?api_key=test-api-key",
+            "\n".join(json.dumps(document) for document in documents),
+            content_type="application/x-ndjson",
+        )
+
+        assert response.status_code == 201
+        assert Document.objects.count() == 3
+
+    def test_oversized_json_without_length_rejected(self, settings):
+        settings.MAX_JSON_BODY_SIZE = 5
+
+        with pytest.raises(RequestTooLargeError):
+            LimitedJSONParser().parse(io.BytesIO(b"[1, 2, 3]"))
+
+    def test_ndjson_documents_are_upserted(self, client, api_settings):
+        DocumentFactory(document_id="1", title="Old title")
+        lines = [json.dumps(self.document_details(i)) for i in range(3)]
+
+        response = client.post(
+            f"{reverse('update_documents')}?api_key=test-api-key",
+            "\n".join(lines) + "\n",
+            content_type="application/x-ndjson",
+        )
+
+        assert response.status_code == 201
+        assert Document.objects.count() == 3
+        assert Document.objects.get(document_id="1").title == "Document 1"
+
+    def test_ndjson_requires_api_key(self, client, api_settings):
+        response = client.post(
+            reverse("update_documents"),
+            json.dumps(self.document_details(1)),
+            content_type="application/x-ndjson",
+        )
+
+        assert response.status_code == 403
+        assert not Document.objects.exists()
+
+    def test_invalid_chunk_rolls_back_every_chunk(self, api_settings):
+        documents = [self.document_details(i) for i in range(4)]
+        documents[3]["entity_type"] = "not an entity type"
+
+        with pytest.raises(DocumentIngestionError) as e:
+            ingest_documents(iter(documents), chunk_size=2)
+
+        assert e.value.chunk == 1
+        assert not Document.objects.exists()
+
+        assert ingest_documents(iter(documents[:3]), chunk_size=2) == [
+            {"created": 2, "changed": 0, "unchanged": 0},
+            {"created": 1, "changed": 0, "unchanged": 0},
+        ]
+
+    def test_unchanged_documents_are_not_rewritten(self, client, api_settings):
+        documents = [self.document_details(i) for i in range(3)]
+        ingest_documents(iter(documents))
+        original_ids = dict(Document.objects.values_list("document_id", "id"))
+
+        documents[0]["title"] = "New title"
+        # Duplicate documents are only upserted once, with their last details
+        documents.append(self.document_details(1, title="Newer title"))
+        documents.append(self.document_details(3))
+
+        response = client.post(
+            reverse("update_documents"),
+            {"api_key": "test-api-key", "documents": documents},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 201
+        assert response.json()["created"] == 1
+        assert response.json()["changed"] == 2
+        assert response.json()["unchanged"] == 1
+        assert Document.objects.get(document_id="1").title == "Newer title"
+        assert Document.objects.get(document_id="2").id == original_ids["2"]
+
+    @patch("la_metro_translations.api.views.get_backend")
+    def test_async_ingestion_is_accepted_and_queued(
+        self, mock_get_backend, client, api_settings, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                f"{reverse('update_documents')}?async=true&extract=true",
+                {
+                    "api_key": "test-api-key",
+                    "documents": [self.document_details(i) for i in range(2)],
+                },
+                content_type="application/json",
+            )
+
+        assert response.status_code == 202
+        ingestion = DocumentIngestion.objects.get(id=response.json()["job_id"])
+        assert len(ingestion.payload) == 2
+        assert ingestion.extract
+        assert not Document.objects.exists()
+        mock_get_backend.return_value.start_job.assert_called_once_with(
+            "ingest_documents", ingestion=ingestion.id
+        )
+
+        status_response = client.get(
+            response.json()["status_url"], {"api_key": "test-api-key"}
+        )
+        assert status_response.json()["status"] == "pending"
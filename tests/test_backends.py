@@ -0,0 +1,354 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, call, patch
+
+import pytest
+from urllib3.exceptions import ConnectTimeoutError, ReadTimeoutError
+
+from la_metro_translations import backends
+from la_metro_translations.backends import (
+    DatabaseBackend,
+    DebouncedBackend,
+    HerokuBackend,
+    JobQueueFullError,
+    LocalBackend,
+    format_command,
+)
+
+PATCH_LOCAL_CALL_COMMAND = "la_metro_translations.backends.call_command"
+
+
+@pytest.fixture
+def backend():
+    inner_backend = MagicMock()
+    inner_backend.has_pending_job.return_value = False
+    return DebouncedBackend(inner_backend)
+
+
+def test_format_command_quotes_args_and_expands_lists_and_flags():
+    assert format_command(
+        "batch_translate", "Armenian (Eastern)", document_content=1
+    ) == ("python manage.py batch_translate 'Armenian (Eastern)' --document_content=1")
+    assert format_command("convert_docs", document_translation=[1, 2]) == (
+        "python manage.py convert_docs --document_translation 1 2"
+    )
+    assert format_command("batch_translate", "Spanish", convert_docs=True) == (
+        "python manage.py batch_translate Spanish --convert_docs"
+    )
+    assert format_command("batch_translate", "Spanish", convert_docs=False) == (
+        "python manage.py batch_translate Spanish"
+    )
+
+
+def test_convert_docs_requests_are_merged(backend):
+    for translation_id in [3, 1, 2, 1]:
+        backend.start_job("convert_docs", document_translation=translation_id)
+
+    backend.backend.start_job.assert_not_called()
+    backend.flush()
+
+    backend.backend.start_job.assert_called_once_with(
+        "convert_docs", document_translation=[1, 2, 3]
+    )
+
+
+def test_full_convert_docs_run_covers_merged_requests(backend):
+    backend.start_job("convert_docs", document_translation=1)
+    backend.start_job("convert_docs")
+
+    assert backend.has_pending_job("convert_docs", document_translation=2)
+    backend.flush()
+
+    backend.backend.start_job.assert_called_once_with("convert_docs")
+
+
+def test_identical_requests_are_started_once(backend):
+    backend.start_job("batch_translate", "Spanish", document_content=1)
+    backend.start_job("batch_translate", "Spanish", document_content=1)
+    backend.start_job("batch_translate", "Spanish", document_content=2)
+    backend.flush()
+
+    assert backend.backend.start_job.call_args_list == [
+        call("batch_translate", "Spanish", document_content=1),
+        call("batch_translate", "Spanish", document_content=2),
+    ]
+
+
+def test_unique_jobs_check_pending_requests(backend):
+    backend.start_job("convert_docs", document_translation=1)
+
+    assert backend.has_pending_job("convert_docs", document_translation=1)
+    assert backend.has_pending_job("convert_docs", document_translation=[1])
+    assert not backend.has_pending_job("convert_docs", document_translation=2)
+
+    backend.start_unique_job("convert_docs", document_translation=2)
+    backend.flush()
+
+    backend.backend.start_job.assert_called_once_with(
+        "convert_docs", document_translation=[1, 2]
+    )
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for jobs"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def blocked_jobs():
+    """
+    Patch call_command so that local jobs block until released.
+    """
+    release = threading.Event()
+    with patch(PATCH_LOCAL_CALL_COMMAND, side_effect=lambda *a, **k: release.wait()):
+        yield release
+    release.set()
+
+
+def test_local_jobs_limited_per_command(blocked_jobs):
+    backend = LocalBackend(max_workers=3, concurrency_limits={"convert_docs": 1})
+    backend.start_job("convert_docs", document_translation=1)
+    backend.start_job("convert_docs", document_translation=2)
+    backend.start_job("batch_extract")
+
+    wait_for(lambda: backend.metrics()["running"] == 2)
+    metrics = backend.metrics()
+    assert metrics["queued"] == 1
+    assert metrics["waiting_by_command"] == {"convert_docs": 1}
+    # Running jobs may have missed changes made since they started
+    assert not backend.has_pending_job("convert_docs", document_translation=1)
+    assert backend.has_pending_job("convert_docs", document_translation=2)
+
+    blocked_jobs.set()
+    wait_for(lambda: backend.metrics()["succeeded"] == 3)
+    assert backend.metrics()["queued"] == backend.metrics()["running"] == 0
+    assert not backend.has_pending_job("convert_docs", document_translation=2)
+
+
+def test_local_limits_dont_cap_workers(settings):
+    settings.JOB_CONCURRENCY_LIMITS = {"convert_docs": 2}
+    settings.LOCAL_JOB_CONCURRENCY_LIMITS = {"convert_docs": 1}
+
+    assert LocalBackend().concurrency_limits == {"convert_docs": 1}
+
+
+def test_local_jobs_wait_for_room_in_full_queue(blocked_jobs):
+    backend = LocalBackend(
+        max_workers=1, max_queued_jobs=2, concurrency_limits={}, queue_timeout=5
+    )
+    for _ in range(2):
+        backend.start_job("batch_extract")
+
+    waiting_caller = threading.Thread(
+        target=backend.start_job, args=["batch_extract"], daemon=True
+    )
+    waiting_caller.start()
+    waiting_caller.join(timeout=0.1)
+    assert waiting_caller.is_alive()
+
+    blocked_jobs.set()
+    waiting_caller.join(timeout=5)
+    wait_for(lambda: backend.metrics()["succeeded"] == 3)
+    assert backend.metrics()["rejected"] == 0
+
+
+def test_local_jobs_rejected_when_queue_stays_full(blocked_jobs):
+    backend = LocalBackend(
+        max_workers=1, max_queued_jobs=2, concurrency_limits={}, queue_timeout=0.05
+    )
+    for _ in range(2):
+        backend.start_job("batch_extract")
+
+    with pytest.raises(JobQueueFullError):
+        backend.start_job("batch_extract")
+
+    metrics = backend.metrics()
+    assert metrics["queued"] + metrics["running"] == 2
+    assert metrics["rejected"] == 1
+
+    blocked_jobs.set()
+    wait_for(lambda: backend.metrics()["succeeded"] == 2)
+
+
+def test_local_jobs_merged_into_waiting_job_when_queue_is_full():
+    release = threading.Event()
+    with patch(
+        PATCH_LOCAL_CALL_COMMAND, side_effect=lambda *a, **k: release.wait()
+    ) as mock_call_command:
+        backend = LocalBackend(
+            max_workers=2,
+            max_queued_jobs=2,
+            concurrency_limits={"convert_docs": 1},
+            queue_timeout=0,
+        )
+        backend.start_job("convert_docs", document_translation=1)
+        backend.start_job("convert_docs", document_translation=2)
+        backend.start_job("convert_docs", document_translation=3)
+        backend.start_job("convert_docs", document_translation=2)
+
+        assert backend.has_pending_job("convert_docs", document_translation=[2, 3])
+        release.set()
+        wait_for(lambda: backend.metrics()["succeeded"] == 2)
+
+    assert mock_call_command.call_args_list == [
+        call("convert_docs", document_translation=1),
+        call("convert_docs", document_translation=[2, 3]),
+    ]
+    assert backend.metrics()["rejected"] == 0
+
+
+def test_debounced_metrics_include_wrapped_backend(blocked_jobs):
+    backend = DebouncedBackend(LocalBackend(max_workers=1, concurrency_limits={}))
+    backend.start_job("batch_extract")
+    backend.start_job("convert_docs", document_translation=1)
+    backend.start_job("convert_docs", document_translation=2)
+
+    metrics = backend.metrics()
+    assert metrics["debounced"] == 2
+    assert metrics["queued"] == metrics["running"] == 0
+
+    backend.flush()
+    wait_for(lambda: backend.metrics()["running"] == 1)
+    metrics = backend.metrics()
+    assert metrics["debounced"] == 0
+    assert metrics["queued"] == 1
+
+    blocked_jobs.set()
+    wait_for(lambda: backend.metrics()["succeeded"] == 2)
+
+
+# Requests two local jobs, the second waiting for the first to finish, and exits
+# while both are still being debounced
+EXITING_PROCESS = """
+from unittest.mock import patch
+from django.conf import settings
+
+settings.configure(
+    JOB_BACKEND="local",
+    JOB_DEBOUNCE_SECONDS=60,
+    LOCAL_JOB_CONCURRENCY_LIMITS={"batch_translate": 1},
+)
+from la_metro_translations import backends
+
+patch.object(
+    backends, "call_command", side_effect=lambda *args: print("Ran", *args)
+).start()
+backends.get_backend().start_job("batch_translate", "Spanish")
+backends.get_backend().start_job("batch_translate", "Korean")
+"""
+
+
+def test_debounced_local_jobs_run_before_process_exits():
+    result = subprocess.run(
+        [sys.executable, "-c", EXITING_PROCESS],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines() == [
+        "Ran batch_translate Spanish",
+        "Ran batch_translate Korean",
+    ]
+
+
+def test_debounced_unique_jobs_checked_when_started(backend):
+    backend.start_unique_job("batch_translate", "Spanish", document_content=1)
+    backend.start_unique_job("batch_translate", "Spanish", document_content=1)
+
+    backend.backend.has_pending_job.assert_not_called()
+    backend.flush()
+
+    backend.backend.start_unique_job.assert_called_once_with(
+        "batch_translate", "Spanish", document_content=1
+    )
+    backend.backend.start_job.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "job_backend,backend_class",
+    [("local", DebouncedBackend), ("database", DatabaseBackend)],
+)
+def test_database_jobs_queued_without_debouncing(
+    job_backend, backend_class, settings, monkeypatch
+):
+    settings.JOB_BACKEND = job_backend
+    settings.JOB_DEBOUNCE_SECONDS = 5
+    monkeypatch.setattr(backends, "_backend", None)
+    monkeypatch.setattr(backends.threading, "_register_atexit", MagicMock())
+
+    assert type(backends.get_backend()) is backend_class
+
+
+@pytest.fixture
+def heroku_backend(settings):
+    settings.HEROKU_APP_NAME = "la-metro-translations"
+    settings.HEROKU_API_TOKEN = "token"
+    return HerokuBackend()
+
+
+def test_heroku_jobs_dispatched_with_pooled_session(heroku_backend):
+    adapter = heroku_backend.session.get_adapter(heroku_backend.dynos_url)
+    assert adapter.max_retries is heroku_backend.retry
+
+    with patch.object(heroku_backend.session, "post") as mock_post:
+        mock_post.return_value.json.return_value = {"id": "dyno-id"}
+        future = heroku_backend.start_job("convert_docs", document_translation=[1])
+
+        assert future.result(timeout=5) == "dyno-id"
+
+    mock_post.assert_called_once_with(
+        "https://api.heroku.com/apps/la-metro-translations/dynos",
+        json={
+            "command": "python manage.py convert_docs --document_translation 1",
+            "attach": False,
+            "type": "run",
+        },
+        headers=heroku_backend.headers,
+        timeout=heroku_backend.timeout,
+    )
+
+
+def test_heroku_retries_only_posts_that_cant_have_started_a_dyno(heroku_backend):
+    retry = heroku_backend.retry
+    url = heroku_backend.dynos_url
+
+    assert retry.is_retry("GET", 503)
+    assert retry.is_retry("POST", 429)
+    assert not retry.is_retry("POST", 503)
+    assert not retry.is_retry("POST", 504, has_retry_after=True)
+
+    # A POST that was never sent is retried, but one that timed out waiting for
+    # a response may have started a dyno
+    connect_error = ConnectTimeoutError(None, url, "timed out")
+    assert retry.increment("POST", url, error=connect_error).total == 2
+    with pytest.raises(ReadTimeoutError):
+        retry.increment("POST", url, error=ReadTimeoutError(None, url, "timed out"))
+    read_error = ReadTimeoutError(None, url, "timed out")
+    assert retry.increment("GET", url, error=read_error).total == 2
+
+
+def test_heroku_unique_jobs_skip_starting_dynos(heroku_backend):
+    with (
+        patch.object(heroku_backend.session, "get") as mock_get,
+        patch.object(heroku_backend.session, "post") as mock_post,
+    ):
+        mock_get.return_value.json.return_value = [
+            {"command": "python manage.py batch_extract", "state": "starting"},
+            {"command": "python manage.py convert_docs", "state": "up"},
+        ]
+        heroku_backend.start_unique_job("batch_extract").result(timeout=5)
+        heroku_backend.start_unique_job("convert_docs").result(timeout=5)
+
+    assert mock_get.call_count == 2
+    assert mock_post.call_count == 1
+    assert mock_post.call_args.kwargs["json"]["command"] == (
+        "python manage.py convert_docs"
+    )
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from unittest.mock import patch
 
 from django.core.management import call_command as run_command
+from django.utils import timezone
 
 from conftest import (
     DocumentContentFactory,
@@ -13,10 +14,16 @@ from conftest import (
     TranslationConfigFactory,
 )
 from la_metro_translations.models import (
+    Document,
     DocumentContent,
+    DocumentIngestion,
     DocumentTranslation,
+    Job,
+    PendingConversion,
     TranslationFile,
 )
+from la_metro_translations.backends import DatabaseBackend
+from la_metro_translations.services import DocumentTranslationConverterError
 
 PATCH_OCR = (
     "la_metro_translations.management.commands.batch_extract"
@@ -36,6 +43,19 @@ PATCH_EXTRACT_RESET_DB = (
     "la_metro_translations.management.commands.batch_extract"
     ".Command.reset_db_connections"
 )
+PATCH_INGEST_CALL_COMMAND = (
+    "la_metro_translations.management.commands.ingest_documents.call_command"
+)
+PATCH_INGEST_DOCUMENTS = (
+    "la_metro_translations.management.commands.ingest_documents.ingest_documents"
+)
+PATCH_WORKER_CALL_COMMAND = (
+    "la_metro_translations.management.commands.run_worker.call_command"
+)
+PATCH_WORKER_RESET_DB = (
+    "la_metro_translations.management.commands.run_worker"
+    ".Command.reset_db_connections"
+)
 PATCH_CONVERT_RESET_DB = (
     "la_metro_translations.management.commands.convert_docs"
     ".Command.reset_db_connections"
@@ -112,6 +132,20 @@ class TestBatchTranslateCommand:
         else:
             mock_call_command.assert_not_called()
 
+    @patch(PATCH_TRANSLATE_CALL_COMMAND)
+    def test_convert_docs_flag_always_triggers_convert(
+        self, mock_call_command, document_content
+    ):
+        run_command(
+            "batch_translate",
+            "Spanish",
+            approval_status="waiting",
+            document_content=document_content.id,
+            convert_docs=True,
+        )
+
+        mock_call_command.assert_called_once_with("convert_docs")
+
     @patch(PATCH_TRANSLATE_CALL_COMMAND)
     def test_approval_status_updated_on_conflict(
         self, mock_call_command, document_content
@@ -134,6 +168,62 @@ class TestBatchTranslateCommand:
         )
         assert translation.approval_status == "waiting"
 
+    @patch(PATCH_TRANSLATE_CALL_COMMAND)
+    def test_config_approval_status_per_language(
+        self, mock_call_command, document_content
+    ):
+        config = ExtractionConfigFactory()
+        TranslationConfigFactory(
+            config=config, language="spa", auto_approve_translations=True
+        )
+        TranslationConfigFactory(
+            config=config, language="kor", auto_approve_translations=False
+        )
+
+        run_command(
+            "batch_translate",
+            "Spanish",
+            "Korean",
+            "Vietnamese",
+            approval_status="config",
+            document_content=document_content.id,
+        )
+
+        statuses = dict(
+            DocumentTranslation.objects.filter(
+                document_content=document_content
+            ).values_list("language", "approval_status")
+        )
+        assert statuses == {"spa": "approved", "kor": "waiting", "vie": "waiting"}
+        mock_call_command.assert_called_once_with("convert_docs")
+
+    @patch(PATCH_TRANSLATE_CALL_COMMAND)
+    def test_retranslates_outdated_translation_in_language(
+        self, mock_call_command, document_content
+    ):
+        """
+        Content should be retranslated when its translation in the requested
+        language is out of date, even if it has up to date translations in
+        other languages.
+        """
+        now = timezone.now()
+        outdated = DocumentTranslationFactory(
+            document_content=document_content, language="spa"
+        )
+        DocumentTranslationFactory(document_content=document_content, language="eng")
+        DocumentContent.objects.filter(pk=document_content.pk).update(updated_at=now)
+        DocumentTranslation.objects.filter(pk=outdated.pk).update(
+            updated_at=now - timedelta(days=1)
+        )
+        DocumentTranslation.objects.filter(language="eng").update(
+            updated_at=now + timedelta(days=1)
+        )
+
+        run_command("batch_translate", "Spanish", approval_status="waiting")
+
+        outdated.refresh_from_db()
+        assert outdated.markdown == "translated text"
+
 
 @pytest.mark.django_db
 class TestBatchExtractCommand:
@@ -230,6 +320,123 @@ class TestBatchExtractCommand:
         mock_call_command.assert_not_called()
 
 
+@pytest.mark.django_db
+class TestIngestDocumentsCommand:
+    """
+    Tests for the ingest_documents management command, which upserts documents
+    saved by an asynchronous update-documents request.
+    """
+
+    def make_ingestion(self, **kwargs):
+        payload = [
+            {
+                "title": f"Document {i}",
+                "source_url": f"https://example.com/{i}.pdf",
+                "created_at": "2026-01-20T10:05:00Z",
+                "updated_at": "2026-01-21T11:45:00Z",
+                "document_type": "event_document",
+                "document_id": str(i),
+                "entity_type": "event",
+                "entity_id": str(i),
+                "entity_slug": f"event-{i}",
+            }
+            for i in range(3)
+        ]
+        return DocumentIngestion.objects.create(payload=payload, **kwargs)
+
+    @pytest.mark.parametrize("extract", [True, False])
+    @patch(PATCH_INGEST_CALL_COMMAND)
+    def test_documents_upserted_and_extraction_chained(
+        self, mock_call_command, extract
+    ):
+        ingestion = self.make_ingestion(extract=extract)
+
+        run_command("ingest_documents", ingestion=ingestion.id)
+
+        ingestion.refresh_from_db()
+        assert ingestion.status == "succeeded"
+        assert ingestion.chunk_counts == [{"created": 3, "changed": 0, "unchanged": 0}]
+        assert ingestion.finished_at is not None
+        assert Document.objects.count() == 3
+
+        if extract:
+            mock_call_command.assert_called_once_with("batch_extract")
+        else:
+            mock_call_command.assert_not_called()
+
+    @patch(PATCH_INGEST_CALL_COMMAND)
+    def test_invalid_documents_fail_ingestion(self, mock_call_command):
+        ingestion = self.make_ingestion(extract=True)
+        ingestion.payload[1]["entity_type"] = "not an entity type"
+        ingestion.save()
+
+        run_command("ingest_documents", ingestion=ingestion.id)
+
+        ingestion.refresh_from_db()
+        assert ingestion.status == "failed"
+        assert ingestion.errors["chunk"] == 0
+        assert not Document.objects.exists()
+        mock_call_command.assert_not_called()
+
+    @patch(PATCH_INGEST_CALL_COMMAND)
+    def test_extraction_skipped_when_nothing_changed(self, mock_call_command):
+        run_command("ingest_documents", ingestion=self.make_ingestion().id)
+        ingestion = self.make_ingestion(extract=True)
+
+        run_command("ingest_documents", ingestion=ingestion.id)
+
+        ingestion.refresh_from_db()
+        assert ingestion.chunk_counts == [{"created": 0, "changed": 0, "unchanged": 3}]
+        mock_call_command.assert_not_called()
+
+    def test_ingestion_only_runs_once(self):
+        ingestion = self.make_ingestion(status="succeeded")
+
+        run_command("ingest_documents", ingestion=ingestion.id)
+
+        assert not Document.objects.exists()
+
+    def test_running_ingestion_skipped_until_its_claim_expires(self):
+        ingestion = self.make_ingestion(
+            status="running", claimed_until=timezone.now() + timedelta(minutes=5)
+        )
+
+        run_command("ingest_documents", ingestion=ingestion.id)
+        assert not Document.objects.exists()
+
+        # The job running it died, so a retry takes it over
+        DocumentIngestion.objects.filter(pk=ingestion.pk).update(
+            claimed_until=timezone.now() - timedelta(minutes=1)
+        )
+        run_command("ingest_documents", ingestion=ingestion.id)
+
+        ingestion.refresh_from_db()
+        assert ingestion.status == "succeeded"
+        assert ingestion.claimed_until is None
+        assert Document.objects.count() == 3
+
+    def test_ingestion_retried_after_transient_error(self):
+        ingestion = self.make_ingestion()
+
+        with patch(
+            PATCH_INGEST_DOCUMENTS, side_effect=ConnectionError("Connection lost")
+        ):
+            with pytest.raises(ConnectionError):
+                run_command("ingest_documents", ingestion=ingestion.id)
+
+        ingestion.refresh_from_db()
+        assert ingestion.status == "pending"
+        assert ingestion.errors == {"detail": "Connection lost"}
+        assert not Document.objects.exists()
+
+        run_command("ingest_documents", ingestion=ingestion.id)
+
+        ingestion.refresh_from_db()
+        assert ingestion.status == "succeeded"
+        assert ingestion.errors is None
+        assert Document.objects.count() == 3
+
+
 @pytest.mark.django_db
 class TestConvertDocsCommand:
     """
@@ -366,3 +573,250 @@ class TestConvertDocsCommand:
 
         mock_converter.convert_to_rtf.assert_called_once()
         mock_converter.convert_to_pdf.assert_called_once()
+
+    def test_convert_doc_multiple_translations(self, make_translation, mock_converter):
+        """
+        Several translations can be converted with one run, as when a debounced
+        backend merges convert_docs requests.
+        """
+        translations = [make_translation(language="eng") for _ in range(3)]
+
+        run_command("convert_docs", document_translation=[t.pk for t in translations])
+
+        assert mock_converter.convert_to_rtf.call_count == 3
+
+    def test_queue_drained_after_conversion(self, make_translation, mock_converter):
+        """
+        Converted translations should be removed from the conversion queue, so
+        the next run doesn't check them again.
+        """
+        make_translation(language="spa")
+        assert PendingConversion.objects.count() == 1
+
+        run_command("convert_docs")
+
+        assert not PendingConversion.objects.exists()
+
+        run_command("convert_docs")
+
+        mock_converter.convert_to_rtf.assert_called_once()
+        mock_converter.convert_to_pdf.assert_called_once()
+
+    def test_rescan_queues_outdated_translations(
+        self, make_translation, mock_converter
+    ):
+        """
+        Outdated translations that aren't queued should only be converted when
+        the command is run with --rescan.
+        """
+        make_translation(language="eng")
+        PendingConversion.objects.all().delete()
+
+        run_command("convert_docs")
+        mock_converter.convert_to_rtf.assert_not_called()
+
+        run_command("convert_docs", rescan=True)
+        mock_converter.convert_to_rtf.assert_called_once()
+
+    def test_failed_conversions_are_requeued(self, make_translation, mock_converter):
+        """
+        Translations that fail to convert should stay queued for the next run.
+        """
+        translation = make_translation(language="eng")
+        mock_converter.convert_to_rtf.side_effect = DocumentTranslationConverterError
+
+        run_command("convert_docs")
+
+        assert PendingConversion.objects.filter(
+            document_translation=translation
+        ).exists()
+
+    def test_translations_claimed_by_another_worker_are_skipped(
+        self, make_translation, mock_converter
+    ):
+        """
+        Translations under a live claim belong to another worker and shouldn't be
+        converted twice, but an expired claim can be taken over.
+        """
+        claimed = make_translation(language="eng")
+        expired = make_translation(language="eng")
+        now = timezone.now()
+        PendingConversion.objects.filter(document_translation=claimed).update(
+            claimed_by="other-worker", claimed_until=now + timedelta(minutes=5)
+        )
+        PendingConversion.objects.filter(document_translation=expired).update(
+            claimed_by="crashed-worker", claimed_until=now - timedelta(minutes=5)
+        )
+
+        run_command("convert_docs")
+
+        mock_converter.convert_to_rtf.assert_called_once()
+        assert list(
+            PendingConversion.objects.values_list("document_translation", flat=True)
+        ) == [claimed.pk]
+
+        run_command("convert_docs", document_translation=claimed.pk)
+
+        mock_converter.convert_to_rtf.assert_called_once()
+
+    def test_translation_requeued_during_conversion_is_converted_again(
+        self, make_translation, mock_converter
+    ):
+        """
+        A translation that changes while it's being converted should be released
+        for another pass rather than removed from the queue.
+        """
+        translation = make_translation(language="eng")
+
+        def requeue_once():
+            if mock_converter.convert_to_rtf.call_count == 1:
+                PendingConversion.enqueue([translation.pk])
+            return mock_converter.convert_to_rtf.return_value
+
+        mock_converter.convert_to_rtf.side_effect = requeue_once
+
+        run_command("convert_docs")
+
+        assert mock_converter.convert_to_rtf.call_count == 2
+        assert not PendingConversion.objects.exists()
+
+
+@pytest.mark.django_db
+@patch(PATCH_WORKER_RESET_DB)
+class TestRunWorkerCommand:
+    """
+    Tests for the run_worker management command, which runs jobs queued by the
+    database job backend.
+    """
+
+    @patch(PATCH_WORKER_CALL_COMMAND)
+    def test_queued_jobs_run(self, mock_call_command, mock_reset_db):
+        backend = DatabaseBackend()
+        backend.start_job("batch_translate", "Spanish", document_content=1)
+        backend.start_job("convert_docs", document_translation=[1, 2])
+
+        assert backend.has_pending_job("batch_translate", "Spanish", document_content=1)
+        assert not backend.has_pending_job(
+            "batch_translate", "Spanish", document_content=2
+        )
+
+        run_command("run_worker", burst=True)
+
+        assert mock_call_command.call_args_list == [
+            (("batch_translate", "Spanish"), {"document_content": 1}),
+            (("convert_docs",), {"document_translation": [1, 2]}),
+        ]
+        assert set(Job.objects.values_list("status", flat=True)) == {"succeeded"}
+        assert not backend.has_pending_job(
+            "batch_translate", "Spanish", document_content=1
+        )
+
+    def test_unique_jobs_not_skipped_for_running_jobs(self, mock_reset_db):
+        backend = DatabaseBackend()
+        Job.objects.create(
+            command="batch_translate",
+            args=["Spanish"],
+            options={"document_content": 1},
+            status="running",
+            claimed_by="other-worker",
+            claimed_until=timezone.now() + timedelta(minutes=5),
+        )
+
+        backend.start_unique_job("batch_translate", "Spanish", document_content=1)
+        backend.start_unique_job("batch_translate", "Spanish", document_content=1)
+
+        assert Job.objects.filter(status="queued").count() == 1
+
+    @patch(PATCH_WORKER_CALL_COMMAND)
+    def test_queued_conversions_merged_when_claimed(
+        self, mock_call_command, mock_reset_db
+    ):
+        backend = DatabaseBackend()
+        backend.start_job("convert_docs", document_translation=3)
+        backend.start_job("convert_docs", document_translation=[1, 2])
+        backend.start_job("convert_docs", document_translation=[2], rescan=True)
+        later = Job.objects.create(
+            command="convert_docs",
+            options={"document_translation": [4]},
+            run_after=timezone.now() + timedelta(minutes=5),
+        )
+
+        run_command("run_worker", burst=True)
+
+        assert mock_call_command.call_args_list == [
+            (("convert_docs",), {"document_translation": [1, 2, 3]}),
+            (("convert_docs",), {"document_translation": [2], "rescan": True}),
+        ]
+        assert Job.objects.count() == 3
+        later.refresh_from_db()
+        assert later.status == "queued"
+
+    @patch(PATCH_WORKER_CALL_COMMAND, side_effect=Exception("Boom"))
+    def test_failed_jobs_retried_with_backoff(self, mock_call_command, mock_reset_db):
+        job = Job.objects.create(command="batch_extract", max_attempts=2)
+
+        run_command("run_worker", burst=True)
+
+        job.refresh_from_db()
+        assert job.status == "queued"
+        assert job.attempts == 1
+        assert "Boom" in job.last_error
+        assert job.run_after > timezone.now()
+
+        # The job isn't due until its backoff has passed
+        run_command("run_worker", burst=True)
+        assert mock_call_command.call_count == 1
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        run_command("run_worker", burst=True)
+
+        job.refresh_from_db()
+        assert job.status == "failed"
+        assert job.attempts == 2
+        assert job.finished_at
+
+    @patch(PATCH_WORKER_CALL_COMMAND)
+    def test_concurrency_limits(self, mock_call_command, mock_reset_db, settings):
+        settings.JOB_CONCURRENCY_LIMITS = {"batch_extract": 1}
+        Job.objects.create(
+            command="batch_extract",
+            status="running",
+            claimed_by="other-worker",
+            claimed_until=timezone.now() + timedelta(minutes=5),
+        )
+        queued = Job.objects.create(command="batch_extract")
+        other = Job.objects.create(command="convert_docs")
+
+        run_command("run_worker", burst=True)
+
+        mock_call_command.assert_called_once_with("convert_docs")
+        queued.refresh_from_db()
+        other.refresh_from_db()
+        assert queued.status == "queued"
+        assert other.status == "succeeded"
+
+    @patch(PATCH_WORKER_CALL_COMMAND)
+    def test_expired_claims_reclaimed(self, mock_call_command, mock_reset_db):
+        expired = timezone.now() - timedelta(minutes=1)
+        retried = Job.objects.create(
+            command="convert_docs",
+            status="running",
+            attempts=1,
+            claimed_by="stopped-worker",
+            claimed_until=expired,
+        )
+        exhausted = Job.objects.create(
+            command="batch_extract",
+            status="running",
+            attempts=3,
+            claimed_by="stopped-worker",
+            claimed_until=expired,
+        )
+
+        run_command("run_worker", burst=True)
+
+        mock_call_command.assert_called_once_with("convert_docs")
+        retried.refresh_from_db()
+        exhausted.refresh_from_db()
+        assert (retried.status, retried.attempts) == ("succeeded", 2)
+        assert exhausted.status == "failed"
@@ -0,0 +1,223 @@
+import base64
+import binascii
+import hashlib
+import io
+import tempfile
+from unittest.mock import patch
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import InMemoryStorage
+from PIL import Image, UnidentifiedImageError
+
+from la_metro_translations.models import (
+    Disclaimer,
+    DocumentTranslation,
+    TranslationFile,
+)
+from la_metro_translations.services import DocumentTranslationConverter
+
+PATCH_CONVERT_TEXT = "la_metro_translations.services.conversion.pypandoc.convert_text"
+PATCH_CONVERSION_LOGGER = "la_metro_translations.services.conversion.logger"
+
+
+def image_data(image_format, **params):
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 2), "red").save(buffer, format=image_format, **params)
+    return buffer.getvalue()
+
+
+def as_base64(data):
+    return base64.b64encode(data).decode()
+
+
+RTF = b"{\\rtf1 Informe}"
+
+
+@pytest.fixture
+def converter():
+    return DocumentTranslationConverter(DocumentTranslation(language="eng"))
+
+
+@pytest.fixture
+def file_storage():
+    """
+    Store translation files in memory, recording uploads in storage.save.
+    """
+    storage = InMemoryStorage()
+    with (
+        patch.object(TranslationFile._meta.get_field("file"), "storage", storage),
+        patch.object(storage, "save", wraps=storage.save),
+    ):
+        yield storage
+
+
+@pytest.fixture
+def stored_file(document_translation, file_storage):
+    """
+    An RTF file already stored for a translation of published content.
+    """
+    name = file_storage.save("Published/2026/Test_Document_spa.rtf", ContentFile(RTF))
+    file_storage.save.reset_mock()
+    return TranslationFile.objects.create(
+        document_translation=document_translation,
+        format="rtf",
+        file=name,
+        checksum=hashlib.sha256(RTF).hexdigest(),
+    )
+
+
+@pytest.fixture
+def stored_file_converter(stored_file):
+    doc_translation = DocumentTranslation.objects.select_related(
+        "document_content__document"
+    ).get(pk=stored_file.document_translation_id)
+    return DocumentTranslationConverter(doc_translation)
+
+
+class TestRtfImages:
+    """
+    Tests for the RTF \\pict groups built for images embedded as data URIs.
+    """
+
+    def test_png_embedded_at_its_dpi(self, converter):
+        png = image_data("PNG", dpi=(144, 144))
+
+        pict = converter._image_uri_to_rtf_pict(as_base64(png))
+
+        assert pict == (
+            r"{\pict\pngblip\picw4\pich2\picwgoal40\pichgoal20 " + png.hex() + "}"
+        )
+
+    def test_jpeg_embedded_at_72_dpi_by_default(self, converter):
+        jpeg = image_data("JPEG")
+
+        pict = converter._image_uri_to_rtf_pict(as_base64(jpeg))
+
+        assert pict == (
+            r"{\pict\jpegblip\picw4\pich2\picwgoal80\pichgoal40 " + jpeg.hex() + "}"
+        )
+
+    def test_other_formats_embedded_as_png(self, converter):
+        pict = converter._image_uri_to_rtf_pict(as_base64(image_data("GIF")))
+
+        assert pict.startswith(r"{\pict\pngblip\picw4\pich2")
+        data = bytes.fromhex(pict.rsplit(" ", 1)[1].rstrip("}"))
+        with Image.open(io.BytesIO(data)) as image:
+            assert image.format == "PNG"
+
+    @pytest.mark.parametrize(
+        "b64data,error",
+        [
+            ("abc", binascii.Error),
+            (as_base64(b"not an image"), UnidentifiedImageError),
+        ],
+    )
+    def test_unreadable_images_raise(self, converter, b64data, error):
+        with pytest.raises(error):
+            converter._image_uri_to_rtf_pict(b64data)
+
+    @patch(PATCH_CONVERSION_LOGGER)
+    @patch(PATCH_CONVERT_TEXT, side_effect=lambda text, **kwargs: text)
+    def test_unreadable_images_dropped_from_rtf(self, _, mock_logger, converter):
+        converter.doc_translation.markdown = (
+            "Before ![Bad](data:image/png;base64,abc) and "
+            f"![Good](data:image/png;base64,{as_base64(image_data('PNG'))}) after"
+        )
+
+        def read_stored_file(file_format, buffer):
+            buffer.seek(0)
+            return buffer.read().decode()
+
+        with patch.object(converter, "_store_file", side_effect=read_stored_file):
+            rtf = converter.convert_to_rtf()
+
+        assert "Before  and {\\pict\\pngblip" in rtf
+        assert rtf.count("\\pict") == 1
+        mock_logger.warning.assert_called_once()
+
+
+@pytest.mark.django_db
+class TestStoreFile:
+    """
+    Tests for storing converted files, which skips uploading a file identical
+    to the one already stored under the same name.
+    """
+
+    @patch(PATCH_CONVERT_TEXT, side_effect=lambda text, **kwargs: text)
+    def test_converted_file_streamed_to_storage(
+        self, _, document_translation, file_storage
+    ):
+        Disclaimer.objects.create(language="spa", disclaimer_text="Traducción")
+        converter = DocumentTranslationConverter(
+            DocumentTranslation.objects.select_related(
+                "document_content__document"
+            ).get(pk=document_translation.pk)
+        )
+
+        translation_file = converter.convert_to_rtf()
+        translation_file.save()
+
+        # Storage reads the spooled file rather than being handed its bytes
+        (_, content), _ = file_storage.save.call_args
+        assert isinstance(content.file, tempfile.SpooledTemporaryFile)
+
+        # The row only references the stored file
+        with file_storage.open(translation_file.file.name) as f:
+            contents = f.read()
+        row = TranslationFile.objects.values().get(pk=translation_file.pk)
+        assert row["file"] == translation_file.file.name
+        assert row["checksum"] == hashlib.sha256(contents).hexdigest()
+        assert not [
+            value for value in row.values() if isinstance(value, (bytes, memoryview))
+        ]
+
+    def test_identical_file_not_uploaded_again(
+        self, stored_file_converter, stored_file, file_storage
+    ):
+        translation_file = stored_file_converter._store_file("rtf", io.BytesIO(RTF))
+
+        file_storage.save.assert_not_called()
+        assert translation_file.file.name == stored_file.file.name
+        assert translation_file.checksum == stored_file.checksum
+
+    def test_identical_file_uploaded_when_directory_changes(
+        self, stored_file_converter, file_storage
+    ):
+        # Unpublished content's files are stored in another directory
+        document_content = stored_file_converter.doc_translation.document_content
+        document_content.approval_status = "waiting"
+
+        translation_file = stored_file_converter._store_file("rtf", io.BytesIO(RTF))
+
+        file_storage.save.assert_called_once()
+        assert translation_file.file.name == "Unpublished/2026/Test_Document_spa.rtf"
+        with file_storage.open(translation_file.file.name) as f:
+            assert f.read() == RTF
+
+    def test_identical_file_uploaded_when_title_changes(
+        self, stored_file_converter, file_storage
+    ):
+        document = stored_file_converter.doc_translation.document_content.document
+        document.title = "Renamed Document"
+
+        translation_file = stored_file_converter._store_file("rtf", io.BytesIO(RTF))
+
+        file_storage.save.assert_called_once()
+        assert translation_file.file.name == "Published/2026/Renamed_Document_spa.rtf"
+
+    def test_changed_file_uploaded(
+        self, stored_file_converter, stored_file, file_storage
+    ):
+        contents = b"{\\rtf1 Informe actualizado}"
+
+        translation_file = stored_file_converter._store_file(
+            "rtf", io.BytesIO(contents)
+        )
+
+        file_storage.save.assert_called_once()
+        assert translation_file.file.name.startswith("Published/2026/")
+        assert translation_file.file.name != stored_file.file.name
+        assert translation_file.checksum == hashlib.sha256(contents).hexdigest()
+        with file_storage.open(translation_file.file.name) as f:
+            assert f.read() == contents
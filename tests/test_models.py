@@ -1,5 +1,6 @@
 import pytest
-from unittest.mock import call, patch
+from unittest.mock import patch
+from django.core import checks
 
 from conftest import (
     DocumentContentFactory,
@@ -8,7 +9,12 @@ from conftest import (
     ExtractionConfigFactory,
     TranslationConfigFactory,
 )
-from la_metro_translations.models import DocumentContent
+from la_metro_translations.models import (
+    DocumentContent,
+    DocumentTranslation,
+    PendingConversion,
+    TranslationFile,
+)
 
 PATCH_GET_BACKEND = "la_metro_translations.models.get_backend"
 
@@ -46,6 +52,7 @@ class TestDocumentContentSave:
         new_status,
         new_markdown,
         document,
+        django_capture_on_commit_callbacks,
     ):
         ExtractionConfigFactory()
         content = DocumentContentFactory(
@@ -57,79 +64,63 @@ class TestDocumentContentSave:
 
         content.approval_status = new_status
         content.markdown = new_markdown
-        content.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            content.save()
 
-        assert mock_call_command().start_job.called
-        assert mock_call_command().start_job.call_args[0][0] == "batch_translate"
+        assert mock_call_command().start_unique_job.called
+        assert mock_call_command().start_unique_job.call_args[0][0] == "batch_translate"
 
     @patch(PATCH_GET_BACKEND)
     def test_batch_translate_not_called_when_no_change(
-        self, mock_call_command, content_with_english
-    ):
-        ExtractionConfigFactory()
-        content_with_english.save()
-
-        mock_call_command().start_job.assert_not_called()
-
-    @pytest.mark.parametrize(
-        "auto_approve,expected_status",
-        [(True, "approved"), (False, "waiting")],
-        ids=["auto_approve_on", "auto_approve_off"],
-    )
-    @patch(PATCH_GET_BACKEND)
-    def test_translation_approval_status_from_language_config(
         self,
         mock_call_command,
-        auto_approve,
-        expected_status,
-        document,
+        content_with_english,
+        django_capture_on_commit_callbacks,
     ):
-        config = ExtractionConfigFactory()
-        TranslationConfigFactory(
-            config=config, language="spa", auto_approve_translations=auto_approve
-        )
-        content = DocumentContentFactory(
-            document=document, approval_status="waiting", markdown="original"
-        )
-        DocumentTranslationFactory(
-            document_content=content, language="eng", approval_status="waiting"
-        )
-
-        content.approval_status = "approved"
-        content.save()
-
-        # Check out this specific call
-        spanish_call = next(
-            c
-            for c in mock_call_command().start_job.call_args_list
-            if c.args[0] == "batch_translate" and c.args[1] == "Spanish"
-        )
+        ExtractionConfigFactory()
+        with django_capture_on_commit_callbacks(execute=True):
+            content_with_english.save()
 
-        assert spanish_call.kwargs["approval_status"] == expected_status
+        mock_call_command().start_unique_job.assert_not_called()
 
     @patch(PATCH_GET_BACKEND)
-    def test_translation_approval_status_defaults_to_waiting_without_language_config(
-        self, mock_call_command, document
+    def test_one_translation_job_for_every_language(
+        self, mock_call_command, document, django_capture_on_commit_callbacks
     ):
-        ExtractionConfigFactory()  # no TranslationConfig rows
         content = DocumentContentFactory(
             document=document, approval_status="waiting", markdown="original"
         )
-        DocumentTranslationFactory(
-            document_content=content, language="eng", approval_status="waiting"
-        )
 
         content.approval_status = "approved"
-        content.save()
-
-        assert (
-            mock_call_command().start_job.call_args.kwargs["approval_status"]
-            == "waiting"
+        with django_capture_on_commit_callbacks() as callbacks:
+            content.save()
+
+        # Nothing is dispatched until the save is committed
+        mock_call_command().start_unique_job.assert_not_called()
+        for callback in callbacks:
+            callback()
+
+        mock_call_command().start_unique_job.assert_called_once_with(
+            "batch_translate",
+            "Armenian (Eastern)",
+            "Armenian (Western)",
+            "Chinese (Simplified)",
+            "Chinese (Traditional)",
+            "Japanese",
+            "Korean",
+            "Russian",
+            "Spanish",
+            "Vietnamese",
+            document_content=content.id,
+            approval_status="config",
         )
 
     @patch(PATCH_GET_BACKEND)
     def test_revision_marks_translations_and_does_not_call_batch_translate(
-        self, mock_call_command, content_with_english
+        self,
+        mock_call_command,
+        content_with_english,
+        django_capture_on_commit_callbacks,
     ):
         spanish = DocumentTranslationFactory(
             document_content=content_with_english,
@@ -138,16 +129,20 @@ class TestDocumentContentSave:
         )
 
         content_with_english.approval_status = "revision"
-        content_with_english.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            content_with_english.save()
 
-        mock_call_command().start_job.assert_not_called()
+        mock_call_command().start_unique_job.assert_not_called()
         spanish.refresh_from_db()
         assert spanish.approval_status == "revision"
 
     @patch(PATCH_GET_BACKEND)
-    def test_new_object_does_not_trigger_translation(self, mock_call_command, document):
-        DocumentContentFactory(document=document, approval_status="approved")
-        mock_call_command().start_job.assert_not_called()
+    def test_new_object_does_not_trigger_translation(
+        self, mock_call_command, document, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            DocumentContentFactory(document=document, approval_status="approved")
+        mock_call_command().start_unique_job.assert_not_called()
 
     @patch(PATCH_GET_BACKEND)
     def test_english_translation_synced_on_content_change(
@@ -160,6 +155,131 @@ class TestDocumentContentSave:
         english = content_with_english.translations.get(language="eng")
         assert english.markdown == "updated markdown"
 
+    @patch(PATCH_GET_BACKEND)
+    def test_approving_content_runs_fixed_number_of_queries(
+        self,
+        mock_call_command,
+        document,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        content = DocumentContentFactory(document=document, approval_status="waiting")
+        DocumentTranslationFactory(
+            document_content=content, language="eng", approval_status="waiting"
+        )
+
+        content = DocumentContent.objects.select_related("document").get(pk=content.pk)
+        content.approval_status = "approved"
+
+        # Content update and English sync
+        with (
+            django_assert_num_queries(2),
+            django_capture_on_commit_callbacks(execute=True),
+        ):
+            content.save()
+
+        mock_call_command().start_unique_job.assert_called_once()
+
+
+@pytest.mark.django_db
+class TestDocumentTranslationSave:
+    """
+    Tests for the DocumentTranslation.save() hook, which triggers convert_docs
+    when a translation is changed or approved.
+    """
+
+    @pytest.mark.parametrize(
+        "new_status,new_markdown,expect_convert_docs",
+        [
+            ("approved", "Jugar querer montaña quince, otro gris más", True),
+            ("waiting", "changed content", False),
+        ],
+        ids=["newly_approved", "changed_but_waiting"],
+    )
+    @patch(PATCH_GET_BACKEND)
+    def test_convert_docs_triggered_for_approved_changes(
+        self,
+        mock_call_command,
+        new_status,
+        new_markdown,
+        expect_convert_docs,
+        document_translation,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        translation = DocumentTranslation.objects.get(pk=document_translation.pk)
+        translation.approval_status = new_status
+        translation.markdown = new_markdown
+
+        # Translation update, conversion queue and file links lookup
+        with (
+            django_assert_num_queries(3),
+            django_capture_on_commit_callbacks() as callbacks,
+        ):
+            translation.save()
+
+        # Nothing is dispatched until the save is committed
+        mock_call_command().start_job.assert_not_called()
+        for callback in callbacks:
+            callback()
+
+        assert mock_call_command().start_job.called == expect_convert_docs
+
+    @patch(PATCH_GET_BACKEND)
+    def test_convert_docs_not_triggered_after_refresh(
+        self,
+        mock_call_command,
+        document_translation,
+        django_capture_on_commit_callbacks,
+    ):
+        DocumentTranslation.objects.filter(pk=document_translation.pk).update(
+            approval_status="approved"
+        )
+        document_translation.refresh_from_db()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            document_translation.save()
+
+        mock_call_command().start_job.assert_not_called()
+
+    def test_approve_waiting_approves_and_queues_in_one_query(
+        self, document_content, django_assert_num_queries
+    ):
+        spanish, korean, french = (
+            DocumentTranslationFactory(
+                document_content=document_content,
+                language=language,
+                approval_status=status,
+            )
+            for language, status in [
+                ("spa", "waiting"),
+                ("kor", "waiting"),
+                ("fra", "approved"),
+            ]
+        )
+        PendingConversion.objects.exclude(document_translation=spanish).delete()
+        queued_at = PendingConversion.objects.get(
+            document_translation=spanish
+        ).queued_at
+
+        with django_assert_num_queries(1):
+            approved_count = DocumentTranslation.approve_waiting(
+                language__in=["spa", "kor", "fra"]
+            )
+
+        assert approved_count == 2
+        assert set(
+            DocumentTranslation.objects.filter(
+                approval_status="approved", language__in=["spa", "kor", "fra"]
+            ).values_list("pk", flat=True)
+        ) == {spanish.pk, korean.pk, french.pk}
+        pending = dict(
+            PendingConversion.objects.values_list("document_translation", "queued_at")
+        )
+        # Translations that were already queued are bumped
+        assert pending.keys() == {spanish.pk, korean.pk}
+        assert pending[spanish.pk] > queued_at
+
 
 @pytest.mark.django_db
 class TestExtractionConfigSave:
@@ -207,20 +327,66 @@ class TestExtractionConfigSave:
         mock_call_command().start_job.assert_not_called()
 
     @patch(PATCH_GET_BACKEND)
-    def test_catch_up_triggers_batch_translate_per_language_config(
-        self, mock_call_command
+    def test_catch_up_triggers_one_batch_translate_for_all_languages(
+        self, mock_call_command, document_content, django_capture_on_commit_callbacks
     ):
         config = ExtractionConfigFactory(auto_approve_extractions=False)
         TranslationConfigFactory(
             config=config, language="spa", auto_approve_translations=True
         )
+        TranslationConfigFactory(
+            config=config, language="kor", auto_approve_translations=False
+        )
+        spanish = DocumentTranslationFactory(
+            document_content=document_content, language="spa", approval_status="waiting"
+        )
+        korean = DocumentTranslationFactory(
+            document_content=document_content, language="kor", approval_status="waiting"
+        )
+
+        PendingConversion.objects.all().delete()
 
         config.auto_approve_extractions = True
-        config.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            config.save()
+
+        mock_call_command().start_unique_job.assert_called_once_with(
+            "batch_translate",
+            "Spanish",
+            "Korean",
+            approval_status="config",
+            convert_docs=True,
+        )
+        mock_call_command().start_job.assert_not_called()
+
+        spanish.refresh_from_db()
+        korean.refresh_from_db()
+        assert spanish.approval_status == "approved"
+        assert korean.approval_status == "waiting"
+        # The bulk update skips save(), so approved translations are queued
+        # for conversion explicitly
+        assert list(
+            PendingConversion.objects.values_list("document_translation", flat=True)
+        ) == [spanish.pk]
 
-        mock_call_command().start_job.assert_any_call(
-            "batch_translate", "Spanish", approval_status="approved"
+    @patch(PATCH_GET_BACKEND)
+    def test_catch_up_converts_english_without_language_configs(
+        self, mock_call_command, document_content, django_capture_on_commit_callbacks
+    ):
+        config = ExtractionConfigFactory(auto_approve_extractions=False)
+        english = DocumentTranslationFactory(
+            document_content=document_content, language="eng", approval_status="waiting"
         )
+        PendingConversion.objects.all().delete()
+
+        config.auto_approve_extractions = True
+        with django_capture_on_commit_callbacks(execute=True):
+            config.save()
+
+        mock_call_command().start_unique_job.assert_called_once_with("convert_docs")
+        english.refresh_from_db()
+        assert english.approval_status == "approved"
+        assert PendingConversion.objects.filter(document_translation=english).exists()
 
 
 @pytest.mark.django_db
@@ -233,7 +399,7 @@ class TestTranslationConfigSave:
 
     @patch(PATCH_GET_BACKEND)
     def test_catch_up_on_flip_approves_waiting_not_revision(
-        self, mock_call_command, extraction_config
+        self, mock_call_command, extraction_config, django_capture_on_commit_callbacks
     ):
         lang_config = TranslationConfigFactory(
             config=extraction_config, language="spa", auto_approve_translations=False
@@ -251,23 +417,29 @@ class TestTranslationConfigSave:
             document_content=content_b, language="spa", approval_status="revision"
         )
 
+        PendingConversion.objects.all().delete()
+
         lang_config.auto_approve_translations = True
-        lang_config.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            lang_config.save()
 
-        # batch_translate and convert_docs should both be called
-        assert call().start_job(
-            "batch_translate", "Spanish", approval_status="approved"
-        ) in (mock_call_command().start_job.call_args_list)
-        assert (
-            call().start_job("convert_docs")
-            in mock_call_command().start_job.call_args_list
+        # batch_translate should be called once, converting files when it's done
+        mock_call_command().start_unique_job.assert_called_once_with(
+            "batch_translate",
+            "Spanish",
+            approval_status="approved",
+            convert_docs=True,
         )
+        mock_call_command().start_job.assert_not_called()
 
         # waiting translation approved; revision left alone
         waiting.refresh_from_db()
         assert waiting.approval_status == "approved"
         revision.refresh_from_db()
         assert revision.approval_status == "revision"
+        assert list(
+            PendingConversion.objects.values_list("document_translation", flat=True)
+        ) == [waiting.pk]
 
     @patch(PATCH_GET_BACKEND)
     def test_catch_up_does_not_run_when_already_auto_approved(
@@ -285,3 +457,69 @@ class TestTranslationConfigSave:
         waiting.refresh_from_db()
         assert waiting.approval_status == "waiting"
         mock_call_command().start_job.assert_not_called()
+        mock_call_command().start_unique_job.assert_not_called()
+
+
+@pytest.mark.django_db
+class TestFileFormatsDisplay:
+    """
+    Tests for the file_formats_display admin helpers, which read files from
+    relations prefetched by the edit views.
+    """
+
+    @pytest.fixture
+    def translations(self, document_content):
+        translations = []
+        for language in ["eng", "spa"]:
+            translation = DocumentTranslationFactory(
+                document_content=document_content, language=language
+            )
+            for file_format in ["rtf", "pdf"]:
+                TranslationFile.objects.create(
+                    document_translation=translation,
+                    format=file_format,
+                    file=f"Published/2026/{language}.{file_format}",
+                )
+            translations.append(translation)
+        return translations
+
+    def test_content_display_uses_prefetched_files(
+        self, translations, django_assert_num_queries
+    ):
+        content = (
+            DocumentContent.objects.select_related("document")
+            .prefetch_related("translations__files")
+            .get(pk=translations[0].document_content_id)
+        )
+
+        with django_assert_num_queries(0):
+            html = content.file_formats_display()
+
+        assert "Original PDF" in html
+        assert html.count("RTF") == 1
+
+    def test_translation_display_uses_prefetched_files(
+        self, translations, django_assert_num_queries
+    ):
+        translation = DocumentTranslation.objects.prefetch_related("files").get(
+            pk=translations[1].pk
+        )
+
+        with django_assert_num_queries(0):
+            html = translation.file_formats_display()
+
+        assert "RTF" in html and "PDF" in html
+        assert "Generated" in html
+
+
+def test_models_pass_system_checks():
+    """
+    pytest-django doesn't run system checks, but migrate and every management
+    command do, so model errors like overlong index names must fail here too.
+    """
+    errors = [
+        error
+        for error in checks.run_checks(databases=["default"])
+        if error.is_serious()
+    ]
+    assert errors == []
@@ -1,7 +1,10 @@
+import re
+
 import pytest
+from django.urls import reverse
 
 from la_metro_translations.panels import PropertyPanel, RelatedObjectsPanel
-from la_metro_translations.models import Document, DocumentContent
+from la_metro_translations.models import Document, DocumentContent, DocumentTranslation
 
 from conftest import DocumentTranslationFactory
 
@@ -97,3 +100,76 @@ class TestRelatedObjectsPanel:
 
         for translation in document.content.translations.all():
             assert html.count(translation.get_language_display()) == 1
+
+    @pytest.fixture
+    def translations(self, document_content):
+        return [
+            DocumentTranslationFactory(document_content=document_content, language=lang)
+            for lang in ["spa", "kor", "vie"]
+        ]
+
+    @pytest.fixture
+    def translations_panel(self):
+        return RelatedObjectsPanel(
+            "la_metro_translations.DocumentTranslation",
+            "document_content__document",
+            [
+                PropertyPanel("language_display"),
+                PropertyPanel("approval_status_display"),
+            ],
+            select_related=["document_content"],
+            per_page=2,
+        ).bind_to_model(Document)
+
+    def test_bound_panel_render_in_one_query(
+        self, translations, translations_panel, django_assert_num_queries, rf
+    ):
+        """Test rendering loads related objects and what they display at once."""
+        document = translations[0].document_content.document
+        bound_panel = translations_panel.get_bound_panel(
+            instance=document, request=rf.get("/")
+        )
+
+        with django_assert_num_queries(1):
+            bound_panel.render_html()
+
+    def test_bound_panel_render_pages(
+        self, translations, translations_panel, wagtail_user_client, rf
+    ):
+        """Test related objects are shown a page at a time, newest first."""
+        document = translations[0].document_content.document
+        bound_panel = translations_panel.get_bound_panel(
+            instance=document, request=rf.get("/")
+        )
+        html = bound_panel.render_html()
+
+        assert html.index("Vietnamese") < html.index("Korean")
+        assert "Spanish" not in html
+        # The next page is loaded into the form rather than replacing it
+        url = re.search(r"data-w-swap-src-value='([^']+)'", html)[1]
+        assert url == (
+            reverse("related_objects", args=[translations_panel.panel_id, document.pk])
+            + f"?after={translations[1].pk}"
+        )
+
+        response = wagtail_user_client.get(url)
+        html = response.content.decode()
+
+        assert "Spanish" in html
+        assert "Vietnamese" not in html and "Korean" not in html
+        assert "Show more" not in html
+
+    def test_bound_panel_pages_break_ties_by_pk(self, translations, translations_panel):
+        """Test objects updated at the same time are each shown once."""
+        document = translations[0].document_content.document
+        DocumentTranslation.objects.filter(
+            pk__in=[translation.pk for translation in translations]
+        ).update(updated_at=translations[0].updated_at)
+        bound_panel = translations_panel.get_bound_panel(instance=document)
+
+        html = bound_panel.render_page() + bound_panel.render_page(
+            after=translations[1].pk
+        )
+
+        for translation in translations:
+            assert html.count(translation.get_language_display()) == 1
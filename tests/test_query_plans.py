@@ -0,0 +1,217 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command as run_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from la_metro_translations.management.commands.convert_docs import (
+    Command as convert_docs_command,
+)
+from la_metro_translations.models import (
+    Document,
+    DocumentContent,
+    DocumentTranslation,
+    LinkText,
+    TranslationFile,
+)
+
+PATCH_TRANSLATE_SERVICE = (
+    "la_metro_translations.management.commands.batch_translate.get_translation_service"
+)
+PATCH_TRANSLATE_RESET_DB = (
+    "la_metro_translations.management.commands.batch_translate"
+    ".Command.reset_db_connections"
+)
+
+# Enough rows that Postgres weighs index scans against sequential scans the
+# way it would in production, where small tables are always scanned in full
+DOCUMENT_COUNT = 5000
+LANGUAGES = [language for language, _ in DocumentTranslation.LANGUAGE_CHOICES]
+
+
+@pytest.fixture
+def benchmark_documents(transactional_db):
+    """
+    Fill the pipeline's tables with DOCUMENT_COUNT documents, each with
+    content, a translation in every language but some Spanish, and files,
+    a few of them out of date. The tables are then vacuumed, as autovacuum
+    would in production, which refreshes the planner's statistics and lets it
+    answer queries from an index alone. Vacuuming can't happen inside a
+    transaction, so these tests commit their rows and flush them afterward.
+    """
+    document = Document._meta.db_table
+    content = DocumentContent._meta.db_table
+    translation = DocumentTranslation._meta.db_table
+    translation_file = TranslationFile._meta.db_table
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {document} (
+                title, source_url, created_at, updated_at, document_type,
+                document_id, entity_type, entity_id, entity_slug
+            )
+            SELECT
+                'Board report ' || i, 'https://example.com/' || i,
+                now() - interval '1 year', now() - interval '1 year',
+                'bill_document', i::text, 'bill', i::text, 'board-report-' || i
+            FROM generate_series(1, %s) i
+            """,
+            [DOCUMENT_COUNT],
+        )
+        cursor.execute(f"""
+            INSERT INTO {content} (
+                markdown, approval_status, created_at, updated_at, document_id
+            )
+            SELECT
+                'Board report ' || id,
+                CASE WHEN mod(id, 20) = 0 THEN 'waiting' ELSE 'approved' END,
+                now() - interval '300 days',
+                now() - interval '300 days'
+                    + CASE WHEN mod(id, 500) = 0 THEN interval '200 days' ELSE '0' END,
+                id
+            FROM {document}
+            """)
+        cursor.execute(
+            f"""
+            INSERT INTO {translation} (
+                markdown, language, approval_status, created_at, updated_at,
+                document_content_id
+            )
+            SELECT
+                'Informe ' || c.id, language,
+                CASE WHEN mod(c.id, 10) = 0 THEN 'waiting' ELSE 'approved' END,
+                now() - interval '200 days', now() - interval '200 days', c.id
+            FROM {content} c CROSS JOIN unnest(%s) language
+            WHERE NOT (language = 'spa' AND mod(c.id, 97) = 0)
+            """,
+            [LANGUAGES],
+        )
+        cursor.execute(f"""
+            INSERT INTO {translation_file} (
+                format, file, checksum, created_at, updated_at,
+                document_translation_id
+            )
+            SELECT
+                format, 'Published/' || t.id || '.' || format, '',
+                now() - interval '100 days',
+                now() - interval '100 days'
+                    - CASE WHEN mod(t.id, 300) = 0 THEN interval '200 days' ELSE '0' END,
+                t.id
+            FROM {translation} t CROSS JOIN unnest(ARRAY['rtf', 'pdf']) format
+            WHERE NOT (format = 'pdf' AND t.language = 'eng')
+            """)
+        for table in [document, content, translation, translation_file]:
+            cursor.execute(f"VACUUM ANALYZE {table}")
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(sql, params=None):
+    """
+    Return the names of the indexes that the plan for sql scans, and of the
+    tables it scans in full.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0][0]["Plan"]
+
+    nodes = list(plan_nodes(plan))
+    indexes = {node["Index Name"] for node in nodes if "Index Name" in node}
+    seq_scanned = {
+        node["Relation Name"] for node in nodes if node["Node Type"] == "Seq Scan"
+    }
+    return indexes, seq_scanned
+
+
+def captured_query(queries, *fragments):
+    """
+    Return the SQL of the one captured query containing every fragment.
+    """
+    matches = [
+        query["sql"]
+        for query in queries
+        if all(fragment in query["sql"] for fragment in fragments)
+    ]
+    assert len(matches) == 1, matches
+    return matches[0]
+
+
+@pytest.mark.usefixtures("benchmark_documents")
+class TestQueryPlans:
+    """
+    The pipeline's hot queries should be answered from their indexes, rather
+    than by scanning whole tables, once there are production numbers of rows.
+    """
+
+    def test_document_files_lookups_use_entity_index(self, client, settings):
+        settings.BOARDAGENDAS_API_KEY = "test-api-key"
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+        }
+        for language in LANGUAGES:
+            LinkText.objects.create(
+                language=language,
+                agenda_download_text=f"Agenda ({language})",
+                board_report_download_text=f"Board report ({language})",
+            )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                reverse("document_files"),
+                {"api_key": "test-api-key", "entity_type": "bill", "document_id": "42"},
+            )
+        assert response.status_code == 200
+
+        document_lookups = [
+            query["sql"]
+            for query in context.captured_queries
+            if f'"{Document._meta.db_table}"."entity_type" = ' in query["sql"]
+            or f'"{Document._meta.db_table}"."entity_type" IN ' in query["sql"]
+        ]
+        assert len(document_lookups) == 1
+        for sql in document_lookups:
+            indexes, seq_scanned = explain(sql)
+            assert "document_entity_idx" in indexes
+            assert Document._meta.db_table not in seq_scanned
+
+    @patch(PATCH_TRANSLATE_RESET_DB)
+    @patch(PATCH_TRANSLATE_SERVICE)
+    def test_batch_translate_uses_staleness_index(self, mock_service, _):
+        mock_service.return_value.metered_batch_translate.return_value = []
+
+        with CaptureQueriesContext(connection) as context:
+            run_command("batch_translate", "Spanish", approval_status="waiting")
+
+        sql = captured_query(
+            context.captured_queries,
+            f'FROM "{DocumentContent._meta.db_table}"',
+            "NOT EXISTS",
+        )
+        indexes, seq_scanned = explain(sql)
+        assert "translation_staleness_idx" in indexes
+        assert DocumentTranslation._meta.db_table not in seq_scanned
+
+    def test_enqueue_outdated_uses_staleness_index(self):
+        with CaptureQueriesContext(connection) as context:
+            convert_docs_command().enqueue_outdated()
+
+        sql = captured_query(context.captured_queries, "NOT EXISTS", "UNION")
+        indexes, seq_scanned = explain(sql)
+        assert "file_staleness_idx" in indexes
+        assert TranslationFile._meta.db_table not in seq_scanned
+
+    def test_waiting_translations_use_partial_index(self):
+        waiting = DocumentTranslation.objects.filter(
+            approval_status="waiting"
+        ).order_by("-updated_at")[:20]
+
+        indexes, seq_scanned = explain(*waiting.query.sql_with_params())
+        assert indexes == {"waiting_translation_idx"}
+        assert DocumentTranslation._meta.db_table not in seq_scanned
@@ -1,7 +1,14 @@
+import base64
+import re
+
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from conftest import DocumentFactory, DocumentContentFactory, DocumentTranslationFactory
+from la_metro_translations.models import LinkText, TranslationFile
 
 
 @pytest.mark.django_db
@@ -252,3 +259,265 @@ class TestDocumentTranslationViewSet:
         assert response.status_code == 200
         assert "There is 1 match" in response.content.decode()
         assert document.title in response.content.decode()
+
+
+@pytest.mark.django_db
+class TestMarkdownImages:
+    """
+    Tests for the placeholders that stand in for inline images in the markdown
+    editor.
+    """
+
+    image_bytes = b"\x89PNG fake image bytes"
+
+    @pytest.fixture
+    def image_content(self, document):
+        data = base64.b64encode(self.image_bytes).decode()
+        markdown = (
+            "# Agenda\n\n"
+            f"![img-0.png](data:image/png;base64,{data})\n\n"
+            "Some text\n\n"
+            f"![img-1.png](data:image/png;base64,{data}AA==)\n"
+        )
+        return DocumentContentFactory(document=document, markdown=markdown)
+
+    def get_editor_markdown(self, client, content):
+        response = client.get(reverse("document_content:edit", args=[content.pk]))
+        assert response.status_code == 200
+        return response.context["form"].initial["markdown"]
+
+    def test_edit_view_sends_placeholders(self, wagtail_user_client, image_content):
+        editor_markdown = self.get_editor_markdown(wagtail_user_client, image_content)
+
+        assert "base64" not in editor_markdown
+        urls = re.findall(r"\]\((/[^)]+)\)", editor_markdown)
+        assert len(urls) == 2
+
+        response = wagtail_user_client.get(urls[0])
+        assert response.status_code == 200
+        assert response["Content-Type"] == "image/png"
+        assert response.content == self.image_bytes
+
+        # A placeholder whose image has since changed isn't served
+        stale_url = urls[1].replace("/1/", "/0/")
+        assert wagtail_user_client.get(stale_url).status_code == 404
+
+    def test_images_served_safely_from_cache(
+        self, wagtail_user_client, image_content, settings
+    ):
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        cache.clear()
+        editor_markdown = self.get_editor_markdown(wagtail_user_client, image_content)
+        url = re.findall(r"\]\((/[^)]+)\)", editor_markdown)[0]
+
+        wagtail_user_client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = wagtail_user_client.get(url)
+
+        assert response.content == self.image_bytes
+        assert response["X-Content-Type-Options"] == "nosniff"
+        assert response["Content-Security-Policy"] == "sandbox"
+        # The image is extracted from the markdown once
+        assert not [query for query in queries if "documentcontent" in query["sql"]]
+
+    def test_svg_images_not_served(self, wagtail_user_client, document):
+        svg = b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>'
+        content = DocumentContentFactory(
+            document=document,
+            markdown=f"![img-0.svg](data:image/svg+xml;base64,{base64.b64encode(svg).decode()})",
+        )
+        editor_markdown = self.get_editor_markdown(wagtail_user_client, content)
+        url = re.findall(r"\]\((/[^)]+)\)", editor_markdown)[0]
+
+        assert wagtail_user_client.get(url).status_code == 404
+
+    def test_images_restored_on_save(self, wagtail_user_client, image_content):
+        original_markdown = image_content.markdown
+        editor_markdown = self.get_editor_markdown(wagtail_user_client, image_content)
+
+        # Browsers submit textarea line breaks as CRLF
+        response = wagtail_user_client.post(
+            reverse("document_content:edit", args=[image_content.pk]),
+            {
+                "markdown": editor_markdown.replace("\n", "\r\n"),
+                "approval_status": "waiting",
+            },
+        )
+        assert response.status_code == 302
+
+        image_content.refresh_from_db()
+        assert image_content.markdown == original_markdown
+
+        # Edits around the images are kept, along with the images themselves
+        edited_markdown = editor_markdown.replace("Some text", "Edited text")
+        wagtail_user_client.post(
+            reverse("document_content:edit", args=[image_content.pk]),
+            {"markdown": edited_markdown, "approval_status": "waiting"},
+        )
+
+        image_content.refresh_from_db()
+        assert (
+            image_content.markdown
+            == original_markdown.replace("Some text", "Edited text").strip()
+        )
+
+
+@pytest.mark.django_db
+class TestSearchFilters:
+    """
+    Tests for the full-text search filters on the admin list pages.
+    """
+
+    @pytest.fixture
+    def documents(self):
+        image = base64.b64encode(b"budget").decode()
+        matching = DocumentContentFactory(
+            document=DocumentFactory(document_id="doc-1", title="Board meeting"),
+            markdown=f"The committee approved the budgets.\n\n![img](data:image/png;base64,{image})",
+            approval_status="approved",
+        )
+        DocumentTranslationFactory(
+            document_content=matching,
+            language="spa",
+            markdown="El comité aprobó los presupuestos.",
+        )
+        other = DocumentContentFactory(
+            document=DocumentFactory(document_id="doc-2", title="Transit update"),
+            markdown="Bus service changes.",
+            approval_status="approved",
+        )
+        DocumentTranslationFactory(
+            document_content=other, language="spa", markdown="Cambios de autobús."
+        )
+        return matching, other
+
+    @pytest.mark.parametrize(
+        "index_url_name,search",
+        [
+            # Matches the stemmed content, and the title
+            ("document:index", "budget"),
+            ("document:index", "meetings"),
+            ("document_content:index", "approve"),
+            ("document_content:index", "board"),
+            # Matches the Spanish stem, and the English title
+            ("document_translation:index", "presupuesto"),
+            ("document_translation:index", "meeting"),
+        ],
+    )
+    def test_search_matches_title_and_content(
+        self, wagtail_user_client, documents, index_url_name, search
+    ):
+        response = wagtail_user_client.get(reverse(index_url_name), {"search": search})
+
+        assert response.status_code == 200
+        assert [obj.pk for obj in response.context["object_list"]] == [
+            self.get_object(documents[0], index_url_name).pk
+        ]
+
+    def test_search_skips_inline_images(self, wagtail_user_client, documents):
+        image_text = base64.b64encode(b"budget").decode()
+        response = wagtail_user_client.get(
+            reverse("document_content:index"), {"search": image_text}
+        )
+
+        assert not response.context["object_list"]
+
+    def get_object(self, content, index_url_name):
+        if index_url_name == "document:index":
+            return content.document
+        if index_url_name == "document_translation:index":
+            return content.translations.get(language="spa")
+        return content
+
+
+# The most queries an admin list page may run, however many rows it shows
+LIST_VIEW_QUERY_BUDGET = 10
+
+
+@pytest.mark.django_db
+class TestListViewQueryBudget:
+    @pytest.mark.parametrize("row_count", [1, 20])
+    @pytest.mark.parametrize(
+        "index_url_name",
+        ["document:index", "document_content:index", "document_translation:index"],
+    )
+    def test_list_view_stays_within_query_budget(
+        self,
+        wagtail_user_client,
+        index_url_name,
+        row_count,
+        django_assert_max_num_queries,
+    ):
+        """
+        Columns that show related objects are loaded with the rows, so list
+        pages run the same number of queries however many rows they show.
+        """
+        for i in range(row_count):
+            content = DocumentContentFactory(
+                document=DocumentFactory(document_id=f"doc-{i}"),
+                approval_status="approved",
+            )
+            DocumentTranslationFactory(document_content=content, language="spa")
+
+        with django_assert_max_num_queries(LIST_VIEW_QUERY_BUDGET):
+            response = wagtail_user_client.get(reverse(index_url_name))
+
+        assert response.status_code == 200
+
+
+@pytest.mark.django_db
+class TestDocumentFilesView:
+    @pytest.fixture(autouse=True)
+    def api_settings(self, settings):
+        settings.BOARDAGENDAS_API_KEY = "test-api-key"
+        # Build the payload on every request instead of serving it from cache
+        settings.CACHES = {
+            "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+        }
+
+    def add_translation(self, document_content, language):
+        LinkText.objects.create(
+            language=language,
+            agenda_download_text=f"Agenda ({language})",
+            board_report_download_text=f"Board report ({language})",
+        )
+        translation = DocumentTranslationFactory(
+            document_content=document_content,
+            language=language,
+            approval_status="approved",
+        )
+        for file_format in ["rtf", "pdf"]:
+            TranslationFile.objects.create(
+                document_translation=translation,
+                format=file_format,
+                file=f"Published/2026/{language}.{file_format}",
+            )
+
+    @pytest.mark.parametrize("language_count", [1, 5])
+    def test_document_files_query_count_is_constant(
+        self, client, document_content, language_count, django_assert_num_queries
+    ):
+        """
+        Link text is loaded once per request, so the number of queries doesn't
+        grow with the number of translations and files.
+        """
+        for language in ["spa", "kor", "vie", "rus", "jpn"][:language_count]:
+            self.add_translation(document_content, language)
+
+        document = document_content.document
+        # Content and document, translations, files and link text
+        with django_assert_num_queries(4):
+            response = client.get(
+                reverse("document_files"),
+                {
+                    "api_key": "test-api-key",
+                    "entity_type": document.entity_type,
+                    "document_id": document.document_id,
+                },
+            )
+
+        assert response.status_code == 200
+        assert len(response.json()["pdf"]) == language_count
+        assert response.json()["rtf"][0]["link_text"] == "Board report (spa)"